@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+import os
+import time
+import argparse
+from multiprocessing import Pool, cpu_count
+from mochi_assets.jsonio import load_json, save_json
+
+# Configuration
+FILES_DIR = 'shared/src/commonMain/composeResources/files'
+KANJI_DETAILS_FILE = os.path.join(FILES_DIR, 'kanji/kanji_details.json')
+MERGED_FILE = os.path.join(FILES_DIR, 'words/merged_wordlist.json')
+OUTPUT_FILE = os.path.join(FILES_DIR, 'words/furigana.json')
+FORMAT_VERSION = 1
+CHUNK_SIZE = 500
+
+# Rendaku et gémination : variantes d'une lecture quand le kanji n'est pas en tête
+RENDAKU = dict(zip('かきくけこさしすせそたちつてとはひふへほ',
+                   'がぎぐげござじずぜぞだぢづでどばびぶべぼ'))
+HANDAKU = dict(zip('はひふへほ', 'ぱぴぷぺぽ'))
+GEMINATE = set('つちくきっ')
+REPEAT_MARK = '々'
+# Petits ヵ/ヶ des compteurs, lus か (一ヶ月 いっかげつ) ou が (関ヶ原 せきがはら)
+COUNTER_KANA = {'ヵ': 'かが', 'ヶ': 'かが', 'ゕ': 'かが', 'ゖ': 'かが'}
+
+def as_list(value):
+    if value is None: return []
+    return value if isinstance(value, list) else [value]
+
+def to_hiragana(text):
+    return ''.join('か' if c in COUNTER_KANA else chr(ord(c) - 0x60) if 'ァ' <= c <= 'ヶ' else c for c in text)
+
+def kana_matches(char, sound):
+    """Un kana du texte correspond-il à ce son de la lecture (déjà en hiragana) ?"""
+    return sound in COUNTER_KANA.get(char, to_hiragana(char))
+
+def clean_phonetics(p):
+    """Même nettoyage que CrosswordGenerator.cleanPhonetics"""
+    for part in (p or '').split('/'):
+        if part.strip():
+            return part.replace('.', '').replace(' ', '')
+    return ''
+
+def is_kanji(char):
+    code = ord(char)
+    return 0x4E00 <= code <= 0x9FAF or 0x3400 <= code <= 0x4DBF or char == REPEAT_MARK
+
+# ============ LECTURES PAR KANJI ============
+
+def reading_variants(reading):
+    """Lecture brute de kanji_details -> formes possibles dans un mot (en hiragana)"""
+    reading = to_hiragana(reading.strip('-').strip())
+    if not reading: return set()
+    stem = reading.split('.')[0]
+    variants = {stem, reading.replace('.', '')}
+    for base in list(variants):
+        if base[0] in RENDAKU: variants.add(RENDAKU[base[0]] + base[1:])
+        if base[0] in HANDAKU: variants.add(HANDAKU[base[0]] + base[1:])
+        if len(base) > 1 and base[-1] in GEMINATE: variants.add(base[:-1] + 'っ')
+    variants.discard('')
+    return variants
+
+def build_readings_map(kanji_details):
+    readings = {}
+    for k in kanji_details.get('kanji_details', {}).get('kanji', []):
+        char = k.get('character')
+        if not char: continue
+        variants = set()
+        for r in as_list((k.get('readings') or {}).get('reading')):
+            if isinstance(r, dict): variants |= reading_variants(r.get('#text', ''))
+        # Les lectures les plus longues d'abord : préférées en cas d'ambiguïté
+        readings[char] = sorted(variants, key=lambda v: (-len(v), v))
+    return readings
+
+# ============ ALIGNEMENT ============
+
+def align(text, phonetics, readings):
+    """
+    Aligne `text` sur `phonetics` (déjà nettoyée) par programmation dynamique mémoïsée.
+    Renvoie (segments, groupé) ; segments = [[t0, t1, r0, r1], ...] pour les seuls kanjis,
+    `groupé` indique qu'un bloc de kanjis a dû être lu d'un seul tenant (jukujikun).
+    Renvoie (None, False) si aucun alignement n'existe.
+    """
+    reading = to_hiragana(phonetics)
+    n, m = len(text), len(reading)
+    memo = {}
+
+    def solve(i, j, allow_group):
+        key = (i, j, allow_group)
+        if key in memo: return memo[key]
+        memo[key] = None
+        if i == n:
+            memo[key] = [] if j == m else None
+            return memo[key]
+        char = text[i]
+
+        if not is_kanji(char):
+            if j < m and kana_matches(char, reading[j]):
+                rest = solve(i + 1, j + 1, allow_group)
+                if rest is not None: memo[key] = rest
+            return memo[key]
+
+        source = text[i - 1] if char == REPEAT_MARK and i > 0 else char
+        for variant in readings.get(source, []):
+            if reading.startswith(variant, j):
+                rest = solve(i + 1, j + len(variant), allow_group)
+                if rest is not None:
+                    memo[key] = [[i, i + 1, j, j + len(variant)]] + rest
+                    return memo[key]
+
+        if allow_group:
+            # Bloc de kanjis lu globalement, ancré sur le prochain kana du texte
+            k = i
+            while k < n and is_kanji(text[k]): k += 1
+            for end in range(m, j, -1):
+                if k < n and (end >= m or not kana_matches(text[k], reading[end])): continue
+                rest = solve(k, end, allow_group)
+                if rest is not None:
+                    memo[key] = [[i, k, j, end, 1]] + rest
+                    return memo[key]
+        return memo[key]
+
+    segments = solve(0, 0, False)
+    if segments is not None:
+        return segments, False
+    segments = solve(0, 0, True)
+    if segments is None:
+        return None, False
+    return [s[:4] for s in segments], True
+
+# ============ TRAITEMENT PARALLÈLE ============
+
+_readings = None
+
+def _init_worker(readings):
+    global _readings
+    _readings = readings
+
+def _align_chunk(chunk):
+    results = []
+    for word_id, text, phonetics in chunk:
+        clean = clean_phonetics(phonetics)
+        if not any(is_kanji(c) for c in text):
+            results.append((word_id, [], 'kana'))
+            continue
+        segments, grouped = align(text, clean, _readings) if clean else (None, False)
+        status = 'unaligned' if segments is None else ('grouped' if grouped else 'aligned')
+        results.append((word_id, segments, status))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Aligne les furigana des mots sur les lectures des kanjis')
+    parser.add_argument('--kanji', default=KANJI_DETAILS_FILE, help='Fichier kanji_details.json')
+    parser.add_argument('--words', default=MERGED_FILE, help='Fichier merged_wordlist.json')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Fichier de sortie, indexé par ID de mot')
+    parser.add_argument('--workers', type=int, default=cpu_count(), help='Nombre de processus')
+    parser.add_argument('--show-unaligned', type=int, default=0, help='Affiche N mots non alignés')
+    args = parser.parse_args()
+
+    kanji_details = load_json(args.kanji)
+    words_data = load_json(args.words)
+    if not kanji_details or not words_data:
+        print("Erreur: kanji_details.json ou merged_wordlist.json introuvable.")
+        return
+
+    readings = build_readings_map(kanji_details)
+    words = words_data.get('words', [])
+    items = [(w['id'], w.get('text', ''), w.get('phonetics', '')) for w in words]
+    chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+    print(f"Alignement de {len(items)} mots ({len(readings)} kanjis, {args.workers} processus)...")
+
+    t0 = time.perf_counter()
+    with Pool(args.workers, initializer=_init_worker, initargs=(readings,)) as pool:
+        results = [r for chunk in pool.imap(_align_chunk, chunks) for r in chunk]
+    elapsed = time.perf_counter() - t0
+
+    # Asset séparé {"version", "words": {id: segments}} : merged_wordlist.json est régénéré
+    # par merge_wordlists.py et watch_assets.py, qui ne connaissent pas ces segments
+    by_id = {word_id: (segments, status) for word_id, segments, status in results}
+    stats = {'kana': 0, 'aligned': 0, 'grouped': 0, 'unaligned': 0}
+    furigana, unaligned = {}, []
+    for w in words:
+        segments, status = by_id[w['id']]
+        stats[status] += 1
+        if segments:
+            furigana[str(w['id'])] = segments
+        elif status == 'unaligned':
+            unaligned.append(w)
+
+    save_json(args.output, {'version': FORMAT_VERSION, 'words': furigana}, indent=None)
+
+    print(f"Terminé en {elapsed:.2f}s ({len(items) / elapsed:.0f} mots/s) -> {args.output}")
+    print(f"  Kana seuls: {stats['kana']} | Alignés: {stats['aligned']} | "
+          f"Blocs jukujikun: {stats['grouped']} | Non alignés: {stats['unaligned']}")
+    for w in unaligned[:args.show_unaligned]:
+        print(f"    {w['id']}: {w.get('text')} [{w.get('phonetics')}]")
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,13 @@ import xml.etree.ElementTree as ET
 import urllib.request
 import urllib.parse
 import time
-from bs4 import BeautifulSoup
 import re
 import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..'))
+from mochi_assets.xmlstream import ElementStream, ElementWriter
 
 # ============ CONFIGURATION ============
 KANJI_XML_FILE = "kanji_details.xml"  # Ton fichier source
@@ -38,6 +42,7 @@ def extract_components_exact(html, kanji_char):
     if not html:
         return None
 
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html, 'html.parser')
     result = {'structure': None, 'components': []}
 
@@ -136,17 +141,17 @@ def extract_components_exact(html, kanji_char):
 
 # ============ GESTION DU XML ============
 
-def get_kanji_from_xml():
+def get_kanji_from_xml(xml_file=KANJI_XML_FILE):
     """Récupère tous les kanjis du fichier XML qui n'ont pas de composants."""
 
-    print(f"📖 Lecture du fichier : {KANJI_XML_FILE}")
+    print(f"📖 Lecture du fichier : {xml_file}")
 
-    if not os.path.exists(KANJI_XML_FILE):
-        print(f"❌ Fichier {KANJI_XML_FILE} introuvable!")
+    if not os.path.exists(xml_file):
+        print(f"❌ Fichier {xml_file} introuvable!")
         return None, None
 
     try:
-        tree = ET.parse(KANJI_XML_FILE)
+        tree = ET.parse(xml_file)
         root = tree.getroot()
     except ET.ParseError as e:
         print(f"❌ Erreur XML : {e}")
@@ -168,23 +173,42 @@ def get_kanji_from_xml():
     # Identifier les kanjis SANS composants
     to_process = []
     for elem in kanji_elements:
-        char = elem.get('character')
-        if not char and elem.text:
-            char = elem.text.strip()
-
-        if char and len(char.strip()) == 1:
-            char = char.strip()
-
-            # Vérifier si déjà a des composants
-            has_components = elem.find('components') is not None
-
-            if not has_components:
-                to_process.append((elem, char))
+        char = missing_components(elem)
+        if char:
+            to_process.append((elem, char))
 
     print(f"📥 {len(to_process)} kanji(s) sans composants")
 
     return tree, to_process
 
+def missing_components(elem):
+    """Caractère du kanji s'il n'a pas encore de composants, sinon None."""
+    char = elem.get('character')
+    if not char and elem.text:
+        char = elem.text.strip()
+
+    if char and len(char.strip()) == 1:
+        # Vérifier si déjà a des composants
+        if elem.find('components') is None:
+            return char.strip()
+    return None
+
+def indent(elem, level=0):
+    """Indente le XML pour une meilleure lisibilité."""
+    indent_str = "\n" + level * "  "
+    if len(elem):
+        if not elem.text or not elem.text.strip():
+            elem.text = indent_str + "  "
+        if not elem.tail or not elem.tail.strip():
+            elem.tail = indent_str
+        for child in elem:
+            indent(child, level + 1)
+        if not child.tail or not child.tail.strip():
+            child.tail = indent_str
+    else:
+        if level and (not elem.tail or not elem.tail.strip()):
+            elem.tail = indent_str
+
 def update_xml_component(tree, kanji_elem, components_data):
     """Met à jour l'élément kanji avec les composants extraits."""
 
@@ -213,30 +237,97 @@ def update_xml_component(tree, kanji_elem, components_data):
 
     return True
 
+def apply_components(tree, kanji_elem, components_data):
+    """Met à jour le kanji et affiche un résumé ; False en cas d'erreur XML."""
+    try:
+        update_xml_component(tree, kanji_elem, components_data)
+    except Exception as e:
+        print(f" → ❌ Erreur XML: {e}")
+        return False
+
+    # Afficher un résumé succint
+    comps_summary = []
+    for comp in components_data['components']:
+        if comp['display'] != comp['ref']:
+            comps_summary.append(f"{comp['display']}({comp['ref']})")
+        else:
+            comps_summary.append(comp['ref'])
+
+    print(f" → ✅ {components_data['structure']} {' '.join(comps_summary)}")
+    return True
+
+def enrich_kanji(tree, kanji_elem, kanji_char):
+    """Télécharge, extrait et ajoute les composants d'un kanji : 'ok', 'none' ou 'error'."""
+    # Télécharger la page
+    html = fetch_kanji_page(kanji_char)
+    if not html:
+        print(" → ❌ Téléchargement échoué")
+        return 'error'
+
+    # Extraire les composants
+    components_data = extract_components_exact(html, kanji_char)
+
+    if not components_data:
+        print(" → ⚠️  Pas de composants")
+        return 'none'
+
+    # Mettre à jour le XML
+    return 'ok' if apply_components(tree, kanji_elem, components_data) else 'error'
+
+def confirm_long_run(count, args):
+    """Confirmation au-delà de 100 kanjis (--yes pour les lancements sans terminal)."""
+    if count <= 100 or args.yes:
+        return True
+    print(f"\n⚠️  ATTENTION : {count} kanjis à traiter")
+    print(f"⏱️  Temps estimé : {count * args.delay / 60:.1f} minutes")
+
+    if not sys.stdin.isatty():
+        print("❌ Pas de terminal pour confirmer : relancer avec --yes.")
+        sys.exit(1)
+    response = input("Continuer ? [o/N] : ")
+    if response.lower() != 'o':
+        print("❌ Arrêt demandé.")
+        return False
+    return True
+
 # ============ FONCTION PRINCIPALE ============
 
 def main():
     """Fonction principale qui orchestre tout."""
 
+    parser = argparse.ArgumentParser(description='Ajoute les composants manquants de kanji_details.xml (Kanshudo)')
+    parser.add_argument('--xml', default=KANJI_XML_FILE, help='Fichier kanji_details.xml à enrichir')
+    parser.add_argument('--delay', type=float, default=REQUEST_DELAY, help='Délai entre deux requêtes (secondes)')
+    parser.add_argument('--save-interval', type=int, default=SAVE_INTERVAL, help='Sauvegarde tous les N kanjis')
+    parser.add_argument('--limit', type=int, default=None, help='Nombre maximal de kanjis traités')
+    parser.add_argument('--yes', action='store_true', help='Traitement long lancé sans confirmation')
+    parser.add_argument('--test', action='store_true', help='Test rapide sur quelques kanjis, sans écriture')
+    parser.add_argument('--stream', action='store_true',
+                        help='Lecture et écriture en flux (mémoire bornée, reprise après interruption)')
+    args = parser.parse_args()
+
+    if args.test:
+        test_quick()
+        return
+    if args.stream:
+        stream_components(args)
+        return
+
     print("🚀 ENRICHISSEMENT DES COMPOSANTS KANJI")
     print("="*50)
 
     # 1. Récupérer les kanjis depuis le XML
-    tree, to_process = get_kanji_from_xml()
+    tree, to_process = get_kanji_from_xml(args.xml)
 
     if not tree or not to_process:
         print("❌ Aucun kanji à traiter.")
         return
+    if args.limit is not None:
+        to_process = to_process[:args.limit]
 
     # 2. Demander confirmation pour le traitement batch
-    if len(to_process) > 100:
-        print(f"\n⚠️  ATTENTION : {len(to_process)} kanjis à traiter")
-        print(f"⏱️  Temps estimé : {len(to_process) * REQUEST_DELAY / 60:.1f} minutes")
-
-        response = input("Continuer ? [o/N] : ")
-        if response.lower() != 'o':
-            print("❌ Arrêt demandé.")
-            return
+    if not confirm_long_run(len(to_process), args):
+        return
 
     # 3. Statistiques
     success_count = 0
@@ -250,74 +341,32 @@ def main():
     for i, (kanji_elem, kanji_char) in enumerate(to_process, 1):
         print(f"\n[{i}/{len(to_process)}] {kanji_char}", end="")
 
-        # Télécharger la page
-        html = fetch_kanji_page(kanji_char)
-        if not html:
-            error_count += 1
-            print(" → ❌ Téléchargement échoué")
-            continue
-
-        # Extraire les composants
-        components_data = extract_components_exact(html, kanji_char)
-
-        if not components_data:
+        status = enrich_kanji(tree, kanji_elem, kanji_char)
+        if status == 'none':
             no_components_count += 1
-            print(" → ⚠️  Pas de composants")
             continue
-
-        # Mettre à jour le XML
-        try:
-            update_xml_component(tree, kanji_elem, components_data)
-            success_count += 1
-
-            # Afficher un résumé succint
-            comps_summary = []
-            for comp in components_data['components']:
-                if comp['display'] != comp['ref']:
-                    comps_summary.append(f"{comp['display']}({comp['ref']})")
-                else:
-                    comps_summary.append(comp['ref'])
-
-            print(f" → ✅ {components_data['structure']} {' '.join(comps_summary)}")
-
-        except Exception as e:
+        if status == 'error':
             error_count += 1
-            print(f" → ❌ Erreur XML: {e}")
             continue
+        success_count += 1
 
         # 5. Sauvegarde régulière
-        if i % SAVE_INTERVAL == 0 or i == len(to_process):
+        if i % args.save_interval == 0 or i == len(to_process):
             try:
-                # Indenter le XML pour une meilleure lisibilité
-                def indent(elem, level=0):
-                    indent_str = "\n" + level * "  "
-                    if len(elem):
-                        if not elem.text or not elem.text.strip():
-                            elem.text = indent_str + "  "
-                        if not elem.tail or not elem.tail.strip():
-                            elem.tail = indent_str
-                        for child in elem:
-                            indent(child, level + 1)
-                        if not child.tail or not child.tail.strip():
-                            child.tail = indent_str
-                    else:
-                        if level and (not elem.tail or not elem.tail.strip()):
-                            elem.tail = indent_str
-
                 indent(tree.getroot())
-                tree.write(KANJI_XML_FILE, encoding='utf-8', xml_declaration=True)
+                tree.write(args.xml, encoding='utf-8', xml_declaration=True)
                 print(f"  💾 Sauvegarde ({i}/{len(to_process)})")
             except Exception as e:
                 print(f"  ❌ Erreur sauvegarde: {e}")
 
         # 6. Délai entre les requêtes
-        time.sleep(REQUEST_DELAY)
+        time.sleep(args.delay)
 
         # 7. Afficher la progression périodiquement
         if i % 50 == 0:
             elapsed = time.time() - start_time
             items_per_second = i / elapsed if elapsed > 0 else 0
-            remaining = (len(to_process) - i) * REQUEST_DELAY / 60
+            remaining = (len(to_process) - i) * args.delay / 60
 
             print(f"\n📊 PROGRESSION: {i}/{len(to_process)} ({i/len(to_process)*100:.1f}%)")
             print(f"⏱️  Temps écoulé: {elapsed/60:.1f} min")
@@ -326,7 +375,7 @@ def main():
     # 8. Sauvegarde finale
     print(f"\n💾 Sauvegarde finale...")
     try:
-        tree.write(KANJI_XML_FILE, encoding='utf-8', xml_declaration=True)
+        tree.write(args.xml, encoding='utf-8', xml_declaration=True)
     except Exception as e:
         print(f"❌ Erreur sauvegarde finale: {e}")
 
@@ -341,7 +390,81 @@ def main():
     print(f"  ❌ Erreurs: {error_count}")
     print(f"  📋 Total traité: {len(to_process)}")
     print(f"\n⏱️  Temps total: {total_time/60:.1f} minutes")
-    print(f"📁 Fichier mis à jour: {KANJI_XML_FILE}")
+    print(f"📁 Fichier mis à jour: {args.xml}")
+
+# ============ MODE FLUX ============
+
+def stream_components(args):
+    """
+    Variante de main() pour les gros fichiers : les éléments sont lus un par un (iterparse),
+    enrichis, écrits dans l'ordre dans <xml>.part puis libérés. Le fichier d'origine n'est
+    remplacé qu'à la fin ; une exécution interrompue reprend à la dernière sauvegarde.
+    """
+    print(f"📖 Lecture en flux : {args.xml}")
+    if not os.path.exists(args.xml):
+        print(f"❌ Fichier {args.xml} introuvable!")
+        return
+
+    writer = ElementWriter(args.xml, resume=True)
+
+    # Premier passage : compter les kanjis à traiter, sans rien garder en mémoire
+    total = 0
+    source = ElementStream(args.xml)
+    for index, elem in enumerate(source):
+        if index >= writer.skip:
+            total += sum(1 for kanji_elem in elem.iter('kanji') if missing_components(kanji_elem))
+        source.release(elem)
+    if args.limit is not None:
+        total = min(total, args.limit)
+    print(f"📥 {total} kanji(s) sans composants" + (f" (reprise après {writer.skip} éléments)" if writer.skip else ""))
+    if not total and not writer.skip:
+        print("❌ Aucun kanji à traiter.")
+        return
+    if not confirm_long_run(total, args):
+        return
+
+    counts = {'ok': 0, 'none': 0, 'error': 0}
+    processed = saved = 0
+    start_time = time.time()
+    source = ElementStream(args.xml)
+    for index, elem in enumerate(source):
+        if writer.root is None:
+            writer.open(source.root)
+        if index < writer.skip:
+            source.release(elem)
+            continue
+
+        for kanji_elem in list(elem.iter('kanji')):
+            kanji_char = missing_components(kanji_elem)
+            if not kanji_char or processed >= total:
+                continue
+            processed += 1
+            print(f"\n[{processed}/{total}] {kanji_char}", end="")
+            counts[enrich_kanji(None, kanji_elem, kanji_char)] += 1
+            time.sleep(args.delay)
+
+        tail = elem.tail
+        indent(elem, 1)
+        elem.tail = tail
+        writer.write(elem)
+        source.release(elem)
+
+        if processed - saved >= args.save_interval:
+            writer.checkpoint()
+            saved = processed
+            print(f"  💾 Sauvegarde ({processed}/{total})")
+
+    # Même fin de fichier que indent() sur la racine en mode complet
+    writer.root.tail = "\n"
+    writer.close()
+    total_time = time.time() - start_time
+    print(f"\n{'='*50}")
+    print("✅ TRAITEMENT TERMINÉ")
+    print(f"  ✅ Succès: {counts['ok']}")
+    print(f"  ⚠️  Sans composants: {counts['none']}")
+    print(f"  ❌ Erreurs: {counts['error']}")
+    print(f"\n⏱️  Temps total: {total_time/60:.1f} minutes")
+    print(f"📁 Fichier mis à jour: {args.xml}")
 
 # ============ TEST RAPIDE ============
 
@@ -382,11 +505,5 @@ def test_quick():
 
 # ============ LANCEMENT ============
 if __name__ == "__main__":
-    print("🚀 ENRICHISSEUR DE COMPOSANTS KANJI")
-    print("="*50)
-
-    # Option 1: Test rapide
-    # test_quick()
-
-    # Option 2: Traitement complet
+    # Test rapide : --test ; traitement complet sinon
     main()
\ No newline at end of file
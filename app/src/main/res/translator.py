@@ -2,37 +2,64 @@
 import xml.etree.ElementTree as ET
 import argparse
 import os
-import json
-from deep_translator import GoogleTranslator
 import time
 import sys
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..'))
+from mochi_assets.jsonio import load_json, save_json
+from mochi_assets.ratecontrol import AdaptiveRateController
+from mochi_assets.xmlstream import ElementStream, ElementWriter
+
+STREAM_WINDOW = 500  # significations traduites ensemble en mode --stream avant écriture
+
+class ErrorBudgetExceeded(Exception):
+    pass
+
+class SourceTable:
+    """meanings.xml analysé une seule fois et partagé en lecture seule par toutes les langues"""
+    def __init__(self, source_file):
+        self.source_file = source_file
+        self.tree = ET.parse(source_file)
+        self.root = self.tree.getroot()
+        # (kanji_id, texte) de chaque <meaning>, dans l'ordre du document
+        self.items = [(int(kanji.get('id')), meaning.text)
+                      for kanji in self.root.findall('kanji') for meaning in kanji.findall('meaning')]
 
 class TranslationManager:
-    def __init__(self, source_file, target_lang):
+    def __init__(self, source_file, target_lang, table=None, error_budget=None, output_dir='.', stream=False):
         self.source_file = source_file
         self.target_lang = target_lang
-        self.output_file = f"meanings_{target_lang}.xml"
-        self.progress_file = f"translation_progress_{target_lang}.json"
+        self.output_file = os.path.join(output_dir, f"meanings_{target_lang}.xml")
+        self.progress_file = os.path.join(output_dir, f"translation_progress_{target_lang}.json")
+        self.error_budget = error_budget
         
-        # Charger le fichier XML
-        self.tree = ET.parse(source_file)
-        self.root = self.tree.getroot()
+        # Charger le fichier XML (ou réutiliser la table partagée du mode multi-langues) ;
+        # en mode flux, la source est relue élément par élément et jamais gardée entière
+        self.stream = stream
+        self.table = None if stream else (table or SourceTable(source_file))
+        # Traductions de cette langue : index dans table.items -> texte
+        self.translations = {}
         
-        # Initialiser le traducteur
-        self.translator = GoogleTranslator(source='en', target=target_lang)
+        # Un traducteur par thread, créé au premier lot
+        self.local = threading.local()
         
         # Charger ou initialiser la progression
         self.progress = self.load_progress()
+        if not stream:
+            self.restore_translations()
+    
+    def log(self, message):
+        print(f"[{self.target_lang}] {message}")
     
     def load_progress(self):
         """Charger la progression depuis le fichier"""
-        if os.path.exists(self.progress_file):
-            try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                pass
-        
+        progress = load_json(self.progress_file)
+        if progress:
+            return progress
+
         # Initialisation par défaut
         return {
             'last_kanji_id': 0,
@@ -41,8 +68,24 @@ class TranslationManager:
             'errors': 0
         }
     
+    def restore_translations(self):
+        """Reprise : récupère dans le fichier de sortie les traductions des kanjis déjà terminés"""
+        last_kanji_id = self.progress['last_kanji_id']
+        if not last_kanji_id or not os.path.exists(self.output_file):
+            return
+        previous = {int(kanji.get('id')): [m.text for m in kanji.findall('meaning')]
+                    for kanji in ET.parse(self.output_file).getroot().findall('kanji')}
+        seen = {}
+        for index, (kanji_id, _) in enumerate(self.table.items):
+            if kanji_id > last_kanji_id:
+                continue
+            position = seen[kanji_id] = seen.get(kanji_id, -1) + 1
+            texts = previous.get(kanji_id, [])
+            if position < len(texts):
+                self.translations[index] = texts[position]
+    
     def save_progress(self, kanji_id, total_translated, errors):
-        """Sauvegarder la progression"""
+        """Sauvegarder la progression (en mode flux, la position est tenue par le .part)"""
         self.progress = {
             'last_kanji_id': kanji_id,
             'total_translated': total_translated,
@@ -50,12 +93,10 @@ class TranslationManager:
             'errors': errors
         }
         
-        with open(self.progress_file, 'w', encoding='utf-8') as f:
-            json.dump(self.progress, f, ensure_ascii=False, indent=2)
+        save_json(self.progress_file, self.progress)
     
-    def save_xml(self):
-        """Sauvegarder le fichier XML"""
-        # Mettre à jour la locale
+    def output_locale(self):
+        """Locale écrite dans le fichier traduit"""
         locale_map = {
             'fr': 'fr_FR',
             'es': 'es_ES',
@@ -98,136 +139,277 @@ class TranslationManager:
         }
  
 
-        new_locale = locale_map.get(self.target_lang, f'{self.target_lang}_{self.target_lang.upper()}')
-        self.root.set('locale', new_locale)
+        return locale_map.get(self.target_lang, f'{self.target_lang}_{self.target_lang.upper()}')
+    
+    def save_xml(self):
+        """Sauvegarder le fichier XML"""
+        # Mettre à jour la locale
+        new_locale = self.output_locale()
+        # Copie de la source partagée, complétée avec les traductions de cette langue
+        root = copy.deepcopy(self.table.root)
+        meanings = [meaning for kanji in root.findall('kanji') for meaning in kanji.findall('meaning')]
+        for index, text in list(self.translations.items()):
+            meanings[index].text = text
+        root.set('locale', new_locale)
         
         # Sauvegarder
-        self.tree.write(self.output_file, encoding='utf-8', xml_declaration=True)
+        ET.ElementTree(root).write(self.output_file, encoding='utf-8', xml_declaration=True)
     
-    def translate_batch_with_retry(self, texts, max_retries=3):
-        """Traduire un lot avec réessai en cas d'échec"""
-        for attempt in range(max_retries):
-            try:
-                return self.translator.translate_batch(texts)
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    raise e
-                print(f"Tentative {attempt + 1} échouée, nouvel essai dans {2 ** attempt} secondes...")
-                time.sleep(2 ** attempt)  # Attente exponentielle
-        return None
+    def translate_texts(self, texts):
+        """Traduire un lot (appelé depuis les threads du contrôleur : un traducteur par thread)"""
+        translator = getattr(self.local, 'translator', None)
+        if translator is None:
+            from deep_translator import GoogleTranslator
+            translator = self.local.translator = GoogleTranslator(source='en', target=self.target_lang)
+        return translator.translate_batch(texts)
     
-    def run(self, save_interval=10, batch_size=30):
+    def run(self, save_interval=10, batch_size=30, max_concurrency=4, target_latency=5.0):
         """Exécuter la traduction"""
+        if self.stream:
+            return self.run_stream(batch_size, max_concurrency, target_latency)
         # Collecter tous les textes et éléments à traduire
-        all_items = []
-        
-        for kanji in self.root.findall('kanji'):
-            kanji_id = int(kanji.get('id'))
-            # Si nous avons déjà traduit ce kanji (reprise)
-            if kanji_id <= self.progress['last_kanji_id']:
-                continue
-                
-            for meaning in kanji.findall('meaning'):
-                all_items.append({
-                    'kanji_id': kanji_id,
-                    'meaning': meaning,
-                    'text': meaning.text
-                })
+        # Si nous avons déjà traduit ce kanji (reprise)
+        all_items = [{'index': index, 'kanji_id': kanji_id, 'text': text}
+                     for index, (kanji_id, text) in enumerate(self.table.items)
+                     if kanji_id > self.progress['last_kanji_id']]
         
         total_items = len(all_items)
-        print(f"Éléments restants à traduire : {total_items}")
+        self.log(f"Éléments restants à traduire : {total_items}")
         
         if total_items == 0:
-            print("Tout est déjà traduit !")
-            return
+            self.log("Tout est déjà traduit !")
+            return True
         
-        # Traduire par lots
-        translated_count = self.progress['total_translated']
-        errors = self.progress['errors']
+        # Lots, parallélisme et pauses ajustés en continu (AIMD) selon latence et erreurs
+        self.rate = AdaptiveRateController(batch_size=batch_size, max_batch=max(batch_size, 100),
+                                           max_concurrency=max_concurrency, target_latency=target_latency)
+        translated_count = initial_translated = self.progress['total_translated']
+        errors = initial_errors = self.progress['errors']
+        grand_total = total_items + translated_count
+        finished = [False] * total_items
+        frontier = 0
+        batches = 0
         
-        for i in range(0, total_items, batch_size):
-            batch = all_items[i:i+batch_size]
-            batch_texts = [item['text'] for item in batch]
-            
-            try:
-                # Traduire le lot
-                translations = self.translate_batch_with_retry(batch_texts)
-                
-                # Mettre à jour les éléments
-                for item, translation in zip(batch, translations):
-                    item['meaning'].text = translation
-                
-                translated_count += len(batch)
-                last_kanji_id = batch[-1]['kanji_id']
-                
-                # Sauvegarder périodiquement
-                if (i // batch_size) % save_interval == 0 or i + batch_size >= total_items:
-                    print(f"Progression : {translated_count}/{total_items + self.progress['total_translated']} | "
-                          f"Dernier kanji : {last_kanji_id} | Erreurs : {errors}")
-                    
-                    self.save_xml()
-                    self.save_progress(last_kanji_id, translated_count, errors)
-                    print(f"Sauvegarde effectuée à {time.strftime('%H:%M:%S')}")
-                
-                # Pause pour éviter les limites d'API
-                time.sleep(2)
-                
-            except Exception as e:
-                print(f"Erreur sur le lot {i//batch_size} : {e}")
-                errors += len(batch)
-                
-                # Sauvegarder l'état actuel en cas d'erreur
-                if i > 0:
-                    last_kanji_id = batch[0]['kanji_id'] - 1  # Retour au lot précédent
-                    self.save_xml()
-                    self.save_progress(last_kanji_id, translated_count, errors)
-                
-                print("Pause de 30 secondes avant de réessayer...")
-                time.sleep(30)
+        def checkpoint():
+            # Les lots finissent dans le désordre : on ne reprend qu'après le dernier kanji
+            # dont toutes les significations précédentes sont terminées
+            nonlocal frontier
+            while frontier < total_items and finished[frontier]:
+                frontier += 1
+            if frontier == 0:
+                return
+            last_kanji_id = all_items[frontier]['kanji_id'] - 1 if frontier < total_items else all_items[-1]['kanji_id']
+            self.log(f"Progression : {translated_count}/{grand_total} | "
+                     f"Dernier kanji : {last_kanji_id} | Erreurs : {errors}")
+            self.log(f"Débit : {self.rate.status()}")
+            self.save_xml()
+            # Seules les significations avant la frontière sont acquises : le reste sera retraduit
+            self.save_progress(last_kanji_id, initial_translated + frontier, errors)
+            self.log(f"Sauvegarde effectuée à {time.strftime('%H:%M:%S')}")
+        
+        def on_done(start, batch, translations):
+            nonlocal translated_count, batches
+            # Mettre à jour les éléments
+            for item, translation in zip(batch, translations):
+                self.translations[item['index']] = translation
+            finished[start:start + len(batch)] = [True] * len(batch)
+            translated_count += len(batch)
+            batches += 1
+            # Sauvegarder périodiquement
+            if batches % save_interval == 0:
+                checkpoint()
+        
+        def on_error(start, batch, e):
+            nonlocal errors
+            self.log(f"Erreur sur les kanjis {batch[0]['kanji_id']}-{batch[-1]['kanji_id']} : {e}")
+            errors += len(batch)
+            # Lot non marqué terminé : la sauvegarde s'arrête avant lui et une reprise le retente
+            # Budget propre à chaque langue : les autres flux continuent
+            if self.error_budget is not None and errors - initial_errors > self.error_budget:
+                raise ErrorBudgetExceeded(f"{errors - initial_errors} erreurs (budget: {self.error_budget})")
+        
+        try:
+            self.rate.run(all_items, lambda batch: self.translate_texts([item['text'] for item in batch]),
+                          on_done, on_error)
+        except ErrorBudgetExceeded as e:
+            checkpoint()
+            self.log(f"Arrêt de cette langue : {e}. Utilisez --resume pour reprendre.")
+            return False
+        
+        if not all(finished):
+            checkpoint()
+            self.log(f"{finished.count(False)} significations en échec. Utilisez --resume pour les retenter.")
+            return False
         
         # Sauvegarde finale
         self.save_xml()
         self.save_progress(0, translated_count, errors)  # 0 indique la fin
         
-        print(f"Traduction terminée !")
-        print(f"Total traduit : {translated_count}")
-        print(f"Erreurs : {errors}")
-        print(f"Fichier sauvegardé : {self.output_file}")
+        self.log(f"Traduction terminée !")
+        self.log(f"Total traduit : {translated_count}")
+        self.log(f"Erreurs : {errors}")
+        self.log(f"Fichier sauvegardé : {self.output_file}")
         
         # Supprimer le fichier de progression
         if os.path.exists(self.progress_file):
             os.remove(self.progress_file)
+        return True
+    
+    def run_stream(self, batch_size=30, max_concurrency=4, target_latency=5.0):
+        """
+        Traduction en flux : les kanjis sont lus, traduits par fenêtres de STREAM_WINDOW
+        significations, écrits dans l'ordre puis libérés. Chaque fenêtre terminée est une
+        sauvegarde ; une reprise repart de la dernière.
+        """
+        self.rate = AdaptiveRateController(batch_size=batch_size, max_batch=max(batch_size, 100),
+                                           max_concurrency=max_concurrency, target_latency=target_latency)
+        translated_count = self.progress['total_translated']
+        errors = initial_errors = self.progress['errors']
+        source = ElementStream(self.source_file)
+        writer = ElementWriter(self.output_file, resume=bool(self.progress['last_kanji_id']))
+        if writer.skip:
+            self.log(f"Reprise après {writer.skip} éléments déjà écrits (kanji {self.progress['last_kanji_id']})")
+        window, meanings = [], []
+        failed = []  # significations de la fenêtre courante en échec
+        
+        def on_done(start, batch, translations):
+            for meaning, translation in zip(batch, translations):
+                meaning.text = translation
+        
+        def on_error(start, batch, e):
+            nonlocal errors
+            self.log(f"Erreur sur {len(batch)} significations : {e}")
+            errors += len(batch)
+            failed.extend(batch)
+            if self.error_budget is not None and errors - initial_errors > self.error_budget:
+                raise ErrorBudgetExceeded(f"{errors - initial_errors} erreurs (budget: {self.error_budget})")
+        
+        def flush():
+            """Traduit et écrit la fenêtre ; False si une signification a échoué (rien n'est alors écrit)"""
+            nonlocal translated_count
+            self.rate.run(meanings, lambda batch: self.translate_texts([m.text for m in batch]), on_done, on_error)
+            if failed:
+                # Fenêtre ni écrite ni sauvegardée : une reprise repart de la précédente et la retente
+                self.log(f"{len(failed)} significations en échec. Utilisez --resume pour les retenter.")
+                return False
+            translated_count += len(meanings)
+            kanji_ids = [int(e.get('id')) for e in window if e.tag == 'kanji']
+            for elem in window:
+                writer.write(elem)
+                source.release(elem)
+            writer.checkpoint()
+            if kanji_ids:
+                self.save_progress(kanji_ids[-1], translated_count, errors)
+            self.log(f"Progression : {translated_count} traduits | Dernier kanji : {self.progress['last_kanji_id']} | "
+                     f"Erreurs : {errors} | {self.rate.status()}")
+            window.clear()
+            meanings.clear()
+            return True
+        
+        try:
+            for index, elem in enumerate(source):
+                if writer.root is None:
+                    writer.open(source.root, {**source.root.attrib, 'locale': self.output_locale()})
+                if index < writer.skip:
+                    source.release(elem)
+                    continue
+                window.append(elem)
+                if elem.tag == 'kanji':
+                    meanings.extend(m for m in elem.findall('meaning') if m.text)
+                if len(meanings) >= STREAM_WINDOW and not flush():
+                    return False
+            if writer.root is None:
+                writer.open(source.root, {**source.root.attrib, 'locale': self.output_locale()})
+            if not flush():
+                return False
+        except ErrorBudgetExceeded as e:
+            self.log(f"Arrêt de cette langue : {e}. Utilisez --resume pour reprendre.")
+            return False
+        
+        writer.close()
+        self.save_progress(0, translated_count, errors)
+        self.log(f"Traduction terminée ! Total traduit : {translated_count} | Erreurs : {errors}")
+        self.log(f"Fichier sauvegardé : {self.output_file}")
+        if os.path.exists(self.progress_file):
+            os.remove(self.progress_file)
+        return True
 
 def main():
-    parser = argparse.ArgumentParser(description='Traduire le fichier meanings.xml vers une autre langue')
-    parser.add_argument('lang', help='Code de langue cible (ex: fr, es, de, it, etc.)')
+    parser = argparse.ArgumentParser(description='Traduire le fichier meanings.xml vers une ou plusieurs langues')
+    parser.add_argument('lang', nargs='?', help='Code de langue cible (ex: fr, es, de, it, etc.)')
+    parser.add_argument('--langs', help='Plusieurs langues traduites en parallèle (ex: fr,es,de)')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Nombre de langues traduites simultanément (avec --langs)')
+    parser.add_argument('--error-budget', type=int, default=None,
+                       help="Nombre d'éléments en erreur tolérés par langue avant de l'arrêter")
     parser.add_argument('--save-interval', type=int, default=10, 
                        help='Intervalle de sauvegarde (en lots)')
     parser.add_argument('--batch-size', type=int, default=30,
-                       help='Taille des lots de traduction')
+                       help='Taille initiale des lots de traduction (ajustée ensuite)')
+    parser.add_argument('--max-concurrency', type=int, default=4,
+                       help='Nombre maximal de lots traduits en parallèle')
+    parser.add_argument('--target-latency', type=float, default=5.0,
+                       help='Latence par lot (s) au-delà de laquelle les lots sont réduits')
     parser.add_argument('--resume', action='store_true',
                        help='Reprendre la traduction à partir de la dernière sauvegarde')
+    parser.add_argument('--restart', action='store_true',
+                       help='Supprimer la progression existante sans demander confirmation')
+    parser.add_argument('--source', default='meanings.xml', help='Fichier XML source')
+    parser.add_argument('--output-dir', default='.', help='Dossier des fichiers traduits et de progression')
+    parser.add_argument('--stream', action='store_true',
+                       help='Lecture et écriture en flux : mémoire bornée quelle que soit la taille de la source')
     
     args = parser.parse_args()
+    langs = [l for l in (args.langs or '').split(',') if l] or ([args.lang] if args.lang else [])
+    if not langs:
+        parser.error("indiquez une langue ou --langs")
     
     # Vérifier si le fichier source existe
-    if not os.path.exists('meanings.xml'):
-        print("Erreur : fichier 'meanings.xml' introuvable")
+    if not os.path.exists(args.source):
+        print(f"Erreur : fichier '{args.source}' introuvable")
         sys.exit(1)
+    os.makedirs(args.output_dir, exist_ok=True)
     
-    # Créer le gestionnaire de traduction
-    manager = TranslationManager('meanings.xml', args.lang)
+    # Source analysée une seule fois, partagée par tous les gestionnaires (relue en flux par chacun avec --stream)
+    table = None if args.stream else SourceTable(args.source)
+    managers = [TranslationManager(args.source, lang, table=table, error_budget=args.error_budget,
+                                   output_dir=args.output_dir, stream=args.stream)
+                for lang in dict.fromkeys(langs)]
     
-    # Vérifier si on veut reprendre ou recommencer
-    if not args.resume and os.path.exists(manager.progress_file):
-        response = input("Une progression existante a été trouchée. Voulez-vous la supprimer et recommencer ? (o/N) ")
+    # Vérifier si on veut reprendre ou recommencer (sans terminal, on reprend sans demander)
+    existing = [m for m in managers if os.path.exists(m.progress_file)]
+    if not args.resume and existing:
+        names = ', '.join(m.target_lang for m in existing)
+        if args.restart:
+            response = 'o'
+        elif sys.stdin.isatty():
+            response = input(f"Une progression existante a été trouvée ({names}). Voulez-vous la supprimer et recommencer ? (o/N) ")
+        else:
+            response = 'n'
+            print(f"Progression existante reprise ({names}) ; --restart pour recommencer")
         if response.lower() == 'o':
-            os.remove(manager.progress_file)
-            manager.progress = manager.load_progress()  # Recharger avec valeurs par défaut
+            for manager in existing:
+                os.remove(manager.progress_file)
+                manager.progress = manager.load_progress()  # Recharger avec valeurs par défaut
+                manager.translations = {}
+    
+    def run_one(manager):
+        return manager.run(save_interval=args.save_interval, batch_size=args.batch_size,
+                           max_concurrency=args.max_concurrency, target_latency=args.target_latency)
     
     # Exécuter la traduction
     try:
-        manager.run(save_interval=args.save_interval, batch_size=args.batch_size)
+        if len(managers) == 1:
+            run_one(managers[0])
+            return
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = {pool.submit(run_one, manager): manager.target_lang for manager in managers}
+        for future, lang in futures.items():
+            try:
+                status = "terminée" if future.result() else "incomplète (erreurs), --resume pour reprendre"
+            except Exception as e:
+                status = f"erreur fatale : {e}"
+            print(f"  [{lang}] {status}")
     except KeyboardInterrupt:
         print("\nTraduction interrompue par l'utilisateur")
         print("La progression a été sauvegardée. Utilisez --resume pour reprendre.")
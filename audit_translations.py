@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+import os
+import sys
+import glob
+import time
+import argparse
+import xml.etree.ElementTree as ET
+from mochi_assets.jsonio import load_json, save_json
+
+# Configuration
+FILES_DIR = 'shared/src/commonMain/composeResources/files'
+RESOURCES_DIR = 'shared/src/commonMain/composeResources'
+KANJI_DETAILS_FILE = os.path.join(FILES_DIR, 'kanji/kanji_details.json')
+MERGED_FILE = os.path.join(FILES_DIR, 'words/merged_wordlist.json')
+KANJI_PATTERN = os.path.join(FILES_DIR, 'meanings/meanings_*.json')
+WORDS_PATTERN = os.path.join(FILES_DIR, 'words/meanings/word_meanings_*.json')
+BASE_STRINGS_FILE = os.path.join(RESOURCES_DIR, 'values/strings.xml')
+STRINGS_PATTERN = os.path.join(RESOURCES_DIR, 'values-*/strings.xml')
+REFERENCE_LOCALE = 'en_rGB'
+
+# ============ CHARGEMENT ============
+# Chaque langue devient un dict {id: valeur} sans les valeurs vides, les listes de sens en tuples
+# (hashables et ignorés par le ramasse-miettes). Couvertures : opérations d'ensembles sur les clés ;
+# copies : intersection de vues items(), qui cherche chaque clé puis compare avec ==, sans ensemble de paires.
+
+def _values(entries):
+    values = {e['@id']: e['meaning'] for e in entries if e.get('meaning')}
+    for k, v in values.items():
+        if isinstance(v, list):
+            values[k] = tuple(v)
+    return values
+
+def _locale_from(path, prefix):
+    return os.path.basename(path)[len(prefix):-len('.json')]
+
+def load_kanji():
+    """{locale: {id: sens}} ; IDs de référence : kanji_details s'il existe, sinon le fichier anglais"""
+    locales = {}
+    reference = set()
+    for path in glob.glob(KANJI_PATTERN):
+        data = load_json(path) or {}
+        entries = data.get('meanings', {}).get('kanji', [])
+        locale = _locale_from(path, 'meanings_')
+        locales[locale] = _values(entries)
+        if locale == REFERENCE_LOCALE:
+            reference = {e['@id'] for e in entries}
+    details = load_json(KANJI_DETAILS_FILE)
+    if details:
+        reference = {str(k['id']) for k in details['kanji_details']['kanji']}
+    return reference, locales, locales.get(REFERENCE_LOCALE, {})
+
+def load_words():
+    locales = {}
+    reference = set()
+    for path in glob.glob(WORDS_PATTERN):
+        data = load_json(path) or {}
+        entries = data.get('word_meanings', {}).get('entries', [])
+        locale = _locale_from(path, 'word_meanings_')
+        locales[locale] = _values(entries)
+        if locale == REFERENCE_LOCALE:
+            reference = {e['@id'] for e in entries}
+    merged = load_json(MERGED_FILE)
+    if merged:
+        reference = {w['id'] for w in merged['words']}
+        # Une « traduction » identique au mot japonais n'en est pas une
+        source = {w['id']: w['text'] for w in merged['words']}
+    else:
+        source = {}
+    english = locales.get(REFERENCE_LOCALE, {})
+    return reference, locales, english, source
+
+def load_strings():
+    def read(path):
+        strings = [s for s in ET.parse(path).getroot().findall('string') if s.get('translatable') != 'false']
+        return {s.get('name') for s in strings}, {s.get('name'): s.text.strip() for s in strings
+                                                  if s.text and s.text.strip()}
+    reference, base = read(BASE_STRINGS_FILE)
+    locales = {}
+    for path in glob.glob(STRINGS_PATTERN):
+        locale = os.path.basename(os.path.dirname(path))[len('values-'):].replace('-r', '_r')
+        locales[locale] = read(path)[1]
+    return reference, locales, base
+
+# ============ AUDIT ============
+
+def audit(reference, locales, copies_of):
+    """
+    {locale: {'missing', 'untranslated', 'orphans': set d'IDs, 'total': n}}.
+    copies_of: liste de dicts {id: valeur} ; une valeur identique à l'un d'eux est une copie non traduite.
+    """
+    report = {}
+    for locale, values in locales.items():
+        untranslated = set()
+        if locale != REFERENCE_LOCALE:
+            for candidates in copies_of:
+                untranslated.update(k for k, _ in values.items() & candidates.items())
+        report[locale] = {
+            'missing': reference - values.keys(),
+            'untranslated': untranslated & reference,
+            'orphans': values.keys() - reference,
+            'total': len(reference),
+        }
+    return report
+
+def percent(part, total):
+    return part * 100 / total if total else 0.0
+
+def print_matrix(reports):
+    datasets = list(reports)
+    locales = sorted({l for r in reports.values() for l in r})
+    header = f"{'Langue':<8}" + ''.join(f" | {name:^26}" for name in datasets)
+    sub = f"{'':<8}" + ''.join(f" | {'manq.':>8} {'copies':>8} {'orph.':>7}" for _ in datasets)
+    print(header)
+    print(sub)
+    print('-' * len(sub))
+    for locale in locales:
+        row = f"{locale:<8}"
+        for name in datasets:
+            r = reports[name].get(locale)
+            if r is None:
+                row += f" | {'absent':>26}"
+                continue
+            row += (f" | {percent(len(r['missing']), r['total']):7.1f}% {percent(len(r['untranslated']), r['total']):7.1f}%"
+                    f" {len(r['orphans']):>7}")
+        print(row)
+
+def sample(ids, n=10):
+    return sorted(ids, key=lambda k: (len(k), k))[:n]
+
+def main():
+    parser = argparse.ArgumentParser(description='Audit de couverture et de cohérence des traductions')
+    parser.add_argument('--max-missing', type=float, default=None, help='%% maximal d\'IDs manquants par langue')
+    parser.add_argument('--max-untranslated', type=float, default=None, help='%% maximal de copies non traduites')
+    parser.add_argument('--no-orphans', action='store_true', help='Échoue si une langue contient des IDs inconnus')
+    parser.add_argument('--only', default='kanji,words,strings', help='Jeux de données audités')
+    parser.add_argument('--details', default=None, help='Liste des IDs en défaut pour ces langues (ex: ua_rUA)')
+    parser.add_argument('--json', default=None, help='Écrit le rapport complet (IDs compris) dans ce fichier')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    only = args.only.split(',')
+    reports = {}
+    if 'kanji' in only:
+        reference, locales, english = load_kanji()
+        reports['kanji'] = audit(reference, locales, [english])
+    if 'words' in only:
+        reference, locales, english, source = load_words()
+        reports['words'] = audit(reference, locales, [english, source])
+    if 'strings' in only:
+        reference, locales, base = load_strings()
+        reports['strings'] = audit(reference, locales, [base])
+    elapsed = time.perf_counter() - t0
+
+    print_matrix(reports)
+    print(f"\nAudit en {elapsed * 1000:.0f} ms (manq. = manquants, copies = identiques à la source, orph. = IDs inconnus)")
+
+    if args.details:
+        for locale in args.details.split(','):
+            for name, report in reports.items():
+                r = report.get(locale)
+                if not r: continue
+                for kind in ('missing', 'untranslated', 'orphans'):
+                    if r[kind]:
+                        print(f"  {name}/{locale} {kind} ({len(r[kind])}): {', '.join(sample(r[kind]))}"
+                              + (" ..." if len(r[kind]) > 10 else ""))
+
+    if args.json:
+        save_json(args.json, {name: {locale: {k: sorted(v) if isinstance(v, set) else v for k, v in r.items()}
+                                     for locale, r in sorted(report.items())}
+                              for name, report in reports.items()}, sort_keys=True)
+
+    failures = []
+    for name, report in reports.items():
+        for locale, r in sorted(report.items()):
+            if args.max_missing is not None and percent(len(r['missing']), r['total']) > args.max_missing:
+                failures.append(f"{name}/{locale}: {len(r['missing'])} manquants")
+            if args.max_untranslated is not None and percent(len(r['untranslated']), r['total']) > args.max_untranslated:
+                failures.append(f"{name}/{locale}: {len(r['untranslated'])} non traduits")
+            if args.no_orphans and r['orphans']:
+                failures.append(f"{name}/{locale}: {len(r['orphans'])} orphelins")
+    if failures:
+        print(f"\n❌ {len(failures)} seuil(s) dépassé(s):")
+        for f in failures: print(f"  {f}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 #!/usr/bin/python3
 import os
-import json
 import time
 import glob
-from deep_translator import GoogleTranslator
+import argparse
+from mochi_assets import jsonio
+from mochi_assets.jsonio import load_json, load_kanji_details
 
 # Configuration
 KANJI_DETAILS_FILE = 'shared/src/commonMain/composeResources/files/kanji/kanji_details.json'
@@ -17,44 +18,64 @@ LANG_MAP = {
     'th_rTH': 'th', 'ua_rUA': 'uk', 'vi_rVN': 'vi', 'zh_rCN': 'zh-CN'
 }
 
-def load_json(file_path):
-    if not os.path.exists(file_path): return None
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Erreur chargement {file_path}: {e}")
-        return None
-
 def save_json(file_path, data):
     try:
         data['meanings']['kanji'].sort(key=lambda x: int(x['@id']))
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        jsonio.save_json(file_path, data)
     except Exception as e:
         print(f"Erreur sauvegarde {file_path}: {e}")
 
+def meaning_list(value):
+    """'meaning' est une chaîne ou une liste, qui peut contenir des {} (éléments XML vides)"""
+    values = [value] if isinstance(value, str) else (value or [])
+    return [m for m in values if isinstance(m, str)]
+
+def needs_translation(source_entry, target_entry):
+    """Pas encore traduit : absent, vide ou identique à l'anglais"""
+    t_list = meaning_list(target_entry.get('meaning')) if target_entry else []
+    return not t_list or t_list == meaning_list(source_entry.get('meaning'))
+
+def translate_meaning(char, s_list, translator_ja, translator_en):
+    """Sens principal traduit depuis le kanji, complété par les sens anglais traduits"""
+    main_m = translator_ja.translate(char)
+    trans_en_text = translator_en.translate("\n".join(s_list))
+    trans_en_list = trans_en_text.split("\n") if trans_en_text else []
+    
+    new_m = []
+    if main_m and main_m != char: new_m.append(main_m.strip().capitalize())
+    for m in trans_en_list:
+        m = m.strip().capitalize()
+        if m and m not in new_m: new_m.append(m)
+    
+    return new_m if len(new_m) > 1 else (new_m[0] if new_m else "")
+
 def main():
+    parser = argparse.ArgumentParser(description='Traduit les sens des kanjis depuis meanings_en_rGB.json')
+    parser.add_argument('--kanji-details', default=KANJI_DETAILS_FILE, help='kanji_details.json de référence')
+    parser.add_argument('--source', default=SOURCE_MEANINGS_FILE, help='Sens anglais de référence')
+    parser.add_argument('--targets', default=TARGET_FILES_PATTERN, help='Motif des fichiers de langue')
+    parser.add_argument('--locales', default=None, help='Langues à traiter (ex: fr_rFR,de_rDE)')
+    parser.add_argument('--delay', type=float, default=0.2, help='Pause entre deux kanjis (secondes)')
+    args = parser.parse_args()
+    from deep_translator import GoogleTranslator
     print("--- Démarrage de la traduction des Kanjis ---")
-    kanji_details = load_json(KANJI_DETAILS_FILE)
-    if not kanji_details: return
+    if not os.path.exists(args.kanji_details): return
 
     # Indexation id -> character
-    kanji_map = {}
-    for k in kanji_details.get('kanji_details', {}).get('kanji', []):
-        kanji_map[str(k['id'])] = k['character']
-    print(f"Indexés: {len(kanji_map)} kanjis de référence (depuis kanji_details.json)")
+    kanji_map = {k.id: k.character for k in load_kanji_details(args.kanji_details)}
+    print(f"Indexés: {len(kanji_map)} kanjis de référence (depuis {args.kanji_details})")
 
-    source_data = load_json(SOURCE_MEANINGS_FILE)
+    source_data = load_json(args.source)
     if not source_data: return
     source_kanjis = source_data['meanings']['kanji']
-    print(f"Source: {len(source_kanjis)} kanjis à traiter (depuis meanings_en_rGB.json)")
+    print(f"Source: {len(source_kanjis)} kanjis à traiter (depuis {args.source})")
+    only = set(args.locales.split(',')) if args.locales else None
 
-    for target_file in glob.glob(TARGET_FILES_PATTERN):
+    for target_file in glob.glob(args.targets):
         if 'en_rGB' in target_file: continue
         locale = os.path.basename(target_file).replace('meanings_', '').replace('.json', '')
         lang = LANG_MAP.get(locale)
-        if not lang: continue
+        if not lang or (only and locale not in only): continue
             
         print(f"\nLangue: {locale} ({lang})")
         target_data = load_json(target_file) or {"meanings": {"@locale": locale, "kanji": []}}
@@ -72,32 +93,17 @@ def main():
             if not char:
                 continue
 
-            s_meaning_val = s_kanji.get('meaning', [])
-            s_list = [s_meaning_val] if isinstance(s_meaning_val, str) else s_meaning_val
-            
+            s_list = meaning_list(s_kanji.get('meaning'))
             t_entry = existing.get(k_id)
             
             # RAISON DU SAUT 2: Déjà traduit (valeur différente de l'anglais)
-            if t_entry:
-                t_val = t_entry.get('meaning', [])
-                t_list = [t_val] if isinstance(t_val, str) else t_val
-                if t_list and t_list != s_list:
-                    continue
+            if not needs_translation(s_kanji, t_entry):
+                continue
 
             # TRADUCTION
             try:
                 print(f"    Traduction ID {k_id} ({char})... ", end='', flush=True)
-                main_m = translator_ja.translate(char)
-                trans_en_text = translator_en.translate("\n".join(s_list))
-                trans_en_list = trans_en_text.split("\n") if trans_en_text else []
-                
-                new_m = []
-                if main_m and main_m != char: new_m.append(main_m.strip().capitalize())
-                for m in trans_en_list:
-                    m = m.strip().capitalize()
-                    if m and m not in new_m: new_m.append(m)
-                
-                final_val = new_m if len(new_m) > 1 else (new_m[0] if new_m else "")
+                final_val = translate_meaning(char, s_list, translator_ja, translator_en)
                 if not t_entry:
                     target_data['meanings']['kanji'].append({"@id": k_id, "meaning": final_val})
                     existing[k_id] = target_data['meanings']['kanji'][-1]
@@ -111,10 +117,10 @@ def main():
                     save_json(target_file, target_data)
                     print(f"    [Checkpoint] {updates} kanjis sauvegardés...")
                 
-                time.sleep(0.2)
+                time.sleep(args.delay)
             except Exception as e:
                 print(f"ERREUR: {e}")
-                time.sleep(0.2)
+                time.sleep(args.delay)
 
         if updates > 0:
             save_json(target_file, target_data)
@@ -2,8 +2,8 @@
 import os
 import xml.etree.ElementTree as ET
 import glob
-from deep_translator import GoogleTranslator
 import time
+import argparse
 
 # Configuration
 SOURCE_FILE = 'shared/src/commonMain/composeResources/values/strings.xml'
@@ -50,14 +50,25 @@ def load_xml_as_dict(file_path):
         return None, None, {}
 
 def main():
-    print(f"Chargement de la source ({SOURCE_LANG}): {SOURCE_FILE}")
-    _, _, source_data = load_xml_as_dict(SOURCE_FILE)
+    parser = argparse.ArgumentParser(description='Traduit les chaînes restées identiques à la source (strings.xml)')
+    parser.add_argument('--source', default=SOURCE_FILE, help='strings.xml de référence')
+    parser.add_argument('--targets', default=TARGET_DIRS_PATTERN, help='Motif des dossiers values-* cibles')
+    parser.add_argument('--locales', default=None, help='Dossiers à traiter (ex: values-fr-rFR,values-de-rDE)')
+    parser.add_argument('--delay', type=float, default=0.2, help='Pause entre deux appels (secondes)')
+    args = parser.parse_args()
+    from deep_translator import GoogleTranslator
+
+    print(f"Chargement de la source ({SOURCE_LANG}): {args.source}")
+    _, _, source_data = load_xml_as_dict(args.source)
     
-    target_dirs = glob.glob(TARGET_DIRS_PATTERN)
+    target_dirs = glob.glob(args.targets)
+    only = set(args.locales.split(',')) if args.locales else None
     
     for target_dir in target_dirs:
         dir_name = os.path.basename(target_dir)
         target_lang = LANG_MAP.get(dir_name)
+        if only and dir_name not in only:
+            continue
         
         if not target_lang:
             print(f"Skipping {dir_name} (Langue non reconnue dans le mapping)")
@@ -119,7 +130,7 @@ def main():
                     print(" Ignoré (identique ou vide)")
                 
                 # Petit délai pour éviter le rate limit
-                time.sleep(0.2)
+                time.sleep(args.delay)
                 
             except Exception as e:
                 print(f" ERREUR: {e}")
@@ -1,14 +1,16 @@
 #!/usr/bin/python3
 import os
-import json
 import time
-import shutil
-from deep_translator import GoogleTranslator
+import argparse
+from mochi_assets.jsonio import load_json, load_wordlist, save_json
+from mochi_assets.ratecontrol import AdaptiveRateController
+from mochi_assets.priority import CHECKPOINTS, LEVELS_FILE, checkpoint_sizes, coverage, prioritize
 
 # Configuration
 MERGED_FILE = 'shared/src/commonMain/composeResources/files/words/merged_wordlist.json'
 OUTPUT_DIR = 'shared/src/commonMain/composeResources/files/words/meanings'
 BATCH_SIZE = 50 
+COVERAGE_FILE = 'translation_cache/words_coverage.json'
 
 LANG_MAP = {
     #'ar_rSA': 'ar',
@@ -18,59 +20,78 @@ LANG_MAP = {
     'th_rTH': 'th', 'ua_rUA': 'uk', 'vi_rVN': 'vi', 'zh_rCN': 'zh-CN'
 }
 
-def load_json(file_path):
-    if not os.path.exists(file_path): return None
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-            if not content: return None
-            return json.loads(content)
-    except Exception as e:
-        # On lève une erreur si le fichier est corrompu pour éviter d'écraser l'existant
-        raise Exception(f"ERREUR LECTURE (Fichier corrompu ?) {file_path}: {e}")
-
 def save_json_atomic(file_path, data):
     """Sauvegarde sécurisée : écrit dans un .tmp puis renomme"""
-    temp_file = file_path + ".tmp"
     try:
         # Tri systématique par ID pour la cohérence Git
         data['word_meanings']['entries'].sort(key=lambda x: int(x['@id']))
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        shutil.move(temp_file, file_path)
+        save_json(file_path, data, atomic=True)
     except Exception as e:
-        if os.path.exists(temp_file): os.remove(temp_file)
         print(f"Erreur sauvegarde {file_path}: {e}")
 
+def publish_coverage(ordered_ids, datas, checkpoints, step):
+    """Écrit la couverture de chaque langue par palier de priorité (les fichiers de langue sont déjà à jour)"""
+    checkpoint = checkpoints[step]
+    report = {"checkpoint": checkpoint, "total": len(ordered_ids), "locales": {}}
+    for locale, data in sorted(datas.items()):
+        done_ids = {str(m['@id']) for m in data['word_meanings']['entries']}
+        report["locales"][locale] = {"translated": len(done_ids), "coverage": coverage(ordered_ids, done_ids, checkpoints)}
+    save_json(COVERAGE_FILE, report, atomic=True)
+    worst = min((r["coverage"][f"{checkpoint:g}"] for r in report["locales"].values()), default=1.0)
+    print(f"\n=== Palier {checkpoint:.0%} publié: couverture minimale des mots de tête {worst:.1%} -> {COVERAGE_FILE} ===")
+
+def format_meaning(text):
+    return text.strip().capitalize()
+
 def main():
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+    parser = argparse.ArgumentParser(description='Traduit les mots par ordre de priorité, palier par palier')
+    parser.add_argument('--until', type=float, default=CHECKPOINTS[-1],
+                        help='Arrête après ce palier (ex: 0.2 = les 20%% de mots les plus utiles)')
+    parser.add_argument('--merged', default=MERGED_FILE, help='merged_wordlist.json source')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='Dossier des word_meanings_<langue>.json')
+    parser.add_argument('--levels', default=LEVELS_FILE, help='levels.json utilisé pour les priorités')
+    parser.add_argument('--locales', default=None, help='Langues à traiter (ex: fr_rFR,de_rDE)')
+    args = parser.parse_args()
+    from deep_translator import GoogleTranslator
+
+    if not os.path.exists(args.output_dir):
+        os.makedirs(args.output_dir)
 
-    merged_data = load_json(MERGED_FILE)
-    if not merged_data: 
-        print(f"Erreur: {MERGED_FILE} introuvable.")
+    if not os.path.exists(args.merged):
+        print(f"Erreur: {args.merged} introuvable.")
         return
-    words = merged_data.get('words', [])
+    # Rang BCCWJ, niveau JLPT et niveaux activés de levels.json, pas l'ordre des IDs
+    ordered = prioritize(load_wordlist(args.merged), load_json(args.levels))
+    ordered_ids = [w.id for w in ordered]
+    position = {word_id: i for i, word_id in enumerate(ordered_ids)}
+    checkpoints = [f for f in CHECKPOINTS if f < args.until] + [args.until]
+    limits = checkpoint_sizes(len(ordered), checkpoints)
 
     # Phase 1 : Initialisation de l'état de chaque langue
+    datas = {}
     states = {}
+    only = set(args.locales.split(',')) if args.locales else None
     for locale, target_lang in LANG_MAP.items():
-        out_file = os.path.join(OUTPUT_DIR, f'word_meanings_{locale}.json')
+        if only and locale not in only: continue
+        out_file = os.path.join(args.output_dir, f'word_meanings_{locale}.json')
         
         try:
-            data = load_json(out_file)
+            # On lève une erreur si le fichier est corrompu pour éviter d'écraser l'existant
+            data = load_json(out_file, strict=True)
         except Exception as e:
             print(e)
             return
 
         if not data:
             data = {"word_meanings": {"@locale": locale, "entries": []}}
+        data['word_meanings'].setdefault('entries', [])
+        datas[locale] = data
         
         # On récupère les IDs déjà présents dans CE fichier spécifiquement
-        existing_ids = {str(m['@id']) for m in data['word_meanings'].get('entries', [])}
+        existing_ids = {str(m['@id']) for m in data['word_meanings']['entries']}
         
-        # File d'attente propre à cette langue
-        queue = [w for w in words if str(w['id']) not in existing_ids]
+        # File d'attente propre à cette langue, la plus prioritaire en tête
+        queue = [w for w in ordered if w.id not in existing_ids and position[w.id] < limits[-1]]
         
         if queue:
             states[locale] = {
@@ -79,18 +100,22 @@ def main():
                 "data": data,
                 "queue": queue,
                 "total_initial": len(queue),
-                "translator": GoogleTranslator(source='ja', target=target_lang)
+                "translator": GoogleTranslator(source='ja', target=target_lang),
+                # Taille de lot propre à chaque langue, ajustée selon latence et erreurs
+                "rate": AdaptiveRateController(batch_size=BATCH_SIZE, max_batch=2 * BATCH_SIZE, interval=0.0)
             }
 
     if not states:
         print("Toutes les langues sont déjà à jour.")
         return
 
-    print(f"--- Démarrage Round-Robin ({len(states)} langues à traiter) ---")
+    print(f"--- Démarrage Round-Robin ({len(states)} langues à traiter, paliers {checkpoints}) ---")
 
     round_num = 1
+    step = 0
     while states:
-        print(f"\n--- Round {round_num} ---")
+        limit = limits[step]
+        print(f"\n--- Round {round_num} (palier {checkpoints[step]:.0%}: {limit} mots de tête) ---")
         locales_finished = []
         
         for locale, state in states.items():
@@ -98,38 +123,50 @@ def main():
                 locales_finished.append(locale)
                 continue
             
-            # On prend le prochain bloc de cette langue
-            batch = state["queue"][:BATCH_SIZE]
-            texts = [w['text'] for w in batch]
+            # On prend le prochain bloc de cette langue, sans dépasser le palier en cours
+            batch = [w for w in state["queue"][:state["rate"].batch_size] if position[w.id] < limit]
+            if not batch:
+                continue
+            texts = [w.text for w in batch]
             
             print(f"  [{locale}] {len(texts)} mots... ", end='', flush=True)
             
             try:
                 # Traduction Google
+                state["rate"].wait_turn()
+                t0 = time.monotonic()
                 results = state["translator"].translate_batch(texts)
+                state["rate"].success(len(batch), time.monotonic() - t0)
                 
                 # Ajout des résultats
                 for word_obj, translated_text in zip(batch, results):
                     if translated_text:
                         state["data"]['word_meanings']['entries'].append({
-                            "@id": str(word_obj['id']),
-                            "meaning": translated_text.strip().capitalize()
+                            "@id": word_obj.id,
+                            "meaning": format_meaning(translated_text)
                         })
                 
                 # Mise à jour de la queue locale
-                state["queue"] = state["queue"][BATCH_SIZE:]
+                state["queue"] = state["queue"][len(batch):]
                 
                 # Sauvegarde immédiate du fichier de la langue
                 save_json_atomic(state["out_file"], state["data"])
                 
                 done = state["total_initial"] - len(state["queue"])
-                print(f"OK ({done}/{state['total_initial']})")
+                print(f"OK ({done}/{state['total_initial']}) | {state['rate'].status()}")
                 
             except Exception as e:
                 print(f"ERREUR: {e} (réessaye au prochain round)")
-                # On ne touche pas à la queue en cas d'erreur pour retenter le même bloc
-                time.sleep(2)
+                # On ne touche pas à la queue en cas d'erreur pour retenter le même bloc (réduit)
+                state["rate"].failure(e)
         
+        # Palier atteint quand aucune langue n'a plus de mot sous la limite
+        if all(not s["queue"] or position[s["queue"][0].id] >= limit for s in states.values()):
+            publish_coverage(ordered_ids, datas, checkpoints, step)
+            if step == len(checkpoints) - 1:
+                break
+            step += 1
+
         # Nettoyage des langues terminées
         for l in locales_finished:
             del states[l]
@@ -0,0 +1,301 @@
+#!/usr/bin/python3
+import os
+import sys
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from mochi_assets.jsonio import load_json, save_json
+
+# Configuration
+FILES_DIR = 'shared/src/commonMain/composeResources/files'
+MERGED_FILE = os.path.join(FILES_DIR, 'words/merged_wordlist.json')
+LEVELS_FILE = os.path.join(FILES_DIR, 'levels.json')
+OUTPUT_FILE = os.path.join(FILES_DIR, 'crossword_bank.json')
+FORMAT_VERSION = 1
+GRID_SIZE = 16                                # comme CrosswordGenerator
+WORD_COUNTS = (5, 10, 15, 20, 25, 30, 35, 42)  # paliers du curseur (5..42) : l'app prend le plus proche
+PUZZLES_PER_COUNT = 20
+MODES = ('KANAS', 'KANJIS')
+MIN_LENGTH, MAX_LENGTH = 2, 8
+BRANCHES = 3       # placements essayés à chaque profondeur avant de revenir en arrière
+MAX_CHECKS = 300   # placements examinés par profondeur pour trouver ces branches
+MAX_NODES = 2000   # nœuds par tentative ; au-delà, on repart d'un autre premier mot
+MAX_ATTEMPTS = 30  # tentatives par grille avant d'abandonner
+
+# ============ MOTS (mêmes filtres que CrosswordGenerator) ============
+
+def clean_phonetics(p):
+    """CrosswordGenerator.cleanPhonetics : première variante non vide, sans points ni espaces"""
+    return next((part for part in p.split('/') if part.strip()), '').replace('.', '').replace(' ', '')
+
+def is_pure_kanji(text):
+    return bool(text) and all(0x4E00 <= ord(c) <= 0x9FAF or 0x3400 <= ord(c) <= 0x4DBF for c in text)
+
+def level_pools(levels, words):
+    """{niveau: mots} d'après l'activité READING de levels.json (même filtre que WordRepository.getWordsByConfig)"""
+    pools = {}
+    for section in levels.get('sections', {}).values():
+        for level in section.get('levels', []):
+            config = level.get('activities', {}).get('READING')
+            if not config or config.get('dataFile') != 'merged_wordlist':
+                continue
+            selected = []
+            for w in words:
+                if config.get('jlpt') is not None and w.get('jlpt') != config['jlpt']:
+                    continue
+                if config.get('minRank') is not None or config.get('maxRank') is not None:
+                    rank = int(w['rank']) if str(w.get('rank', '')).isdigit() else None
+                    if rank is None: continue
+                    if config.get('minRank') is not None and rank < config['minRank']: continue
+                    if config.get('maxRank') is not None and rank > config['maxRank']: continue
+                selected.append(w)
+            pools[level['id']] = selected
+    return pools
+
+def candidates(words, mode):
+    """(id, solution) dans l'ordre de la liste ; une solution n'apparaît qu'une fois (l'app retrouve le mot par elle)"""
+    seen = set()
+    result = []
+    for w in words:
+        solution = w['text'] if mode == 'KANJIS' else clean_phonetics(w.get('phonetics', ''))
+        if not MIN_LENGTH <= len(solution) <= MAX_LENGTH: continue
+        if mode == 'KANJIS' and not is_pure_kanji(solution): continue
+        if solution in seen: continue
+        seen.add(solution)
+        result.append((str(w['id']), solution))
+    return result
+
+# ============ RECHERCHE ============
+
+class Layout:
+    """Grille en construction : lettres, mot(s) de chaque case, mots posés"""
+
+    def __init__(self, size):
+        self.size = size
+        self.letters = {}   # (r, c) -> caractère
+        self.owners = {}    # (r, c) -> [mot horizontal, mot vertical] (index dans placed)
+        self.placed = []    # (index du mot, ligne, colonne, horizontal)
+
+    def cells(self, row, col, horizontal, length):
+        return [(row, col + i) if horizontal else (row + i, col) for i in range(length)]
+
+    def can_place(self, word, row, col, horizontal):
+        """Règles de CrosswordGenerator.canPlace, plus les cases aux deux bouts toujours libres"""
+        n = len(word)
+        if row < 0 or col < 0: return False
+        if (col if horizontal else row) + n > self.size: return False
+        before = (row, col - 1) if horizontal else (row - 1, col)
+        after = (row, col + n) if horizontal else (row + n, col)
+        if before in self.letters or after in self.letters: return False
+        axis = 0 if horizontal else 1
+        crossings = 0
+        for i, cell in enumerate(self.cells(row, col, horizontal, n)):
+            existing = self.letters.get(cell)
+            if existing is not None:
+                # Croisement seulement avec un mot perpendiculaire, sur la même lettre
+                if existing != word[i] or self.owners[cell][axis] is not None: return False
+                crossings += 1
+            else:
+                r, c = cell
+                sides = ((r - 1, c), (r + 1, c)) if horizontal else ((r, c - 1), (r, c + 1))
+                if sides[0] in self.letters or sides[1] in self.letters: return False
+        return crossings > 0 or not self.placed
+
+    def place(self, index, word, row, col, horizontal):
+        axis = 0 if horizontal else 1
+        for i, cell in enumerate(self.cells(row, col, horizontal, len(word))):
+            self.letters[cell] = word[i]
+            self.owners.setdefault(cell, [None, None])[axis] = len(self.placed)
+        self.placed.append((index, row, col, horizontal))
+
+    def remove_last(self, word):
+        index, row, col, horizontal = self.placed.pop()
+        axis = 0 if horizontal else 1
+        for cell in self.cells(row, col, horizontal, len(word)):
+            owner = self.owners[cell]
+            owner[axis] = None
+            if owner[1 - axis] is None:
+                del self.owners[cell]
+                del self.letters[cell]
+
+def crossing_index(pool):
+    """lettre -> [(index du mot, position de la lettre)]"""
+    index = {}
+    for w, (_, solution) in enumerate(pool):
+        for j, letter in enumerate(solution):
+            index.setdefault(letter, []).append((w, j))
+    return index
+
+def placements(layout, pool, index, used, rng):
+    """Jusqu'à BRANCHES placements valides croisant une case libre dans l'autre sens"""
+    open_cells = [(cell, owner[0] is None) for cell, owner in layout.owners.items() if owner[0] is None or owner[1] is None]
+    rng.shuffle(open_cells)
+    found, checks = [], 0
+    for (r, c), horizontal in open_cells:
+        entries = index.get(layout.letters[(r, c)], ())
+        if not entries: continue
+        start = rng.randrange(len(entries))
+        for k in range(len(entries)):
+            w, j = entries[(start + k) % len(entries)]
+            if w in used: continue
+            checks += 1
+            row, col = (r, c - j) if horizontal else (r - j, c)
+            if layout.can_place(pool[w][1], row, col, horizontal):
+                found.append((w, row, col, horizontal))
+                if len(found) == BRANCHES: return found
+            if checks >= MAX_CHECKS: return found
+    return found
+
+def search(layout, pool, index, used, target, rng, budget):
+    """Retour arrière en profondeur : True dès que target mots sont posés"""
+    if len(layout.placed) == target: return True
+    budget[0] -= 1
+    if budget[0] <= 0: return False
+    for w, row, col, horizontal in placements(layout, pool, index, used, rng):
+        layout.place(w, pool[w][1], row, col, horizontal)
+        used.add(w)
+        if search(layout, pool, index, used, target, rng, budget): return True
+        used.discard(w)
+        layout.remove_last(pool[w][1])
+    return False
+
+def generate(pool, index, target, rng, size=GRID_SIZE):
+    for _ in range(MAX_ATTEMPTS):
+        layout = Layout(size)
+        # Premier mot au centre, à l'horizontale, comme dans CrosswordGenerator
+        w = rng.randrange(len(pool))
+        solution = pool[w][1]
+        layout.place(w, solution, size // 2, (size - len(solution)) // 2, True)
+        if search(layout, pool, index, {w}, target, rng, [MAX_NODES]):
+            return layout
+    return None
+
+# ============ FORMAT ET VALIDATION ============
+# Une grille : {"w": [[id, ligne, colonne, horizontal (0/1), solution], ...] triés par (ligne, colonne)
+# (le numéro affiché est la position + 1, comme finalizeGrid), "m": [case, mot horizontal, mot vertical, ...]}
+# avec case = ligne * taille + colonne et les mots numérotés à partir de 1 (0 : aucun).
+
+def encode(layout, pool):
+    order = sorted(range(len(layout.placed)), key=lambda k: (layout.placed[k][1], layout.placed[k][2], not layout.placed[k][3]))
+    number = {k: n + 1 for n, k in enumerate(order)}
+    words = [[pool[w][0], row, col, int(horizontal), pool[w][1]]
+             for w, row, col, horizontal in (layout.placed[k] for k in order)]
+    cell_map = []
+    for (r, c) in sorted(layout.owners):
+        h, v = layout.owners[(r, c)]
+        cell_map += [r * layout.size + c, number[h] if h is not None else 0, number[v] if v is not None else 0]
+    return {'w': words, 'm': cell_map}
+
+def validate(puzzle, size, target):
+    """Recontrôle indépendant : lettres cohérentes, chaque suite de cases = un mot posé, grille connexe, carte exacte"""
+    letters, owners = {}, {}
+    for n, (_, row, col, horizontal, solution) in enumerate(puzzle['w'], 1):
+        for i, letter in enumerate(solution):
+            cell = (row, col + i) if horizontal else (row + i, col)
+            if not (0 <= cell[0] < size and 0 <= cell[1] < size): return False
+            if letters.setdefault(cell, letter) != letter: return False
+            owners.setdefault(cell, [0, 0])[0 if horizontal else 1] = n
+    if len(puzzle['w']) != target: return False
+    for _, row, col, horizontal, solution in puzzle['w']:
+        before = (row, col - 1) if horizontal else (row - 1, col)
+        after = (row, col + len(solution)) if horizontal else (row + len(solution), col)
+        if before in letters or after in letters: return False
+    starts = {(row, col, horizontal) for _, row, col, horizontal, _ in puzzle['w']}
+    for horizontal in (1, 0):
+        for (r, c) in letters:
+            prev = (r, c - 1) if horizontal else (r - 1, c)
+            nxt = (r, c + 1) if horizontal else (r + 1, c)
+            if prev not in letters and nxt in letters and (r, c, horizontal) not in starts:
+                return False
+    counted = sum(len(w[4]) for w in puzzle['w']) - sum(1 for o in owners.values() if o[0] and o[1])
+    if counted != len(letters): return False
+    expected = []
+    for (r, c) in sorted(owners):
+        expected += [r * size + c] + owners[(r, c)]
+    if expected != puzzle['m']: return False
+    # Connexité
+    todo, seen = [next(iter(letters))], set()
+    while todo:
+        r, c = todo.pop()
+        if (r, c) in seen: continue
+        seen.add((r, c))
+        todo += [n for n in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)) if n in letters]
+    return len(seen) == len(letters)
+
+def build_key(job):
+    """Grilles d'un (niveau, mode, nombre de mots) ; graine dérivée de la clé : sortie reproductible"""
+    level, mode, count, pool, puzzles = job
+    rng = random.Random(f"{level}/{mode}/{count}")
+    index = crossing_index(pool)
+    bank, seen, failures, invalid = [], set(), 0, 0
+    while len(bank) < puzzles and failures < puzzles:
+        layout = generate(pool, index, count, rng)
+        if layout is None:
+            failures += 1
+            continue
+        puzzle = encode(layout, pool)
+        key = frozenset(w[0] for w in puzzle['w'])
+        if key in seen:
+            failures += 1
+            continue
+        if not validate(puzzle, GRID_SIZE, count):
+            invalid += 1
+            continue
+        seen.add(key)
+        bank.append(puzzle)
+    return level, mode, count, bank, invalid
+
+def main():
+    parser = argparse.ArgumentParser(description='Génère une banque de grilles de mots croisés par niveau et nombre de mots')
+    parser.add_argument('--words', default=MERGED_FILE, help='Fichier merged_wordlist.json')
+    parser.add_argument('--levels', default=None, help='Niveaux à générer (par défaut: tous ceux de levels.json avec des mots)')
+    parser.add_argument('--modes', default=','.join(MODES), help='Modes (KANAS, KANJIS)')
+    parser.add_argument('--counts', default=','.join(map(str, WORD_COUNTS)), help='Nombres de mots par grille')
+    parser.add_argument('--puzzles', type=int, default=PUZZLES_PER_COUNT, help='Grilles par niveau, mode et nombre de mots')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Nombre de processus')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Fichier de sortie')
+    args = parser.parse_args()
+
+    merged = load_json(args.words)
+    levels = load_json(LEVELS_FILE)
+    if not merged or not levels:
+        print("Erreur: merged_wordlist.json ou levels.json introuvable.")
+        sys.exit(1)
+
+    pools = level_pools(levels, merged.get('words', []))
+    if args.levels:
+        pools = {l: pools[l] for l in args.levels.split(',') if l in pools}
+    counts = [int(c) for c in args.counts.split(',')]
+    jobs = []
+    for level, words in pools.items():
+        for mode in args.modes.split(','):
+            pool = candidates(words, mode)
+            for count in counts:
+                if len(pool) >= count * 2:
+                    jobs.append((level, mode, count, pool, args.puzzles))
+            if len(pool) < counts[0] * 2:
+                print(f"  [{level}/{mode}] {len(pool)} mots : pas assez pour une grille")
+
+    t0 = time.perf_counter()
+    bank = {}
+    total = invalid_total = 0
+    # Les clés les plus longues d'abord, pour que les processus finissent ensemble
+    jobs.sort(key=lambda job: -job[2])
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for level, mode, count, puzzles, invalid in pool.map(build_key, jobs):
+            bank.setdefault(level, {}).setdefault(mode, {})[str(count)] = puzzles
+            total += len(puzzles)
+            invalid_total += invalid
+            if len(puzzles) < args.puzzles:
+                print(f"  [{level}/{mode}/{count}] {len(puzzles)}/{args.puzzles} grilles")
+
+    # Ordre stable quel que soit l'ordre de fin des processus
+    ordered = {level: {mode: dict(sorted(bank[level][mode].items(), key=lambda kv: int(kv[0])))
+                       for mode in sorted(bank[level])} for level in pools if level in bank}
+    save_json(args.output, {'version': FORMAT_VERSION, 'gridSize': GRID_SIZE, 'puzzles': ordered}, indent=None)
+    print(f"✅ {total} grilles validées ({invalid_total} rejetées) en {time.perf_counter() - t0:.1f}s -> "
+          f"{args.output} ({os.path.getsize(args.output)} octets)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+import os
+import glob
+import time
+import random
+import argparse
+from mochi_assets.jsonio import load_json, save_json
+
+# Configuration
+FILES_DIR = 'shared/src/commonMain/composeResources/files'
+KANJI_DETAILS_FILE = os.path.join(FILES_DIR, 'kanji/kanji_details.json')
+MEANINGS_PATTERN = os.path.join(FILES_DIR, 'meanings/meanings_*.json')
+OUTPUT_DIR = os.path.join(FILES_DIR, 'index')
+INDEX_VERSION = 1
+NGRAM_SIZE = 3  # Les requêtes de 1 à 3 caractères sont résolues sans vérification
+
+def as_list(value):
+    """Les champs XML convertis peuvent être une valeur seule ou une liste"""
+    if value is None: return []
+    return value if isinstance(value, list) else [value]
+
+# ============ NORMALISATION (identique à DictionaryViewModel) ============
+
+def normalize_reading(text):
+    return text.replace('.', '').lower()
+
+def normalize_meaning(text):
+    return text.lower()
+
+def ngrams(text, n=NGRAM_SIZE):
+    """Tous les n-grammes de longueur 1..n d'une chaîne"""
+    grams = set()
+    for size in range(1, n + 1):
+        for i in range(len(text) - size + 1):
+            grams.add(text[i:i + size])
+    return grams
+
+# ============ POSTINGS ============
+
+def delta_encode(doc_list):
+    out = []
+    previous = 0
+    for doc in doc_list:
+        out.append(doc - previous)
+        previous = doc
+    return out
+
+def delta_decode(deltas):
+    out = []
+    current = 0
+    for d in deltas:
+        current += d
+        out.append(current)
+    return out
+
+def build_postings(texts_by_doc, normalize):
+    """texts_by_doc: liste (index de document -> liste de textes). Renvoie ngram -> deltas"""
+    postings = {}
+    for doc, texts in enumerate(texts_by_doc):
+        grams = set()
+        for text in texts:
+            if text: grams |= ngrams(normalize(text))
+        for gram in grams:
+            postings.setdefault(gram, []).append(doc)
+    return {gram: delta_encode(docs) for gram, docs in postings.items()}
+
+def lookup(postings, query, n=NGRAM_SIZE):
+    """
+    Renvoie (candidats, exact). Si la requête dépasse n caractères, les candidats
+    sont l'intersection des postings de ses n-grammes et doivent être vérifiés
+    par un `contains` sur ce petit ensemble.
+    """
+    if not query:
+        return None, True
+    if len(query) <= n:
+        return set(delta_decode(postings.get(query, []))), True
+
+    grams = sorted({query[i:i + n] for i in range(len(query) - n + 1)},
+                   key=lambda g: len(postings.get(g, [])))
+    result = None
+    for gram in grams:
+        docs = set(delta_decode(postings.get(gram, [])))
+        result = docs if result is None else result & docs
+        if not result: break
+    return result or set(), False
+
+# ============ CONSTRUCTION ============
+
+def load_kanji_entries(kanji_details_file):
+    data = load_json(kanji_details_file)
+    if not data: return None
+    entries = data.get('kanji_details', {}).get('kanji', [])
+    entries = [k for k in entries if str(k.get('id', '')).isdigit()]
+    entries.sort(key=lambda k: int(k['id']))
+    return entries
+
+def build_core_index(entries):
+    ids = [int(k['id']) for k in entries]
+
+    readings_by_doc = []
+    strokes = {}
+    levels = {}
+    for doc, k in enumerate(entries):
+        readings = as_list((k.get('readings') or {}).get('reading'))
+        readings_by_doc.append([r.get('#text', '') for r in readings if isinstance(r, dict)])
+
+        stroke_count = str(k.get('strokes') or '0')
+        strokes.setdefault(stroke_count if stroke_count.isdigit() else '0', []).append(doc)
+
+        kanji_levels = [l.lower() for l in as_list(k.get('level'))]
+        # Bucket dédié aux kanjis hors niveau (native_challenge, no_reading, no_meaning)
+        for level in kanji_levels or ['_none']:
+            levels.setdefault(level, []).append(doc)
+
+    return {
+        "version": INDEX_VERSION,
+        "ngram": NGRAM_SIZE,
+        "ids": delta_encode(ids),
+        "strokes": {s: delta_encode(d) for s, d in strokes.items()},
+        "levels": {l: delta_encode(d) for l, d in levels.items()},
+        "readings": build_postings(readings_by_doc, normalize_reading),
+    }, readings_by_doc
+
+def load_meanings(meanings_file):
+    data = load_json(meanings_file)
+    if not data: return {}
+    return {str(k['@id']): as_list(k.get('meaning')) for k in data.get('meanings', {}).get('kanji', [])}
+
+def build_meaning_index(entries, meanings, locale):
+    meanings_by_doc = [meanings.get(str(k['id']), []) for k in entries]
+    return {
+        "version": INDEX_VERSION,
+        "locale": locale,
+        "ngram": NGRAM_SIZE,
+        "meanings": build_postings(meanings_by_doc, normalize_meaning),
+    }, meanings_by_doc
+
+# ============ VÉRIFICATION ============
+
+def check_index(postings, texts_by_doc, normalize, samples=300, label=""):
+    """Compare l'index au scan linéaire de DictionaryViewModel sur des requêtes aléatoires"""
+    normalized = [[normalize(t) for t in texts if t] for texts in texts_by_doc]
+    pool = [t for texts in normalized for t in texts]
+    if not pool: return True
+
+    rng = random.Random(42)
+    queries = []
+    for _ in range(samples):
+        text = rng.choice(pool)
+        size = rng.randint(1, min(len(text), NGRAM_SIZE + 3))
+        start = rng.randint(0, len(text) - size)
+        queries.append(text[start:start + size])
+
+    t0 = time.perf_counter()
+    expected = [{d for d, texts in enumerate(normalized) if any(q in t for t in texts)} for q in queries]
+    scan_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got = []
+    for q in queries:
+        candidates, exact = lookup(postings, q)
+        if not exact:
+            candidates = {d for d in candidates if any(q in t for t in normalized[d])}
+        got.append(candidates)
+    index_time = time.perf_counter() - t0
+
+    mismatches = sum(1 for e, g in zip(expected, got) if e != g)
+    print(f"  [check {label}] {len(queries)} requêtes, {mismatches} écarts | "
+          f"scan {scan_time * 1000:.0f} ms, index {index_time * 1000:.0f} ms")
+    return mismatches == 0
+
+# ============ FONCTION PRINCIPALE ============
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit l'index de recherche hors-ligne du dictionnaire")
+    parser.add_argument('--kanji', default=KANJI_DETAILS_FILE, help='Fichier kanji_details.json')
+    parser.add_argument('--meanings', default=MEANINGS_PATTERN, help='Motif des fichiers meanings_*.json')
+    parser.add_argument('--output', default=OUTPUT_DIR, help='Dossier de sortie')
+    parser.add_argument('--check', action='store_true', help="Vérifie l'index contre un scan linéaire")
+    args = parser.parse_args()
+
+    entries = load_kanji_entries(args.kanji)
+    if not entries:
+        print(f"Erreur: {args.kanji} introuvable ou vide.")
+        return
+
+    print(f"Indexation de {len(entries)} kanjis...")
+    core, readings_by_doc = build_core_index(entries)
+    core_file = os.path.join(args.output, 'dictionary_index.json')
+    save_json(core_file, core, indent=None, sort_keys=True)
+    print(f"  -> {core_file} ({len(core['readings'])} n-grammes de lecture, "
+          f"{os.path.getsize(core_file) // 1024} Ko)")
+
+    ok = True
+    if args.check:
+        ok &= check_index(core['readings'], readings_by_doc, normalize_reading, label="lectures")
+
+    for meanings_file in sorted(glob.glob(args.meanings)):
+        locale = os.path.basename(meanings_file).replace('meanings_', '').replace('.json', '')
+        meaning_index, meanings_by_doc = build_meaning_index(entries, load_meanings(meanings_file), locale)
+        out_file = os.path.join(args.output, f'dictionary_meanings_{locale}.json')
+        save_json(out_file, meaning_index, indent=None, sort_keys=True)
+        print(f"  -> {out_file} ({len(meaning_index['meanings'])} n-grammes, "
+              f"{os.path.getsize(out_file) // 1024} Ko)")
+        if args.check:
+            ok &= check_index(meaning_index['meanings'], meanings_by_doc, normalize_meaning, label=locale)
+
+    if not ok:
+        print("Erreur: l'index ne correspond pas au scan linéaire.")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
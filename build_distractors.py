@@ -0,0 +1,288 @@
+#!/usr/bin/python3
+import os
+import sys
+import math
+import heapq
+import time
+import argparse
+from mochi_assets.jsonio import load_json, save_json
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Configuration
+FILES_DIR = 'shared/src/commonMain/composeResources/files'
+KANJI_DETAILS_FILE = os.path.join(FILES_DIR, 'kanji/kanji_details.json')
+MERGED_FILE = os.path.join(FILES_DIR, 'words/merged_wordlist.json')
+KANJI_MEANINGS_FILE = os.path.join(FILES_DIR, 'meanings/meanings_en_rGB.json')
+WORD_MEANINGS_FILE = os.path.join(FILES_DIR, 'words/meanings/word_meanings_en_rGB.json')
+OUTPUT_FILE = os.path.join(FILES_DIR, 'distractors.json')
+FORMAT_VERSION = 1
+TOP_N = 8           # le jeu en tire 3 au hasard : un peu de marge garde de la variété
+NGRAM = 3           # n-grammes de caractères des sens anglais
+COMMON_DF = 400     # au-delà, le poids d'une caractéristique (しょう, こう, 'ing'...) décroît en COMMON_DF / df
+SHORTLIST = 64      # candidats départagés par les bonus et filtrés
+BLOCK = 32          # lignes de la matrice de similarité calculées d'un coup avec numpy
+
+# Poids des canaux (similarités cosinus TF-IDF) et des bonus appliqués aux seuls candidats
+KANJI_WEIGHTS = {'components': 0.4, 'readings': 0.3, 'meaning': 0.2}
+KANJI_STROKES_WEIGHT = 0.1
+WORD_WEIGHTS = {'kanji': 0.35, 'phonetics': 0.35, 'meaning': 0.2}
+WORD_TYPE_WEIGHT = 0.1
+
+# ============ VECTEURS CREUX ============
+# Chaque entrée devient, par canal, un vecteur TF-IDF normalisé {caractéristique: poids}. Seules les
+# paires qui partagent une caractéristique ont un score : en Python pur, les produits scalaires passent
+# par un index inversé ; avec numpy, la même matrice creuse est multipliée par blocs de lignes.
+
+def tfidf(documents, common_df=COMMON_DF):
+    """Listes de caractéristiques (répétitions = fréquence) -> vecteurs TF-IDF de norme 1"""
+    df = {}
+    for features in documents:
+        for f in set(features):
+            df[f] = df.get(f, 0) + 1
+    n = len(documents)
+    # Une caractéristique très courante départage peu : elle garde un poids réduit plutôt que d'être retirée
+    idf = {f: (math.log((1 + n) / (1 + d)) + 1) * min(1.0, common_df / d) for f, d in df.items()}
+    vectors = []
+    for features in documents:
+        tf = {}
+        for f in features:
+            tf[f] = tf.get(f, 0) + 1
+        vector = {f: count * idf[f] for f, count in tf.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        vectors.append({f: w / norm for f, w in vector.items()} if norm else {})
+    return vectors
+
+def inverted_index(vectors):
+    index = {}
+    for i, vector in enumerate(vectors):
+        for f, w in vector.items():
+            index.setdefault(f, []).append((i, w))
+    return index
+
+def accumulate(scores, vector, index, weight):
+    get = scores.get
+    for f, w in vector.items():
+        w *= weight
+        for j, wj in index.get(f, ()):
+            scores[j] = get(j, 0.0) + w * wj
+
+def _shortlist_order(candidate):
+    """Score arrondi au milliardième décroissant, puis plus petit ID : même choix avec ou sans numpy"""
+    j, score = candidate
+    return -round(score * 1e9), j
+
+def python_shortlists(channels, count):
+    """Pour chaque entrée, les SHORTLIST autres entrées de meilleur score [(j, score)]"""
+    indexed = [(vectors, inverted_index(vectors), weight) for vectors, weight in channels]
+    for i in range(count):
+        scores = {}
+        for vectors, index, weight in indexed:
+            accumulate(scores, vectors[i], index, weight)
+        scores.pop(i, None)
+        if len(scores) > SHORTLIST:
+            # Seuil en C, puis seuls les candidats proches du seuil passent par le tri exact
+            low = heapq.nlargest(SHORTLIST, scores.values())[-1] - 1e-9
+            candidates = [(j, score) for j, score in scores.items() if score >= low]
+        else:
+            candidates = list(scores.items())
+        candidates.sort(key=_shortlist_order)
+        yield candidates[:SHORTLIST]
+
+def sparse_matrix(vectors, weight):
+    """
+    Canal en matrice creuse : ligne, colonne et poids (pondéré) de chaque coefficient, début de chaque
+    ligne ; puis début, lignes et poids des occurrences de chaque caractéristique (la transposée).
+    """
+    ids = {}
+    rows, cols, values = [], [], []
+    for i, vector in enumerate(vectors):
+        for f, w in vector.items():
+            rows.append(i)
+            cols.append(ids.setdefault(f, len(ids)))
+            values.append(w)
+    rows, cols, values = np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(values)
+    order = np.argsort(cols, kind='stable')
+    row_start = np.searchsorted(rows, np.arange(len(vectors) + 1))
+    col_start = np.searchsorted(cols[order], np.arange(len(ids) + 1))
+    return rows, row_start, cols, values * weight, col_start, rows[order], values[order]
+
+def numpy_shortlists(channels, count):
+    """Comme python_shortlists : scores d'un bloc de lignes = somme des occurrences (np.bincount)"""
+    matrices = [sparse_matrix(vectors, weight) for vectors, weight in channels]
+    for start in range(0, count, BLOCK):
+        stop = min(start + BLOCK, count)
+        block = np.zeros((stop - start) * count)
+        for rows, row_start, cols, values, col_start, posting_rows, posting_values in matrices:
+            a, b = row_start[start], row_start[stop]
+            first, lengths = col_start[cols[a:b]], col_start[cols[a:b] + 1] - col_start[cols[a:b]]
+            total = int(lengths.sum())
+            if not total: continue
+            # Position de chaque occurrence dans les listes concaténées des caractéristiques du bloc
+            ends = np.cumsum(lengths)
+            positions = np.repeat(first - ends + lengths, lengths) + np.arange(total)
+            targets = np.repeat((rows[a:b] - start) * count, lengths) + posting_rows[positions]
+            block += np.bincount(targets, weights=np.repeat(values[a:b], lengths) * posting_values[positions],
+                                 minlength=len(block))
+        block = block.reshape(-1, count)
+        block[np.arange(stop - start), np.arange(start, stop)] = 0.0
+        # Même sélection que python_shortlists : seuil du SHORTLIST-ième score de chaque ligne, puis
+        # tri des candidats proches du seuil dans l'ordre de _shortlist_order
+        k = min(SHORTLIST, count)
+        low = np.maximum(-np.partition(-block, k - 1, axis=1)[:, k - 1:k] - 1e-9, np.finfo(float).tiny)
+        lines, candidates = np.nonzero(block >= low)
+        scores = block[lines, candidates]
+        order = np.lexsort((candidates, -np.rint(scores * 1e9), lines))
+        lines, candidates, scores = lines[order], candidates[order].tolist(), scores[order].tolist()
+        bounds = np.searchsorted(lines, np.arange(stop - start + 1)).tolist()
+        for r in range(stop - start):
+            yield list(zip(candidates[bounds[r]:bounds[r + 1]], scores[bounds[r]:bounds[r + 1]]))[:k]
+
+def ngrams(text, n=NGRAM):
+    padded = f" {text.lower()} "
+    return [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+def neighbours(order, rank, i):
+    """Entrées voisines de i dans un ordre donné (de part et d'autre, les plus proches d'abord)"""
+    pos = rank[i]
+    for step in range(1, len(order)):
+        for p in (pos - step, pos + step):
+            if 0 <= p < len(order):
+                yield order[p]
+
+def rank_distractors(channels, bonus, excluded, fallback_key, top_n):
+    """
+    Pour chaque entrée, les top_n autres entrées les plus similaires (somme pondérée des canaux
+    [(vecteurs, poids)], plus bonus(i, j)), hors excluded(i, j). Complète par les voisines selon fallback_key.
+    """
+    count = len(channels[0][0])
+    order = sorted(range(count), key=lambda i: (fallback_key(i), i))
+    rank = {i: p for p, i in enumerate(order)}
+    shortlists = numpy_shortlists(channels, count) if np is not None else python_shortlists(channels, count)
+    results = []
+    for i, candidates in enumerate(shortlists):
+        # Les bonus (<= 0.1) ne font que départager : inutile de les calculer au-delà de la présélection
+        shortlist = {j: score + bonus(i, j) for j, score in candidates}
+        chosen = [j for j in sorted(shortlist, key=lambda j: (-round(shortlist[j], 9), j)) if not excluded(i, j)][:top_n]
+        if len(chosen) < top_n:
+            taken = set(chosen)
+            for j in neighbours(order, rank, i):
+                if j not in taken and not excluded(i, j):
+                    chosen.append(j)
+                    taken.add(j)
+                    if len(chosen) == top_n: break
+        results.append(chosen)
+    return results
+
+def _as_list(value):
+    if value is None: return []
+    return value if isinstance(value, list) else [value]
+
+def _meanings(file_path, list_key):
+    """{id: sens anglais en minuscules} ; un fichier absent désactive simplement le canal"""
+    data = load_json(file_path) or {}
+    entries = next(iter(data.values()), {}).get(list_key, []) if data else []
+    return {str(e['@id']): [m.lower() for m in _as_list(e.get('meaning')) if isinstance(m, str)] for e in entries}
+
+# ============ KANJIS ============
+
+def hiragana(text):
+    return ''.join(chr(ord(c) - 0x60) if 'ァ' <= c <= 'ヶ' else c for c in text)
+
+def kanji_features(kanji, meanings):
+    components, readings, meaning = [], [], []
+    for k in kanji:
+        parts = _as_list((k.get('components') or {}).get('component'))
+        components.append([c['kanji_ref'] for c in parts if isinstance(c, dict) and c.get('kanji_ref')])
+        texts = [r.get('#text', '') for r in _as_list((k.get('readings') or {}).get('reading')) if isinstance(r, dict)]
+        readings.append([hiragana(t).replace('.', '').replace('-', '') for t in texts if t])
+        meaning.append([g for m in meanings.get(str(k['id']), []) for g in ngrams(m)])
+    return {'components': components, 'readings': readings, 'meaning': meaning}
+
+def build_kanji(kanji, meanings, top_n):
+    features = kanji_features(kanji, meanings)
+    channels = [(tfidf(features[name]), weight) for name, weight in KANJI_WEIGHTS.items()]
+    strokes = [int(k['strokes']) if str(k.get('strokes', '')).isdigit() else None for k in kanji]
+    reading_sets = [frozenset(r) for r in features['readings']]
+    first_meaning = [(meanings.get(str(k['id'])) or [None])[0] for k in kanji]
+
+    def bonus(i, j):
+        if strokes[i] is None or strokes[j] is None: return 0.0
+        return KANJI_STROKES_WEIGHT / (1 + abs(strokes[i] - strokes[j]))
+
+    def excluded(i, j):
+        # Même bouton affiché que la bonne réponse : la question deviendrait ambiguë
+        return (kanji[i]['character'] == kanji[j]['character']
+                or (reading_sets[i] and reading_sets[i] == reading_sets[j])
+                or (first_meaning[i] and first_meaning[i] == first_meaning[j]))
+
+    ranked = rank_distractors(channels, bonus, excluded, lambda i: strokes[i] or 0, top_n)
+    return {str(k['id']): [str(kanji[j]['id']) for j in chosen] for k, chosen in zip(kanji, ranked)}
+
+# ============ MOTS ============
+
+def is_kana(c):
+    return '぀' <= c <= 'ヿ'
+
+def build_words(words, meanings, top_n):
+    features = {
+        'kanji': [[c for c in w['text'] if not is_kana(c)] for w in words],
+        'phonetics': [[p[i:i + 2] for i in range(len(p) - 1)] for p in (f"^{w.get('phonetics', '')}$" for w in words)],
+        'meaning': [[g for m in meanings.get(str(w['id']), []) for g in ngrams(m)] for w in words],
+    }
+    channels = [(tfidf(features[name]), weight) for name, weight in WORD_WEIGHTS.items()]
+
+    def bonus(i, j):
+        return WORD_TYPE_WEIGHT if words[i].get('type') and words[i].get('type') == words[j].get('type') else 0.0
+
+    def excluded(i, j):
+        return words[i]['text'] == words[j]['text'] or words[i].get('phonetics') == words[j].get('phonetics')
+
+    ranked = rank_distractors(channels, bonus, excluded, lambda i: len(words[i].get('phonetics', '')), top_n)
+    return {str(w['id']): [str(words[j]['id']) for j in chosen] for w, chosen in zip(words, ranked)}
+
+def main():
+    parser = argparse.ArgumentParser(description='Précalcule les distracteurs plausibles de chaque kanji et de chaque mot')
+    parser.add_argument('--kanji', default=KANJI_DETAILS_FILE, help='Fichier kanji_details.json')
+    parser.add_argument('--words', default=MERGED_FILE, help='Fichier merged_wordlist.json')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Fichier de sortie')
+    parser.add_argument('--top', type=int, default=TOP_N, help='Distracteurs conservés par entrée')
+    parser.add_argument('--show', type=int, default=0, help='Affiche les distracteurs des N premières entrées')
+    args = parser.parse_args()
+
+    output = {'version': FORMAT_VERSION, 'top': args.top}
+    details = load_json(args.kanji)
+    if details:
+        kanji = [k for k in details.get('kanji_details', {}).get('kanji', []) if k.get('id') and k.get('character')]
+        t0 = time.perf_counter()
+        output['kanji'] = build_kanji(kanji, _meanings(KANJI_MEANINGS_FILE, 'kanji'), args.top)
+        print(f"Kanjis: {len(kanji)} entrées en {time.perf_counter() - t0:.1f}s")
+        by_id = {str(k['id']): k['character'] for k in kanji}
+        for k in kanji[:args.show]:
+            print(f"  {k['character']} -> {' '.join(by_id[j] for j in output['kanji'][str(k['id'])])}")
+    else:
+        print(f"⚠️  {args.kanji} introuvable : pas de distracteurs de kanjis")
+
+    merged = load_json(args.words)
+    if merged:
+        words = [w for w in merged.get('words', []) if w.get('id') and w.get('text')]
+        t0 = time.perf_counter()
+        output['words'] = build_words(words, _meanings(WORD_MEANINGS_FILE, 'entries'), args.top)
+        print(f"Mots: {len(words)} entrées en {time.perf_counter() - t0:.1f}s")
+        by_id = {str(w['id']): w for w in words}
+        for w in words[:args.show]:
+            print(f"  {w['text']} ({w.get('phonetics', '')}) -> "
+                  f"{' '.join(by_id[j]['text'] + '/' + by_id[j].get('phonetics', '') for j in output['words'][str(w['id'])])}")
+    else:
+        print(f"⚠️  {args.words} introuvable : pas de distracteurs de mots")
+
+    if 'kanji' not in output and 'words' not in output:
+        sys.exit(1)
+    save_json(args.output, output, indent=None)
+    print(f"✅ {args.output}")
+
+if __name__ == "__main__":
+    main()
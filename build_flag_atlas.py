@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+import os
+import io
+import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from mochi_assets.jsonio import save_json
+
+# Configuration
+RESOURCES_DIR = 'shared/src/commonMain/composeResources'
+FLAGS_PATTERN = os.path.join(RESOURCES_DIR, 'drawable/flag_*.png')
+ATLAS_DIR = os.path.join(RESOURCES_DIR, 'drawable')
+MAP_FILE = os.path.join(RESOURCES_DIR, 'files/flags_atlas.json')
+ATLAS_MAX_SIZE = 2048
+PADDING = 2  # Pixels transparents entre deux drapeaux (évite le débordement au filtrage)
+MAX_COLORS = 256  # Couleurs par page : une page qui tient dans une palette est écrite en mode P, sans perte
+
+# ============ CHARGEMENT PARALLÈLE ============
+
+def load_flag(job):
+    """Charge (et réduit si demandé) un drapeau ; renvoie des octets RGBA picklables"""
+    path, target_height = job
+    with Image.open(path) as img:
+        img = img.convert('RGBA')
+        if target_height and img.height > target_height:
+            width = max(1, round(img.width * target_height / img.height))
+            img = img.resize((width, target_height), Image.LANCZOS)
+        name = os.path.splitext(os.path.basename(path))[0]
+        return name, img.size, img.tobytes()
+
+# ============ PLACEMENT EN ÉTAGÈRES ============
+
+def pack_shelves(sizes, max_size=ATLAS_MAX_SIZE, padding=PADDING):
+    """
+    sizes: {nom: (w, h)}. Place par hauteur décroissante sur des étagères,
+    en ouvrant une nouvelle page quand la précédente est pleine.
+    Renvoie ({nom: (page, x, y)}, [(largeur, hauteur) de chaque page]).
+    """
+    placements = {}
+    pages = []
+    x = y = shelf_height = page_width = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if w > max_size or h > max_size:
+            raise ValueError(f"{name} ({w}x{h}) dépasse la taille maximale d'atlas")
+        if x + w > max_size:
+            x, y = 0, y + shelf_height + padding
+            shelf_height = 0
+        if not pages or y + h > max_size:
+            pages.append(None)
+            x = y = shelf_height = page_width = 0
+        placements[name] = (len(pages) - 1, x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+        page_width = max(page_width, x - padding)
+        pages[-1] = (page_width, y + shelf_height)
+    return placements, pages
+
+# ============ PALETTES ============
+# Les drapeaux sources sont des PNG en palette (22 couleurs en médiane), mais 7672 couleurs au total :
+# une seule page RGBA se compresse moins bien que les fichiers séparés. On regroupe donc les drapeaux
+# par pages dont l'union des couleurs tient dans une palette, puis chaque groupe est placé en étagères.
+
+def group_by_palette(colors, max_colors=MAX_COLORS):
+    """
+    colors: {nom: ensemble des couleurs RGBA}. Chaque drapeau rejoint le groupe auquel il ajoute le
+    moins de couleurs sans dépasser max_colors. Les drapeaux qui dépassent seuls la limite forment
+    un dernier groupe sans limite (pages RGBA). Renvoie une liste de listes de noms.
+    """
+    groups, overflow = [], []
+    for name in sorted(colors, key=lambda n: (-len(colors[n]), n)):
+        if len(colors[name]) > max_colors:
+            overflow.append(name)
+            continue
+        best = None
+        for group in groups:
+            added = len(colors[name] - group[1])
+            if len(group[1]) + added <= max_colors and (best is None or added < best[0]):
+                best = (added, group)
+        if best is None:
+            groups.append(([name], set(colors[name])))
+        else:
+            best[1][0].append(name)
+            best[1][1].update(colors[name])
+    return [names for names, _ in groups] + ([overflow] if overflow else [])
+
+def pack_groups(groups, sizes, max_size=ATLAS_MAX_SIZE, padding=PADDING):
+    """pack_shelves appliqué à chaque groupe, les pages d'un groupe n'étant jamais partagées"""
+    placements, pages = {}, []
+    for names in groups:
+        group_placements, group_pages = pack_shelves({n: sizes[n] for n in names}, max_size, padding)
+        for name, (page, x, y) in group_placements.items():
+            placements[name] = (len(pages) + page, x, y)
+        pages += group_pages
+    return placements, pages
+
+def to_palette(img, max_colors=MAX_COLORS):
+    """Conversion RGBA -> P exacte (transparence comprise), ou None si l'image a trop de couleurs"""
+    colors = img.getcolors(max_colors)
+    if colors is None:
+        return None
+    index = {color: i for i, (_, color) in enumerate(colors)}
+    palette = Image.new('P', img.size)
+    palette.frombytes(bytes(index[pixel] for pixel in zip(*[iter(img.tobytes())] * 4)))
+    palette.putpalette([v for _, color in colors for v in color[:3]])
+    palette.info['transparency'] = bytes(color[3] for _, color in colors)
+    return palette
+
+# ============ ÉCRITURE ============
+
+def encode_atlas(img, fmt, quality):
+    if fmt == 'png' or quality >= 100:
+        # Sans perte : une page qui tient dans une palette est écrite en mode P
+        img = to_palette(img) or img
+    buf = io.BytesIO()
+    if fmt == 'webp':
+        if quality >= 100:
+            img.save(buf, 'WEBP', lossless=True, quality=100, method=6)
+        else:
+            img.save(buf, 'WEBP', quality=quality, method=6)
+    else:
+        img.save(buf, 'PNG', optimize=True)
+    return buf.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description='Regroupe les drapeaux flag_*.png en atlas de textures')
+    parser.add_argument('--input', default=FLAGS_PATTERN, help='Motif des drapeaux source')
+    parser.add_argument('--atlas-dir', default=ATLAS_DIR, help='Dossier des images d\'atlas')
+    parser.add_argument('--map', default=MAP_FILE, help='Fichier JSON des coordonnées')
+    parser.add_argument('--format', choices=['webp', 'png'], default='webp', help='Format des atlas')
+    parser.add_argument('--quality', type=int, default=100, help='Qualité WebP (100 = sans perte)')
+    parser.add_argument('--height', type=int, default=0, help='Réduit les drapeaux à cette hauteur d\'affichage (px)')
+    parser.add_argument('--max-size', type=int, default=ATLAS_MAX_SIZE, help='Taille maximale d\'une page')
+    parser.add_argument('--max-colors', type=int, default=MAX_COLORS,
+                        help='Couleurs par page en sans perte, drapeaux regroupés par palette (0 : pages RGBA sans regroupement)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Nombre de processus')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.input))
+    if not paths:
+        print(f"Aucun drapeau trouvé ({args.input})")
+        return
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        flags = list(pool.map(load_flag, [(p, args.height) for p in paths], chunksize=16))
+    sizes = {name: size for name, size, _ in flags}
+    lossless = args.format == 'png' or args.quality >= 100
+    if args.max_colors and lossless:
+        # Le fond transparent des pages compte pour une couleur dans chaque groupe
+        colors = {name: {color for _, color in Image.frombytes('RGBA', size, pixels).getcolors(size[0] * size[1])}
+                        | {(0, 0, 0, 0)}
+                  for name, size, pixels in flags}
+        placements, pages = pack_groups(group_by_palette(colors, args.max_colors), sizes, args.max_size)
+    else:
+        placements, pages = pack_shelves(sizes, args.max_size)
+
+    atlases = [Image.new('RGBA', page, (0, 0, 0, 0)) for page in pages]
+    for name, size, pixels in flags:
+        page, x, y = placements[name]
+        atlases[page].paste(Image.frombytes('RGBA', size, pixels), (x, y))
+
+    os.makedirs(args.atlas_dir, exist_ok=True)
+    atlas_files = []
+    atlas_bytes = 0
+    for i, img in enumerate(atlases):
+        data = encode_atlas(img, args.format, args.quality)
+        file_name = f'flags_atlas_{i}.{args.format}'
+        with open(os.path.join(args.atlas_dir, file_name), 'wb') as f:
+            f.write(data)
+        atlas_files.append(file_name)
+        atlas_bytes += len(data)
+
+    coordinates = {
+        "version": 1,
+        "atlases": atlas_files,
+        "flags": {name: {"atlas": page, "x": x, "y": y, "w": sizes[name][0], "h": sizes[name][1]}
+                  for name, (page, x, y) in sorted(placements.items())},
+    }
+    save_json(args.map, coordinates, indent=None)
+
+    loose_bytes = sum(os.path.getsize(p) for p in paths)
+    map_bytes = os.path.getsize(args.map)
+    print(f"Drapeaux séparés: {len(paths)} fichiers, {loose_bytes} octets")
+    print(f"Atlas:            {len(atlas_files)} image(s) + 1 carte, {atlas_bytes + map_bytes} octets "
+          f"({(atlas_bytes + map_bytes) * 100 / loose_bytes:.1f}%)")
+    for file_name, (w, h) in zip(atlas_files, pages):
+        print(f"  {file_name}: {w}x{h}")
+    if atlas_bytes + map_bytes > loose_bytes:
+        print(f"⚠️  Atlas plus lourd que les drapeaux séparés ({args.format}"
+              f"{'' if lossless else f' q{args.quality}'}, --max-colors {args.max_colors if lossless else 0})")
+
+if __name__ == "__main__":
+    main()
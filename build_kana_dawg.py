@@ -0,0 +1,405 @@
+#!/usr/bin/python3
+import os
+import sys
+import time
+import array
+import random
+import struct
+import argparse
+from mochi_assets.jsonio import load_json
+
+# Configuration
+WORDS_DIR = 'shared/src/commonMain/composeResources/files/words'
+MERGED_FILE = os.path.join(WORDS_DIR, 'merged_wordlist.json')
+OUTPUT_FILE = os.path.join(WORDS_DIR, 'kana_dawg.bin')
+
+MAGIC = b'MDWG'
+FORMAT_VERSION = 1
+WILDCARD = '?'
+SMALL_KANA = set('ゃゅょぁぃぅぇぉゎャュョァィゥェォヮ')
+LONG_VOWEL = 'ー'
+
+def clean_phonetics(p):
+    """Même nettoyage que CrosswordGenerator.cleanPhonetics"""
+    for part in (p or '').split('/'):
+        if part.strip():
+            return part.replace('.', '').replace(' ', '')
+    return ''
+
+def last_mora(word):
+    """Dernière more d'un mot (règle du Shiritori) : petits kanas rattachés, 'ー' ignoré"""
+    word = word.rstrip(LONG_VOWEL)
+    if not word: return ''
+    if len(word) > 1 and word[-1] in SMALL_KANA:
+        return word[-2:]
+    return word[-1]
+
+# ============ CONSTRUCTION (algorithme incrémental de Daciuk) ============
+
+class _Node:
+    __slots__ = ('id', 'final', 'edges')
+    _next_id = 0
+
+    def __init__(self):
+        self.id = _Node._next_id
+        _Node._next_id += 1
+        self.final = False
+        self.edges = {}
+
+    def signature(self):
+        return (self.final, tuple((label, child.id) for label, child in sorted(self.edges.items())))
+
+class DawgBuilder:
+    """Construit un DAWG minimal à partir de clés insérées dans l'ordre lexicographique"""
+
+    def __init__(self):
+        self.root = _Node()
+        self.previous = ''
+        self.unchecked = []  # (parent, label, enfant) pas encore minimisés
+        self.minimized = {}
+
+    def insert(self, word):
+        if word <= self.previous and self.previous:
+            raise ValueError(f"Clés non triées ou dupliquées: {word!r} après {self.previous!r}")
+        common = 0
+        for a, b in zip(word, self.previous):
+            if a != b: break
+            common += 1
+        self._minimize(common)
+
+        node = self.unchecked[-1][2] if self.unchecked else self.root
+        for label in word[common:]:
+            child = _Node()
+            node.edges[label] = child
+            self.unchecked.append((node, label, child))
+            node = child
+        node.final = True
+        self.previous = word
+
+    def finish(self):
+        self._minimize(0)
+        return self.root
+
+    def _minimize(self, down_to):
+        for i in range(len(self.unchecked) - 1, down_to - 1, -1):
+            parent, label, child = self.unchecked[i]
+            key = child.signature()
+            if key in self.minimized:
+                parent.edges[label] = self.minimized[key]
+            else:
+                self.minimized[key] = child
+            self.unchecked.pop()
+
+def flatten(root):
+    """Numérote les noeuds (BFS) et produit des tableaux plats, avec le nombre de clés sous chaque noeud"""
+    order = [root]
+    index = {root.id: 0}
+    i = 0
+    while i < len(order):
+        for _, child in sorted(order[i].edges.items()):
+            if child.id not in index:
+                index[child.id] = len(order)
+                order.append(child)
+        i += 1
+
+    first_edge = array.array('I')
+    finals = array.array('B')
+    labels = array.array('I')
+    targets = array.array('I')
+    for node in order:
+        first_edge.append(len(labels))
+        finals.append(1 if node.final else 0)
+        for label, child in sorted(node.edges.items()):
+            labels.append(ord(label))
+            targets.append(index[child.id])
+    first_edge.append(len(labels))
+
+    # Nombre de clés acceptées depuis chaque noeud (hachage parfait minimal par rang),
+    # calculé en post-ordre puisque la numérotation BFS n'est pas topologique
+    counts = array.array('I', [0] * len(order))
+    visited = bytearray(len(order))
+    stack = [(0, False)]
+    while stack:
+        n, done = stack.pop()
+        if done:
+            counts[n] = finals[n] + sum(counts[targets[e]] for e in range(first_edge[n], first_edge[n + 1]))
+            continue
+        if visited[n]: continue
+        visited[n] = 1
+        stack.append((n, True))
+        for e in range(first_edge[n], first_edge[n + 1]):
+            if not visited[targets[e]]:
+                stack.append((targets[e], False))
+
+    return {'first_edge': first_edge, 'finals': finals, 'labels': labels,
+            'targets': targets, 'counts': counts}
+
+def build_dawg(keys):
+    builder = DawgBuilder()
+    for key in keys:
+        builder.insert(key)
+    return flatten(builder.finish())
+
+# ============ FORMAT BINAIRE ============
+# En-tête : MAGIC, version, nb clés, nb ids
+# Puis : offsets des payloads (clés + 1), ids, DAWG direct, DAWG inversé, permutation inversé -> direct
+# Chaque DAWG : nb noeuds, nb arcs, first_edge, counts, targets, labels, finals
+
+def _write_array(out, arr):
+    if sys.byteorder != 'little':
+        arr = array.array(arr.typecode, arr)
+        arr.byteswap()
+    out.write(arr.tobytes())
+
+def _write_dawg(out, dawg):
+    out.write(struct.pack('<II', len(dawg['finals']), len(dawg['labels'])))
+    for name in ('first_edge', 'counts', 'targets', 'labels', 'finals'):
+        _write_array(out, dawg[name])
+
+def write_asset(file_path, keys, payloads, forward, backward, reverse_to_forward):
+    offsets = array.array('I', [0])
+    ids = array.array('I')
+    for key in keys:
+        ids.extend(payloads[key])
+        offsets.append(len(ids))
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as out:
+        out.write(MAGIC)
+        out.write(struct.pack('<III', FORMAT_VERSION, len(keys), len(ids)))
+        _write_array(out, offsets)
+        _write_array(out, ids)
+        _write_dawg(out, forward)
+        _write_dawg(out, backward)
+        _write_array(out, reverse_to_forward)
+
+# ============ LECTEUR DE RÉFÉRENCE ============
+
+class _DawgView:
+    def __init__(self, buf, pos):
+        n_nodes, n_edges = struct.unpack_from('<II', buf, pos)
+        pos += 8
+        self.first_edge, pos = _read_array(buf, pos, 'I', n_nodes + 1)
+        self.counts, pos = _read_array(buf, pos, 'I', n_nodes)
+        self.targets, pos = _read_array(buf, pos, 'I', n_edges)
+        self.labels, pos = _read_array(buf, pos, 'I', n_edges)
+        self.finals, pos = _read_array(buf, pos, 'B', n_nodes)
+        self.end = pos
+
+    def child(self, node, char):
+        """Recherche dichotomique de l'arc étiqueté `char`"""
+        code = ord(char)
+        lo, hi = self.first_edge[node], self.first_edge[node + 1]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.labels[mid] < code: lo = mid + 1
+            else: hi = mid
+        if lo < self.first_edge[node + 1] and self.labels[lo] == code:
+            return lo
+        return -1
+
+    def walk(self, text, node=0, rank=0):
+        """Renvoie (noeud, rang de la première clé sous ce noeud) ou (None, None), depuis la racine par défaut"""
+        for char in text:
+            e = self.child(node, char)
+            if e < 0: return None, None
+            rank += self.finals[node]
+            for prev in range(self.first_edge[node], e):
+                rank += self.counts[self.targets[prev]]
+            node = self.targets[e]
+        return node, rank
+
+    def rank(self, word):
+        node, rank = self.walk(word)
+        if node is None or not self.finals[node]: return None
+        return rank
+
+    def iterate(self, node, rank, prefix):
+        """Enumère (clé, rang) sous un noeud, dans l'ordre lexicographique"""
+        stack = [(node, rank, prefix)]
+        while stack:
+            node, rank, prefix = stack.pop()
+            if self.finals[node]:
+                yield prefix, rank
+                rank += 1
+            children = []
+            for e in range(self.first_edge[node], self.first_edge[node + 1]):
+                target = self.targets[e]
+                children.append((target, rank, prefix + chr(self.labels[e])))
+                rank += self.counts[target]
+            stack.extend(reversed(children))
+
+    def match(self, pattern):
+        """Clés de longueur exacte len(pattern), '?' acceptant n'importe quel caractère"""
+        stack = [(0, 0, '')]
+        while stack:
+            node, rank, prefix = stack.pop()
+            depth = len(prefix)
+            if depth == len(pattern):
+                if self.finals[node]: yield prefix, rank
+                continue
+            rank += self.finals[node]
+            wanted = pattern[depth]
+            children = []
+            for e in range(self.first_edge[node], self.first_edge[node + 1]):
+                target = self.targets[e]
+                if wanted == WILDCARD or self.labels[e] == ord(wanted):
+                    children.append((target, rank, prefix + chr(self.labels[e])))
+                rank += self.counts[target]
+            stack.extend(reversed(children))
+
+def _read_array(buf, pos, typecode, count):
+    arr = array.array(typecode)
+    size = arr.itemsize * count
+    arr.frombytes(buf[pos:pos + size])
+    if sys.byteorder != 'little': arr.byteswap()
+    return arr, pos + size
+
+class KanaDawg:
+    """Lecteur de référence de kana_dawg.bin (le rang d'une clé indexe ses IDs de mots)"""
+
+    def __init__(self, buf):
+        if buf[:4] != MAGIC:
+            raise ValueError("Fichier DAWG invalide")
+        version, self.key_count, id_count = struct.unpack_from('<III', buf, 4)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Version DAWG non supportée: {version}")
+        pos = 16
+        self.offsets, pos = _read_array(buf, pos, 'I', self.key_count + 1)
+        self.ids, pos = _read_array(buf, pos, 'I', id_count)
+        self.forward = _DawgView(buf, pos)
+        self.backward = _DawgView(buf, self.forward.end)
+        self.reverse_to_forward, _ = _read_array(buf, self.backward.end, 'I', self.key_count)
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, 'rb') as f:
+            return cls(f.read())
+
+    def _ids(self, rank):
+        return list(self.ids[self.offsets[rank]:self.offsets[rank + 1]])
+
+    def __contains__(self, word):
+        return self.forward.rank(word) is not None
+
+    def word_ids(self, word):
+        rank = self.forward.rank(word)
+        return [] if rank is None else self._ids(rank)
+
+    def with_prefix(self, prefix):
+        node, rank = self.forward.walk(prefix)
+        if node is None: return
+        for key, r in self.forward.iterate(node, rank, prefix):
+            yield key, self._ids(r)
+
+    def with_suffix(self, suffix):
+        node, rank = self.backward.walk(suffix[::-1])
+        if node is None: return
+        for key, r in self.backward.iterate(node, rank, suffix[::-1]):
+            yield key[::-1], self._ids(self.reverse_to_forward[r])
+
+    def starting_with_mora(self, mora):
+        return self.with_prefix(mora)
+
+    def ending_with_mora(self, mora):
+        """Mots dont la dernière more (au sens du Shiritori) est `mora`"""
+        # last_mora ignore les 'ー' finaux : こーひー finit par ひ. Inversés, ces mots commencent par
+        # 'ー' * k puis la more inversée : on suit la chaîne de 'ー' depuis la racine et, à chaque
+        # profondeur, on descend par la more. Le filtre écarte les mores plus longues (ゃ dans きゃ).
+        head = mora[::-1]
+        chain, node, rank = '', 0, 0
+        while node is not None:
+            below, below_rank = self.backward.walk(head, node, rank) if head else (None, None)
+            if not head and self.backward.finals[node]:
+                # More vide : seuls les mots faits de 'ー' (la chaîne elle-même)
+                yield chain, self._ids(self.reverse_to_forward[rank])
+            if below is not None:
+                for key, r in self.backward.iterate(below, below_rank, chain + head):
+                    word = key[::-1]
+                    if last_mora(word) == mora:
+                        yield word, self._ids(self.reverse_to_forward[r])
+            node, rank = self.backward.walk(LONG_VOWEL, node, rank)
+            chain += LONG_VOWEL
+
+    def match(self, pattern):
+        for key, r in self.forward.match(pattern):
+            yield key, self._ids(r)
+
+# ============ BENCHMARK ============
+
+def bench(dawg, keys, rounds=2000):
+    import re
+    rng = random.Random(7)
+    key_set = set(keys)
+    samples = [rng.choice(keys) for _ in range(rounds)]
+    prefixes = [k[:rng.randint(1, min(2, len(k)))] for k in samples[:200]]
+    # Mores finales tirées au hasard, plus celles des mots en 'ー' (こーひー -> ひ)
+    moras = [last_mora(k) for k in samples[:200]]
+    moras += sorted({last_mora(k) for k in keys if k.endswith(LONG_VOWEL)} | {'ひ'})
+    patterns = []
+    for k in samples[:50]:
+        patterns.append(''.join(c if rng.random() < 0.5 else WILDCARD for c in k))
+
+    def timed(label, fn_dawg, fn_scan, queries):
+        t0 = time.perf_counter()
+        res_dawg = [fn_dawg(q) for q in queries]
+        t_dawg = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        res_scan = [fn_scan(q) for q in queries]
+        t_scan = time.perf_counter() - t0
+        same = all(a == b for a, b in zip(res_dawg, res_scan))
+        print(f"  {label:<18} {len(queries):>5} requêtes | DAWG {t_dawg * 1e6 / len(queries):8.1f} µs/req"
+              f" | scan {t_scan * 1e6 / len(queries):8.1f} µs/req | {'OK' if same else 'ÉCART'}")
+        return same
+
+    ok = timed('appartenance', lambda q: q in dawg, lambda q: q in key_set, samples)
+    ok &= timed('préfixe', lambda q: [k for k, _ in dawg.with_prefix(q)],
+                lambda q: sorted(k for k in keys if k.startswith(q)), prefixes)
+    ok &= timed('more finale', lambda q: sorted(k for k, _ in dawg.ending_with_mora(q)),
+                lambda q: sorted(k for k in keys if last_mora(k) == q), moras)
+    ok &= timed('motif', lambda q: [k for k, _ in dawg.match(q)],
+                lambda q: [k for k in keys if re.fullmatch(q.replace(WILDCARD, '.'), k)], patterns)
+    return ok
+
+# ============ FONCTION PRINCIPALE ============
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile les phonétiques en DAWG minimal avec IDs de mots')
+    parser.add_argument('--input', default=MERGED_FILE, help='Fichier merged_wordlist.json')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Fichier binaire de sortie')
+    parser.add_argument('--bench', action='store_true', help='Lance les micro-benchmarks après construction')
+    args = parser.parse_args()
+
+    data = load_json(args.input)
+    if not data:
+        print(f"Erreur: {args.input} introuvable.")
+        return
+
+    payloads = {}
+    for w in data.get('words', []):
+        key = clean_phonetics(w.get('phonetics'))
+        if key and str(w.get('id', '')).isdigit():
+            payloads.setdefault(key, []).append(int(w['id']))
+    keys = sorted(payloads)
+    print(f"{len(keys)} phonétiques distinctes ({sum(len(v) for v in payloads.values())} mots)")
+
+    t0 = time.perf_counter()
+    forward = build_dawg(keys)
+    reversed_keys = sorted(keys, key=lambda k: k[::-1])
+    backward = build_dawg([k[::-1] for k in reversed_keys])
+    forward_rank = {k: i for i, k in enumerate(keys)}
+    reverse_to_forward = array.array('I', [forward_rank[k] for k in reversed_keys])
+    print(f"DAWG: {len(forward['finals'])} noeuds / {len(forward['labels'])} arcs "
+          f"(inversé: {len(backward['finals'])} / {len(backward['labels'])}) en {time.perf_counter() - t0:.2f}s")
+
+    write_asset(args.output, keys, payloads, forward, backward, reverse_to_forward)
+    print(f"  -> {args.output} ({os.path.getsize(args.output) // 1024} Ko)")
+
+    if args.bench:
+        dawg = KanaDawg.load(args.output)
+        if not bench(dawg, keys):
+            print("Erreur: le DAWG ne correspond pas au scan linéaire.")
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
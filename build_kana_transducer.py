@@ -0,0 +1,397 @@
+#!/usr/bin/python3
+import os
+import sys
+import time
+import array
+import struct
+import argparse
+from mochi_assets.jsonio import load_json
+from build_kana_dawg import clean_phonetics
+
+# Configuration
+FILES_DIR = 'shared/src/commonMain/composeResources/files'
+HIRAGANA_FILE = os.path.join(FILES_DIR, 'kana/hiragana.json')
+KATAKANA_FILE = os.path.join(FILES_DIR, 'kana/katakana.json')
+MERGED_FILE = os.path.join(FILES_DIR, 'words/merged_wordlist.json')
+OUTPUT_FILE = os.path.join(FILES_DIR, 'kana/kana_transducer.bin')
+
+MAGIC = b'MKTR'
+FORMAT_VERSION = 1
+KATAKANA_OFFSET = 0x60
+LONG_VOWEL = 'ー'
+SOKUON = 'っ'
+IGNORED = '. '  # points des lectures (DictionaryViewModel) et espaces de saisie
+VOWEL_KANA = {'a': 'あ', 'i': 'い', 'u': 'う', 'e': 'え', 'o': 'お'}
+
+# Même table que KanaDropViewModel.kanaNormalizationMap (les petits katakanas passent d'abord en hiragana)
+SMALL_KANA = {
+    'ぁ': 'あ', 'ぃ': 'い', 'ぅ': 'う', 'ぇ': 'え', 'ぉ': 'お',
+    'っ': 'つ', 'ゃ': 'や', 'ゅ': 'ゆ', 'ょ': 'よ', 'ゎ': 'わ',
+    'ゕ': 'か', 'ゖ': 'け',
+}
+# Absents des fichiers kana (aucune case du tableau) : appariés par décalage Unicode
+EXTRA_KANA = 'ゔ' + ''.join(SMALL_KANA)
+
+# Saisies courantes hors Hepburn : Kunrei / Nihon-shiki et combinaisons des mots étrangers
+EXTRA_ROMAJI = {
+    'si': 'し', 'ti': 'ち', 'tu': 'つ', 'hu': 'ふ', 'zi': 'じ', 'di': 'ぢ', 'du': 'づ',
+    'sya': 'しゃ', 'syu': 'しゅ', 'syo': 'しょ', 'tya': 'ちゃ', 'tyu': 'ちゅ', 'tyo': 'ちょ',
+    'zya': 'じゃ', 'zyu': 'じゅ', 'zyo': 'じょ', 'jya': 'じゃ', 'jyu': 'じゅ', 'jyo': 'じょ',
+    'dya': 'ぢゃ', 'dyu': 'ぢゅ', 'dyo': 'ぢょ',
+    'she': 'しぇ', 'je': 'じぇ', 'che': 'ちぇ', 'tsa': 'つぁ', 'tsi': 'つぃ', 'tse': 'つぇ', 'tso': 'つぉ',
+    'fa': 'ふぁ', 'fi': 'ふぃ', 'fe': 'ふぇ', 'fo': 'ふぉ', 'thi': 'てぃ', 'dhi': 'でぃ', 'dhu': 'でゅ',
+    'wi': 'うぃ', 'we': 'うぇ', 'va': 'ゔぁ', 'vi': 'ゔぃ', 'vu': 'ゔ', 've': 'ゔぇ', 'vo': 'ゔぉ',
+    'xtu': 'っ', 'ltu': 'っ',
+}
+
+# ============ RÈGLES ============
+# Trois tables, chacune appliquée par plus long préfixe ; un caractère sans règle est recopié.
+#   hiragana : romaji (saisie en minuscules), katakana -> hiragana, points et espaces supprimés
+#   katakana : hiragana -> katakana
+#   fold     : sur du hiragana, petits kanas -> grands, voyelle longue 'ー' -> voyelle de la more
+# Clé de recherche d'une saisie : fold(hiragana(texte)).
+
+def load_kana(file_path):
+    data = load_json(file_path, strict=True)
+    return [(c['character'], c['romaji']) for c in data['characters']]
+
+def kana_pairs(hiragana, katakana):
+    """{hiragana: katakana} caractère par caractère, les deux fichiers appariés dans l'ordre (même romaji)"""
+    if len(hiragana) != len(katakana):
+        raise ValueError(f"{len(hiragana)} hiraganas pour {len(katakana)} katakanas")
+    pairs = {}
+    for (char, romaji), (other, other_romaji) in zip(hiragana, katakana):
+        if other_romaji != romaji or len(other) != len(char):
+            raise ValueError(f"{char} ({romaji}) apparié à {other} ({other_romaji})")
+        for h, k in zip(char, other):
+            if pairs.setdefault(h, k) != k:
+                raise ValueError(f"{h} associé à {pairs[h]} et à {k}")
+    for h in EXTRA_KANA:
+        pairs.setdefault(h, chr(ord(h) + KATAKANA_OFFSET))
+    return pairs
+
+def romaji_rules(hiragana):
+    """{romaji: hiragana} ; à romaji égal, la première case l'emporte (ji -> じ plutôt que ぢ)"""
+    rules = {}
+    for char, romaji in hiragana:
+        rules.setdefault(romaji, char)
+    for romaji, char in EXTRA_ROMAJI.items():
+        rules.setdefault(romaji, char)
+    for small, large in SMALL_KANA.items():
+        romaji = next((r for r, c in rules.items() if c == large), None)
+        if romaji:
+            rules.setdefault('x' + romaji, small)
+            rules.setdefault('l' + romaji, small)
+    rules['nn'] = rules["n'"] = 'ん'
+    rules['-'] = LONG_VOWEL
+
+    # Consonne doublée : petit tsu (kka -> っか, tchi -> っち) ; nn + voyelle : ん puis la more (onna -> おんな)
+    base = dict(rules)
+    for romaji, char in base.items():
+        c = romaji[0]
+        if c in VOWEL_KANA or c in 'xl' or not c.isalpha() or char == 'ん':
+            continue
+        if c == 'n':
+            rules.setdefault('n' + romaji, 'ん' + char)
+        else:
+            rules.setdefault(c + romaji, SOKUON + char)
+            if romaji.startswith('ch'):
+                rules.setdefault('t' + romaji, SOKUON + char)
+    return rules
+
+def build_tables(hiragana, katakana):
+    pairs = kana_pairs(hiragana, katakana)
+    to_hiragana = {k: h for h, k in pairs.items()}
+    to_hiragana.update(romaji_rules(hiragana))
+    to_hiragana.update({c: '' for c in IGNORED})
+
+    fold = dict(SMALL_KANA)
+    units = {char: romaji for char, romaji in hiragana}
+    for romaji, char in EXTRA_ROMAJI.items():
+        units.setdefault(char, romaji)
+    for unit, romaji in units.items():
+        if romaji[-1] in VOWEL_KANA:
+            folded = ''.join(SMALL_KANA.get(c, c) for c in unit)
+            fold[unit + LONG_VOWEL] = folded + VOWEL_KANA[romaji[-1]]
+    return {'hiragana': to_hiragana, 'katakana': pairs, 'fold': fold}
+
+# ============ COMPILATION ============
+
+def compile_table(rules):
+    """Trie des entrées (BFS, arcs triés) à plat ; chaque noeud terminal porte sa sortie"""
+    children = [{}]
+    outputs = [None]
+    for source in sorted(rules):
+        node = 0
+        for char in source:
+            nxt = children[node].get(char)
+            if nxt is None:
+                nxt = len(children)
+                children[node][char] = nxt
+                children.append({})
+                outputs.append(None)
+            node = nxt
+        outputs[node] = rules[source]
+
+    order = [0]
+    index = {0: 0}
+    for node in order:
+        for _, child in sorted(children[node].items()):
+            index[child] = len(order)
+            order.append(child)
+
+    table = {name: array.array(code) for name, code in
+             (('first_edge', 'I'), ('targets', 'I'), ('labels', 'H'), ('finals', 'B'),
+              ('out_offsets', 'I'), ('out_chars', 'H'))}
+    for node in order:
+        table['first_edge'].append(len(table['labels']))
+        table['finals'].append(outputs[node] is not None)
+        table['out_offsets'].append(len(table['out_chars']))
+        table['out_chars'].extend(_utf16(outputs[node] or ''))
+        for char, child in sorted(children[node].items()):
+            table['labels'].extend(_utf16(char))
+            table['targets'].append(index[child])
+    table['first_edge'].append(len(table['labels']))
+    table['out_offsets'].append(len(table['out_chars']))
+    return table
+
+def _utf16(text):
+    codes = [ord(c) for c in text]
+    if any(c > 0xFFFF for c in codes):
+        raise ValueError(f"Caractère hors BMP dans {text!r}")
+    return codes
+
+# ============ FORMAT BINAIRE ============
+# En-tête : MAGIC, version (u32), nb tables (u32)
+# Par table : nom (u8 + ascii), nb noeuds, nb arcs, nb caractères de sortie (u32 chacun), puis
+#   first_edge (u32, noeuds + 1), targets (u32), labels (u16), finals (u8),
+#   out_offsets (u32, noeuds + 1), out_chars (u16) ; la racine est le noeud 0
+
+ARRAYS = ('first_edge', 'targets', 'labels', 'finals', 'out_offsets', 'out_chars')
+
+def _write_array(out, arr):
+    if sys.byteorder != 'little':
+        arr = array.array(arr.typecode, arr)
+        arr.byteswap()
+    out.write(arr.tobytes())
+
+def write_asset(file_path, tables):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as out:
+        out.write(MAGIC)
+        out.write(struct.pack('<II', FORMAT_VERSION, len(tables)))
+        for name, table in tables.items():
+            encoded = name.encode('ascii')
+            out.write(struct.pack('<B', len(encoded)) + encoded)
+            out.write(struct.pack('<III', len(table['finals']), len(table['labels']), len(table['out_chars'])))
+            for key in ARRAYS:
+                _write_array(out, table[key])
+
+# ============ LECTEUR DE RÉFÉRENCE ============
+
+def _read_array(buf, pos, typecode, count):
+    arr = array.array(typecode)
+    size = arr.itemsize * count
+    arr.frombytes(buf[pos:pos + size])
+    if sys.byteorder != 'little': arr.byteswap()
+    return arr, pos + size
+
+class _TableView:
+    def __init__(self, buf, pos):
+        n_nodes, n_edges, n_out = struct.unpack_from('<III', buf, pos)
+        pos += 12
+        sizes = {'first_edge': n_nodes + 1, 'targets': n_edges, 'labels': n_edges, 'finals': n_nodes,
+                 'out_offsets': n_nodes + 1, 'out_chars': n_out}
+        typecodes = {'first_edge': 'I', 'targets': 'I', 'labels': 'H', 'finals': 'B',
+                     'out_offsets': 'I', 'out_chars': 'H'}
+        for key in ARRAYS:
+            arr, pos = _read_array(buf, pos, typecodes[key], sizes[key])
+            setattr(self, key, arr)
+        self.end = pos
+
+    def child(self, node, code):
+        """Recherche dichotomique de l'arc étiqueté `code` (-1 si absent)"""
+        lo, hi = self.first_edge[node], self.first_edge[node + 1]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.labels[mid] < code: lo = mid + 1
+            else: hi = mid
+        if lo < self.first_edge[node + 1] and self.labels[lo] == code:
+            return self.targets[lo]
+        return -1
+
+    def output(self, node):
+        return ''.join(map(chr, self.out_chars[self.out_offsets[node]:self.out_offsets[node + 1]]))
+
+    def apply(self, text):
+        """Plus long préfixe à chaque position ; sans règle, le caractère est recopié"""
+        out = []
+        i, n = 0, len(text)
+        while i < n:
+            node, j = 0, i
+            best_end = best_node = -1
+            while j < n:
+                node = self.child(node, ord(text[j]))
+                if node < 0: break
+                j += 1
+                if self.finals[node]:
+                    best_end, best_node = j, node
+            if best_end < 0:
+                out.append(text[i])
+                i += 1
+            else:
+                out.append(self.output(best_node))
+                i = best_end
+        return ''.join(out)
+
+class KanaTransducer:
+    """Lecteur de référence de kana_transducer.bin"""
+
+    def __init__(self, buf):
+        if buf[:4] != MAGIC:
+            raise ValueError("Fichier de transducteur invalide")
+        version, count = struct.unpack_from('<II', buf, 4)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Version de transducteur non supportée: {version}")
+        pos = 12
+        self.tables = {}
+        for _ in range(count):
+            length = buf[pos]
+            name = bytes(buf[pos + 1:pos + 1 + length]).decode('ascii')
+            table = _TableView(buf, pos + 1 + length)
+            self.tables[name] = table
+            pos = table.end
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, 'rb') as f:
+            return cls(f.read())
+
+    def to_hiragana(self, text):
+        return self.tables['hiragana'].apply(text.lower())
+
+    def to_katakana(self, text):
+        return self.tables['katakana'].apply(text)
+
+    def fold(self, text):
+        return self.tables['fold'].apply(text)
+
+    def search_key(self, text):
+        """Forme commune d'une saisie et d'une lecture : romaji ou katakana, petits kanas, 'ー', points"""
+        return self.fold(self.to_hiragana(text))
+
+# ============ BENCHMARK ============
+
+def romanize(text, hiragana):
+    """Hepburn d'un texte en hiragana (sert à fabriquer le corpus romaji du benchmark)"""
+    romaji = {}
+    for char, r in hiragana:
+        romaji.setdefault(char, r)
+    for r, char in EXTRA_ROMAJI.items():
+        romaji.setdefault(char, r)
+    for small, large in SMALL_KANA.items():
+        romaji.setdefault(small, 'x' + romaji.get(large, ''))
+    units = []
+    i = 0
+    while i < len(text):
+        unit = text[i:i + 2] if text[i:i + 2] in romaji else text[i]
+        units.append(unit)
+        i += len(unit)
+    out = []
+    for k, unit in enumerate(units):
+        nxt = romaji.get(units[k + 1], units[k + 1]) if k + 1 < len(units) else ''
+        if unit == SOKUON and nxt[:1].isalpha() and nxt[0] not in VOWEL_KANA and nxt[0] != 'n':
+            out.append('t' if nxt.startswith('ch') else nxt[0])
+        elif unit == 'ん':
+            out.append("n'" if nxt[:1] in ('a', 'i', 'u', 'e', 'o', 'y', 'n') else 'n')
+        elif unit == LONG_VOWEL:
+            out.append('-')
+        else:
+            out.append(romaji.get(unit, unit))
+    return ''.join(out)
+
+def greedy(rules):
+    """Approche ad hoc : dictionnaire et essais du plus long au plus court (même résultat attendu)"""
+    longest = max(map(len, rules))
+
+    def apply(text):
+        out = []
+        i = 0
+        while i < len(text):
+            for size in range(min(longest, len(text) - i), 0, -1):
+                chunk = text[i:i + size]
+                if chunk in rules:
+                    out.append(rules[chunk])
+                    i += size
+                    break
+            else:
+                out.append(text[i])
+                i += 1
+        return ''.join(out)
+    return apply
+
+def bench(transducer, tables, corpus, hiragana):
+    katakana = [transducer.to_katakana(p) for p in corpus]
+    romaji = [romanize(p, hiragana) for p in corpus]
+    ambiguous = str.maketrans('ぢづ', 'じず')  # ji / zu : Hepburn ne distingue pas ぢ et づ
+    translate = str.maketrans({h: k for h, k in tables['katakana'].items() if len(h) == 1})
+
+    def timed(label, fn, baseline, queries, expected):
+        t0 = time.perf_counter()
+        results = [fn(q) for q in queries]
+        t_table = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        reference = [baseline(q) for q in queries]
+        t_base = time.perf_counter() - t0
+        wrong = sum(r != e for r, e in zip(results, expected))
+        same = results == reference
+        print(f"  {label:<22} {len(queries):>6} chaînes | table {t_table * 1e6 / len(queries):6.1f} µs"
+              f" | ad hoc {t_base * 1e6 / len(queries):6.1f} µs | attendus {len(queries) - wrong}/{len(queries)}"
+              f" | {'OK' if same else 'ÉCART'}")
+        return same and not wrong
+
+    ok = timed('hiragana -> katakana', transducer.to_katakana, lambda q: q.translate(translate),
+               corpus, [p.translate(translate) for p in corpus])
+    ok &= timed('katakana -> hiragana', transducer.to_hiragana, greedy(tables['hiragana']), katakana, corpus)
+    ok &= timed('romaji -> hiragana', lambda q: transducer.to_hiragana(q).translate(ambiguous),
+                lambda q: greedy(tables['hiragana'])(q).translate(ambiguous), romaji,
+                [p.translate(ambiguous) for p in corpus])
+    folded = [transducer.fold(p) for p in corpus]
+    ok &= timed('clé de recherche', transducer.search_key,
+                lambda q: greedy(tables['fold'])(greedy(tables['hiragana'])(q.lower())), katakana, folded)
+    return ok
+
+# ============ FONCTION PRINCIPALE ============
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile les tables kana/romaji en transducteur à plus long préfixe')
+    parser.add_argument('--words', default=MERGED_FILE, help='Fichier merged_wordlist.json (corpus du benchmark)')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Fichier binaire de sortie')
+    parser.add_argument('--bench', action='store_true', help='Mesure le transducteur sur toutes les phonétiques')
+    args = parser.parse_args()
+
+    hiragana, katakana = load_kana(HIRAGANA_FILE), load_kana(KATAKANA_FILE)
+    t0 = time.perf_counter()
+    tables = build_tables(hiragana, katakana)
+    compiled = {name: compile_table(rules) for name, rules in tables.items()}
+    write_asset(args.output, compiled)
+    for name, table in compiled.items():
+        print(f"  {name:<9} {len(tables[name]):>5} règles, {len(table['finals']):>5} noeuds")
+    print(f"Transducteur compilé en {(time.perf_counter() - t0) * 1000:.0f} ms "
+          f"-> {args.output} ({os.path.getsize(args.output)} octets)")
+
+    if args.bench:
+        data = load_json(args.words)
+        if not data:
+            print(f"Erreur: {args.words} introuvable.")
+            sys.exit(1)
+        kana = set(tables['katakana'])
+        corpus = sorted({p for p in (clean_phonetics(w.get('phonetics')) for w in data.get('words', []))
+                         if p and all(c in kana or c == LONG_VOWEL for c in p)})
+        print(f"Corpus: {len(corpus)} phonétiques en hiragana")
+        if not bench(KanaTransducer.load(args.output), tables, corpus, hiragana):
+            print("Erreur: le transducteur ne correspond pas aux résultats attendus.")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
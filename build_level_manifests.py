@@ -0,0 +1,218 @@
+#!/usr/bin/python3
+import os
+import sys
+import time
+import argparse
+from mochi_assets.jsonio import load_json, save_json
+
+# Configuration
+FILES_DIR = 'shared/src/commonMain/composeResources/files'
+LEVELS_FILE = os.path.join(FILES_DIR, 'levels.json')
+KANJI_DETAILS_FILE = os.path.join(FILES_DIR, 'kanji/kanji_details.json')
+MERGED_FILE = os.path.join(FILES_DIR, 'words/merged_wordlist.json')
+GRAMMAR_FILE = os.path.join(FILES_DIR, 'grammar/grammar.json')
+KANA_FILES = {
+    'hiragana': os.path.join(FILES_DIR, 'kana/hiragana.json'),
+    'katakana': os.path.join(FILES_DIR, 'kana/katakana.json'),
+}
+MEANINGS_PATTERN = os.path.join(FILES_DIR, 'meanings/meanings_{}.json')
+DEFAULT_LOCALE = 'en_rGB'
+OUTPUT_FILE = os.path.join(FILES_DIR, 'level_manifests.json')
+FORMAT_VERSION = 1
+
+# ============ FORMAT DU MANIFESTE ============
+# {"version", "locale", "sources": {source: chemin relatif à files/},
+#  "levels": {id niveau: {"section", "activities": {TYPE: {"dataFile", "key", "source", "count", "ids"}}}}}
+# "key" est la clé que StatisticsEngine passe à LevelContentProvider (l'id du niveau pour
+# "kanji_details"). "ids" est trié et ne contient que des entiers : l'id des kanjis et des mots,
+# la position dans le fichier source pour les kanas et les règles de grammaire (dependencies_basics
+# puis rules, l'ordre de GrammarRepository.getAllRules). Seules les activités actives y figurent.
+
+def _as_list(value):
+    if value is None: return []
+    return value if isinstance(value, list) else [value]
+
+def _relative(path):
+    relative = os.path.relpath(path, FILES_DIR).replace(os.sep, '/')
+    return path if relative.startswith('..') else relative
+
+# ============ SOURCES ============
+# Chaque source est chargée une seule fois, à la première activité qui la demande.
+
+class Sources:
+    def __init__(self, kanji_file, words_file, locale):
+        self.paths = {
+            'kanji_details': kanji_file,
+            'merged_wordlist': words_file,
+            'grammar': GRAMMAR_FILE,
+            **KANA_FILES,
+        }
+        self.meanings_file = MEANINGS_PATTERN.format(locale)
+        self.loaded = {}
+
+    def get(self, source):
+        if source not in self.loaded:
+            data = load_json(self.paths[source])
+            self.loaded[source] = None if data is None else self._entries(source, data)
+        return self.loaded[source]
+
+    def _entries(self, source, data):
+        if source == 'kanji_details':
+            return [k for k in data.get('kanji_details', {}).get('kanji', []) if str(k.get('id', '')).isdigit()]
+        if source == 'merged_wordlist':
+            return [w for w in data.get('words', []) if str(w.get('id', '')).isdigit()]
+        if source == 'grammar':
+            return data.get('dependencies_basics', []) + data.get('rules', [])
+        return data.get('characters', [])
+
+    def kanji_with_meanings(self):
+        if 'meanings' not in self.loaded:
+            data = load_json(self.meanings_file) or {}
+            entries = data.get('meanings', {}).get('kanji', [])
+            self.loaded['meanings'] = {str(e['@id']) for e in entries if _as_list(e.get('meaning'))}
+        return self.loaded['meanings']
+
+def source_for(data_file):
+    """Source qui porte le contenu d'un dataFile de levels.json (None : dataFile inconnu)"""
+    lower = data_file.lower()
+    if lower == 'kanji_details': return 'kanji_details'
+    if 'wordlist' in lower: return 'merged_wordlist'
+    if lower.startswith('jlpt_grammar_'): return 'grammar'
+    if lower in KANA_FILES: return lower
+    return None
+
+# ============ RÉSOLUTION ============
+# Mêmes filtres que l'application : LevelContentProvider.getCharactersForLevel,
+# KanjiRepository, WordRepository.getWordsByConfig et les niveaux de grammar.json.
+
+def _reading_list(kanji):
+    readings = kanji.get('readings')
+    return _as_list(readings.get('reading')) if isinstance(readings, dict) else None
+
+def resolve_kanji(sources, key):
+    kanji = sources.get('kanji_details')
+    if kanji is None: return None
+    lower = key.lower()
+    if lower in ('native_challenge', 'no_reading', 'no_meaning'):
+        uncategorized = [k for k in kanji if not _as_list(k.get('category'))]
+        if lower == 'native_challenge':
+            selected = [k for k in uncategorized if _reading_list(k)]
+        else:
+            with_meanings = sources.kanji_with_meanings()
+            if lower == 'no_reading':
+                selected = [k for k in uncategorized if _reading_list(k) == [] and str(k['id']) in with_meanings]
+            else:
+                selected = [k for k in uncategorized if str(k['id']) not in with_meanings]
+    else:
+        selected = [k for k in kanji if any(str(l).lower() == lower for l in _as_list(k.get('level')))]
+    return [int(k['id']) for k in selected]
+
+def resolve_words(sources, config):
+    words = sources.get('merged_wordlist')
+    if words is None: return None
+    jlpt, min_rank, max_rank = config.get('jlpt'), config.get('minRank'), config.get('maxRank')
+    ids = []
+    for w in words:
+        if jlpt is not None and w.get('jlpt') != jlpt: continue
+        if min_rank is not None or max_rank is not None:
+            rank = str(w.get('rank', '')).strip()
+            if not rank.lstrip('-').isdigit(): continue
+            rank = int(rank)
+            if min_rank is not None and rank < min_rank: continue
+            if max_rank is not None and rank > max_rank: continue
+        ids.append(int(w['id']))
+    return ids
+
+def resolve_grammar(sources, data_file):
+    rules = sources.get('grammar')
+    if rules is None: return None
+    level = data_file.lower().rsplit('_', 1)[-1]
+    return [i for i, rule in enumerate(rules) if rule.get('level') == level]
+
+def resolve_kana(sources, source):
+    characters = sources.get(source)
+    return None if characters is None else list(range(len(characters)))
+
+def resolve(sources, level_id, config):
+    """(clé, source, ids) ; ids vaut None si le fichier source est absent"""
+    data_file = config.get('dataFile', '')
+    source = source_for(data_file)
+    key = level_id if data_file == 'kanji_details' else data_file
+    if source == 'kanji_details':
+        ids = resolve_kanji(sources, key)
+    elif source == 'merged_wordlist':
+        # WordRepository.getWordEntriesForLevel relit la config READING du niveau
+        ids = resolve_words(sources, config)
+    elif source == 'grammar':
+        ids = resolve_grammar(sources, data_file)
+    else:
+        ids = resolve_kana(sources, source)
+    return key, source, None if ids is None else sorted(ids)
+
+def build_manifests(levels, sources):
+    """Manifeste, erreurs et avertissements ({problème: [niveau/activité]}, pour ne citer chaque cause qu'une fois)"""
+    manifest = {}
+    errors, warnings = {}, {}
+    for section_id, section in levels.get('sections', {}).items():
+        for level in section.get('levels', []):
+            activities = {}
+            for activity, config in level.get('activities', {}).items():
+                enabled = config.get('enabled', True)
+                where = f"{level['id']}/{activity}"
+                if source_for(config.get('dataFile', '')) is None:
+                    # Un dataFile inconnu ne gêne pas tant que l'activité reste désactivée
+                    problem = f"dataFile inconnu: {config.get('dataFile')}"
+                    (errors if enabled else warnings).setdefault(problem, []).append(where)
+                    continue
+                key, source, ids = resolve(sources, level['id'], config)
+                if ids is None:
+                    problem = f"{sources.paths[source]} introuvable"
+                    (errors if enabled else warnings).setdefault(problem, []).append(where)
+                    continue
+                if not ids:
+                    warnings.setdefault(f"aucun élément pour {key}", []).append(where)
+                if enabled:
+                    activities[activity] = {'dataFile': config['dataFile'], 'key': key, 'source': source,
+                                            'count': len(ids), 'ids': ids}
+            manifest[level['id']] = {'section': section_id, 'activities': activities}
+    return manifest, errors, warnings
+
+def main():
+    parser = argparse.ArgumentParser(description='Résout levels.json en listes triées d\'IDs par niveau et par activité')
+    parser.add_argument('--levels', default=LEVELS_FILE, help='Fichier levels.json')
+    parser.add_argument('--kanji', default=KANJI_DETAILS_FILE, help='Fichier kanji_details.json')
+    parser.add_argument('--words', default=MERGED_FILE, help='Fichier merged_wordlist.json')
+    parser.add_argument('--locale', default=DEFAULT_LOCALE, help='Sens utilisés pour no_reading / no_meaning')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Fichier de sortie')
+    parser.add_argument('--check', action='store_true', help='Vérifie les dataFiles sans écrire le manifeste')
+    args = parser.parse_args()
+
+    levels = load_json(args.levels, strict=True)
+    sources = Sources(args.kanji, args.words, args.locale)
+    t0 = time.perf_counter()
+    manifest, errors, warnings = build_manifests(levels, sources)
+
+    for level_id, level in manifest.items():
+        counts = ', '.join(f"{activity} {a['count']}" for activity, a in level['activities'].items())
+        print(f"  {level_id:<18} {counts}")
+    for problem, where in warnings.items():
+        print(f"⚠️  {problem} ({', '.join(where)})")
+    for problem, where in errors.items():
+        print(f"❌ {problem} ({', '.join(where)})")
+    print(f"{len(manifest)} niveaux résolus en {(time.perf_counter() - t0) * 1000:.0f} ms")
+    if errors:
+        sys.exit(1)
+    if args.check:
+        return
+
+    output = {
+        'version': FORMAT_VERSION,
+        'locale': args.locale,
+        'sources': {name: _relative(path) for name, path in sources.paths.items() if name in sources.loaded},
+        'levels': manifest,
+    }
+    save_json(args.output, output, indent=None)
+    print(f"✅ {args.output} ({os.path.getsize(args.output)} octets)")
+
+if __name__ == "__main__":
+    main()
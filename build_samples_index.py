@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+import os
+import re
+import csv
+import time
+import argparse
+from mochi_assets.jsonio import load_json, save_json
+
+# Configuration
+FILES_DIR = 'shared/src/commonMain/composeResources/files'
+GRAMMAR_DIR = os.path.join(FILES_DIR, 'grammar')
+SAMPLE_FILES = ['samples.csv', 'samples-cut.csv']
+MERGED_FILE = os.path.join(FILES_DIR, 'words/merged_wordlist.json')
+EXAMPLES_PER_ROW = 4
+MIN_KANA_WORD_LENGTH = 3  # Les mots purement en hiragana plus courts (の, です...) sont ignorés
+
+TRANSLATION_PATTERN = re.compile(r'\s*\(.*\)\s*$')
+KANJI_PATTERN = re.compile(r'[㐀-䶿一-龯々]')
+HIRAGANA_PATTERN = re.compile(r'^[぀-ゟ]+$')
+
+def delta_encode(doc_list):
+    out = []
+    previous = 0
+    for doc in doc_list:
+        out.append(doc - previous)
+        previous = doc
+    return out
+
+# ============ LECTURE DES CSV ============
+
+def read_samples(file_path):
+    """
+    Renvoie [(clé de ligne, [phrase japonaise x4])].
+    samples.csv : Forme;Ex1 (trad);...  -- samples-cut.csv : id;Forme;Ex1;trad1;...
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        rows = list(csv.reader(f, delimiter=';'))
+    if not rows: return []
+    has_id = rows[0][0].strip().lower() == 'id'
+
+    samples = []
+    for row in rows[1:]:
+        if has_id:
+            key = row[0].strip()
+            examples = [row[i] for i in range(2, len(row), 2)]
+        else:
+            key = row[0].strip()
+            examples = row[1:]
+        examples = (examples + [''] * EXAMPLES_PER_ROW)[:EXAMPLES_PER_ROW]
+        samples.append((key, [TRANSLATION_PATTERN.sub('', e).strip() for e in examples]))
+    return samples
+
+# ============ TOKENISATION ============
+
+class WordMatcher:
+    """Recherche de tous les mots du dictionnaire contenus dans une phrase (indexés par 1er caractère)"""
+
+    def __init__(self, words):
+        self.by_first = {}
+        for w in words:
+            text = w.get('text', '')
+            if not text: continue
+            if HIRAGANA_PATTERN.match(text) and len(text) < MIN_KANA_WORD_LENGTH: continue
+            self.by_first.setdefault(text[0], {}).setdefault(len(text), {})[text] = int(w['id'])
+        # Longueurs décroissantes pour chaque premier caractère
+        self.by_first = {c: sorted(lengths.items(), reverse=True) for c, lengths in self.by_first.items()}
+
+    def find(self, sentence):
+        found = set()
+        for i, char in enumerate(sentence):
+            for length, texts in self.by_first.get(char, ()):
+                word_id = texts.get(sentence[i:i + length])
+                if word_id is not None: found.add(word_id)
+        return found
+
+def tokenize(sentence, matcher):
+    kanji = set(KANJI_PATTERN.findall(sentence))
+    kanji.discard('々')
+    words = matcher.find(sentence) if matcher else set()
+    return kanji, words
+
+# ============ INDEXATION ============
+
+def build_index(samples, matcher):
+    """Identifiant de phrase = ligne * 4 + numéro d'exemple"""
+    kanji_postings = {}
+    word_postings = {}
+    for row, (_, examples) in enumerate(samples):
+        for n, sentence in enumerate(examples):
+            if not sentence: continue
+            sentence_id = row * EXAMPLES_PER_ROW + n
+            kanji, words = tokenize(sentence, matcher)
+            for k in kanji: kanji_postings.setdefault(k, []).append(sentence_id)
+            for w in words: word_postings.setdefault(str(w), []).append(sentence_id)
+
+    return {
+        "version": 1,
+        "examplesPerRow": EXAMPLES_PER_ROW,
+        "rows": [key for key, _ in samples],
+        "kanji": {k: delta_encode(v) for k, v in kanji_postings.items()},
+        "words": {w: delta_encode(v) for w, v in word_postings.items()},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexe les phrases d'exemple par kanji et par mot")
+    parser.add_argument('--grammar-dir', default=GRAMMAR_DIR, help='Dossier contenant les CSV')
+    parser.add_argument('--words', default=MERGED_FILE, help='Fichier merged_wordlist.json')
+    args = parser.parse_args()
+
+    words_data = load_json(args.words)
+    matcher = None
+    if words_data:
+        matcher = WordMatcher(words_data.get('words', []))
+    else:
+        print(f"Attention: {args.words} introuvable, index des kanjis seulement.")
+
+    for name in SAMPLE_FILES:
+        in_file = os.path.join(args.grammar_dir, name)
+        if not os.path.exists(in_file):
+            print(f"{in_file} introuvable, ignoré.")
+            continue
+
+        t0 = time.perf_counter()
+        samples = read_samples(in_file)
+        index = build_index(samples, matcher)
+        elapsed = time.perf_counter() - t0
+
+        out_file = os.path.join(args.grammar_dir, name.replace('.csv', '_index.json'))
+        save_json(out_file, index, indent=None, sort_keys=True)
+
+        sentences = sum(1 for _, ex in samples for s in ex if s)
+        chars = sum(len(s) for _, ex in samples for s in ex)
+        print(f"{name}: {sentences} phrases, {len(index['kanji'])} kanjis, {len(index['words'])} mots "
+              f"-> {out_file} ({os.path.getsize(out_file) // 1024} Ko)")
+        print(f"  Débit: {sentences / elapsed:.0f} phrases/s, {chars / elapsed / 1000:.0f} k caractères/s")
+
+if __name__ == "__main__":
+    main()
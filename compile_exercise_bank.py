@@ -0,0 +1,172 @@
+#!/usr/bin/python3
+import os
+import sys
+import argparse
+from mochi_assets.jsonio import load_json, save_json
+
+# Configuration
+GRAMMAR_DIR = 'shared/src/commonMain/composeResources/files/grammar'
+GRAMMAR_FILE = os.path.join(GRAMMAR_DIR, 'grammar.json')
+EXERCISES_FILE = os.path.join(GRAMMAR_DIR, 'exercices.json')
+OUTPUT_FILE = os.path.join(GRAMMAR_DIR, 'exercise_bank.json')
+
+EXERCISE_TYPES = {'FILL_BLANK', 'SENTENCE_ORDER', 'UNDERLINE_READING',
+                  'UNDERLINE_WRITING', 'PARAPHRASE', 'WORD_USAGE'}
+UNCLASSIFIED = 'unclassified'
+
+# ============ GRAPHE DES DÉPENDANCES ============
+
+def load_grammar_nodes(grammar, errors, warnings):
+    nodes = {}
+    for rule in grammar.get('dependencies_basics', []) + grammar.get('rules', []):
+        rule_id = rule.get('id')
+        if not rule_id:
+            errors.append(f"Règle sans id: {rule}")
+        elif rule_id in nodes:
+            errors.append(f"Règle dupliquée: {rule_id}")
+        else:
+            nodes[rule_id] = rule
+
+    for rule_id, rule in nodes.items():
+        for dep in rule.get('dependencies', []):
+            if dep not in nodes:
+                warnings.append(f"Dépendance inconnue: {rule_id} -> {dep}")
+    return nodes
+
+def topological_order(nodes, levels, errors):
+    """Kahn, départage déterministe par (niveau, id). Les dépendances inconnues sont ignorées."""
+    level_rank = {l: i for i, l in enumerate(levels)}
+    deps = {n: [d for d in r.get('dependencies', []) if d in nodes] for n, r in nodes.items()}
+    dependents = {n: [] for n in nodes}
+    remaining = {n: len(d) for n, d in deps.items()}
+    for n, ds in deps.items():
+        for d in ds: dependents[d].append(n)
+
+    def sort_key(n):
+        return (level_rank.get(nodes[n].get('level'), len(levels)), n)
+
+    ready = sorted((n for n, c in remaining.items() if c == 0), key=sort_key)
+    order = []
+    while ready:
+        n = ready.pop(0)
+        order.append(n)
+        released = []
+        for m in dependents[n]:
+            remaining[m] -= 1
+            if remaining[m] == 0: released.append(m)
+        if released:
+            ready = sorted(ready + released, key=sort_key)
+
+    if len(order) != len(nodes):
+        cyclic = sorted(n for n, c in remaining.items() if c > 0)
+        errors.append(f"Cycle de dépendances entre: {', '.join(cyclic)}")
+    return order, deps
+
+def transitive_prerequisites(order, deps):
+    """Ensemble des prérequis de chaque règle, calculé dans l'ordre topologique"""
+    prereqs = {}
+    for n in order:
+        closure = set()
+        for d in deps[n]:
+            closure.add(d)
+            closure |= prereqs[d]
+        prereqs[n] = closure
+    return prereqs
+
+# ============ EXERCICES ============
+
+def check_exercises(exercises, nodes, categories, errors, warnings):
+    seen = set()
+    for ex in exercises:
+        ex_id = ex.get('id')
+        if not ex_id:
+            errors.append(f"Exercice sans id: {ex}")
+            continue
+        if ex_id in seen:
+            errors.append(f"Exercice dupliqué: {ex_id}")
+        seen.add(ex_id)
+        if ex.get('type') not in EXERCISE_TYPES:
+            errors.append(f"{ex_id}: type inconnu {ex.get('type')}")
+        if not ex.get('tags'):
+            warnings.append(f"{ex_id}: aucun tag")
+        for tag in ex.get('tags', []):
+            if tag not in nodes and tag not in categories:
+                warnings.append(f"{ex_id}: tag inconnu '{tag}'")
+
+def exercise_level(ex, nodes, levels):
+    """Niveau le plus avancé parmi les règles ciblées par les tags"""
+    found = [nodes[t].get('level') for t in ex.get('tags', []) if t in nodes]
+    found = [l for l in found if l in levels and l != UNCLASSIFIED]
+    if not found: return UNCLASSIFIED
+    return max(found, key=levels.index)
+
+def build_bank(grammar, exercises_data, errors, warnings):
+    metadata = grammar.get('metadata', {})
+    levels = metadata.get('levels', [])
+    categories = set(metadata.get('categories', []))
+
+    nodes = load_grammar_nodes(grammar, errors, warnings)
+    order, deps = topological_order(nodes, levels, errors)
+    prereqs = transitive_prerequisites(order, deps)
+    position = {n: i for i, n in enumerate(order)}
+
+    exercises = exercises_data.get('exercises', [])
+    check_exercises(exercises, nodes, categories, errors, warnings)
+
+    by_tag = {}
+    by_level = {}
+    for i, ex in enumerate(exercises):
+        for tag in ex.get('tags', []):
+            by_tag.setdefault(tag, []).append(i)
+        by_level.setdefault(exercise_level(ex, nodes, levels), []).append(i)
+
+    # Exercices accessibles pour une règle = les siens + ceux de tous ses prérequis
+    unlocked = {}
+    for n in order:
+        pool = set(by_tag.get(n, []))
+        for p in prereqs[n]: pool |= set(by_tag.get(p, []))
+        unlocked[n] = sorted(pool)
+
+    return {
+        "version": 1,
+        "sourceVersion": exercises_data.get('meta', {}).get('version'),
+        "exerciseIds": [ex.get('id') for ex in exercises],
+        "order": order,
+        "prerequisites": {n: sorted(position[p] for p in prereqs[n]) for n in order},
+        "byTag": by_tag,
+        "byLevel": by_level,
+        "unlocked": unlocked,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile la banque d'exercices indexée par règle, tag et niveau")
+    parser.add_argument('--grammar', default=GRAMMAR_FILE, help='Fichier grammar.json')
+    parser.add_argument('--exercises', default=EXERCISES_FILE, help='Fichier exercices.json')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Fichier de sortie')
+    parser.add_argument('--strict', action='store_true', help='Les avertissements font échouer la compilation')
+    args = parser.parse_args()
+
+    grammar = load_json(args.grammar)
+    exercises_data = load_json(args.exercises)
+    if not grammar or not exercises_data:
+        print("Erreur: grammar.json ou exercices.json introuvable.")
+        sys.exit(1)
+
+    errors, warnings = [], []
+    bank = build_bank(grammar, exercises_data, errors, warnings)
+
+    for w in warnings: print(f"  ⚠️  {w}")
+    for e in errors: print(f"  ❌ {e}")
+    if errors or (args.strict and warnings):
+        print(f"Compilation échouée: {len(errors)} erreur(s), {len(warnings)} avertissement(s).")
+        sys.exit(1)
+
+    save_json(args.output, bank, indent=None)
+
+    print(f"{len(bank['exerciseIds'])} exercices, {len(bank['order'])} règles, {len(bank['byTag'])} tags, "
+          f"{len(warnings)} avertissement(s) -> {args.output}")
+    for level, items in bank['byLevel'].items():
+        print(f"  {level}: {len(items)} exercices")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/python3
+import os
+import sys
+import glob
+import time
+import struct
+import argparse
+from mochi_assets.jsonio import dumps, loads, load_json
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Configuration
+FILES_DIR = 'shared/src/commonMain/composeResources/files'
+SOURCE_PATTERNS = [
+    os.path.join(FILES_DIR, 'meanings/meanings_*.json'),
+    os.path.join(FILES_DIR, 'words/meanings/word_meanings_*.json'),
+]
+OUTPUT_DIR = os.path.join(FILES_DIR, 'compressed')
+DICT_NAME = 'meanings.zdict'
+DICT_SIZE = 110 * 1024  # octets, taille par défaut de zstd --train
+BLOCK_ENTRIES = 0       # 0 : une trame zstd par fichier, sans dictionnaire (le plus petit)
+BENCH_BLOCK_ENTRIES = 256  # blocs comparés par --bench quand aucun n'est demandé
+LEVEL = 19
+
+MAGIC = b'MZST'
+FORMAT_VERSION = 1
+
+# ============ FORMATS ============
+# Par défaut : un .json.zst par fichier JSON, trame zstd standard du JSON compact.
+#
+# Avec --block-entries N : un fichier .mzst par fichier JSON, tous compressés avec le même
+# dictionnaire entraîné, pour lire une entrée sans tout décompresser.
+# En-tête : MAGIC, version (u16), id du dictionnaire (u32, 0 sans dictionnaire), entrées par bloc (u32), nb blocs (u32)
+# Modèle : longueur (u32) + JSON compact du document avec le tableau vidé, puis les deux clés
+#          menant au tableau (u16 + utf-8 chacune)
+# Index : trame des IDs ('\n'.join), puis une trame par bloc : offset (u32), longueur (u32)
+# Données : trames zstd sans en-tête de dictionnaire, offsets relatifs au début de la zone de données
+#
+# Mesuré sur les 27 fichiers (30 Mo) : fichier entier 2,78 Mo ; blocs de 256 entrées 4,05 Mo sans
+# dictionnaire, 3,89 Mo avec. Le dictionnaire ne rattrape qu'une partie de ce que coûte le découpage
+# (et alourdit les trames entières) : les blocs ne servent qu'à l'accès direct à une entrée.
+
+def find_array(data):
+    """(clé racine, clé du tableau) : ('meanings', 'kanji') ou ('word_meanings', 'entries')"""
+    for root_key, body in data.items():
+        if isinstance(body, dict):
+            for list_key, value in body.items():
+                if isinstance(value, list):
+                    return root_key, list_key
+    raise ValueError("aucun tableau d'entrées trouvé")
+
+def split_blocks(data, block_entries):
+    """Modèle, clés et blocs d'entrées (JSON compact) d'un fichier de sens"""
+    root_key, list_key = find_array(data)
+    entries = data[root_key][list_key]
+    template = {**data, root_key: {**data[root_key], list_key: []}}
+    blocks = [dumps(entries[i:i + block_entries], indent=None) for i in range(0, len(entries), block_entries)]
+    ids = '\n'.join(str(e.get('@id', '')) for e in entries).encode('utf-8')
+    return dumps(template, indent=None), (root_key, list_key), ids, blocks
+
+def train(sources, dict_size, block_entries):
+    """Dictionnaire entraîné sur les blocs eux-mêmes (id déterministe : dérivé du contenu)"""
+    samples = []
+    for path in sources:
+        samples += split_blocks(load_json(path, strict=True), block_entries)[3]
+    return zstandard.train_dictionary(dict_size, samples)
+
+def compress_whole(data, level):
+    """Format par défaut : le JSON compact en une seule trame"""
+    return zstandard.ZstdCompressor(level=level).compress(dumps(data, indent=None))
+
+def load_whole(file_path):
+    """Lecteur du format par défaut"""
+    with open(file_path, 'rb') as f:
+        return loads(zstandard.ZstdDecompressor().decompress(f.read()))
+
+def build_archive(data, dictionary, level, block_entries):
+    """Archive par blocs ; dictionary peut valoir None (mesure des blocs sans dictionnaire)"""
+    template, keys, ids, blocks = split_blocks(data, block_entries)
+    compressor = zstandard.ZstdCompressor(level=level, dict_data=dictionary, write_dict_id=False)
+    frames = [compressor.compress(ids)] + [compressor.compress(b) for b in blocks]
+
+    dict_id = dictionary.dict_id() if dictionary else 0
+    header = bytearray(MAGIC + struct.pack('<HIII', FORMAT_VERSION, dict_id, block_entries, len(blocks)))
+    header += struct.pack('<I', len(template)) + template
+    for key in keys:
+        encoded = key.encode('utf-8')
+        header += struct.pack('<H', len(encoded)) + encoded
+    offset = 0
+    for frame in frames:
+        header += struct.pack('<II', offset, len(frame))
+        offset += len(frame)
+    return bytes(header) + b''.join(frames)
+
+def load_dictionary(file_path):
+    with open(file_path, 'rb') as f:
+        return zstandard.ZstdCompressionDict(f.read())
+
+class MeaningsArchive:
+    """Lecteur de référence : load() rend le JSON d'origine, entry(id) ne décompresse qu'un bloc"""
+
+    def __init__(self, content, dictionary):
+        if zstandard is None:
+            raise ImportError("Module zstandard manquant (pip install zstandard)")
+        if content[:4] != MAGIC:
+            raise ValueError("Archive de sens invalide")
+        version, dict_id, self.block_entries, count = struct.unpack_from('<HIII', content, 4)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Version d'archive non supportée: {version}")
+        if dict_id != (dictionary.dict_id() if dictionary else 0):
+            raise ValueError(f"Dictionnaire {dictionary.dict_id() if dictionary else 0} au lieu de {dict_id}")
+        pos = 18
+        (length,) = struct.unpack_from('<I', content, pos)
+        self.template = content[pos + 4:pos + 4 + length]
+        pos += 4 + length
+        self.keys = []
+        for _ in range(2):
+            (length,) = struct.unpack_from('<H', content, pos)
+            self.keys.append(content[pos + 2:pos + 2 + length].decode('utf-8'))
+            pos += 2 + length
+        frames = [struct.unpack_from('<II', content, pos + 8 * i) for i in range(count + 1)]
+        data_start = pos + 8 * (count + 1)
+        self.frames = [memoryview(content)[data_start + o:data_start + o + n] for o, n in frames]
+        self.decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+        self.positions = None
+        self.cached = (None, None)
+
+    @classmethod
+    def open(cls, file_path, dictionary):
+        with open(file_path, 'rb') as f:
+            return cls(f.read(), dictionary)
+
+    def _block(self, index):
+        if self.cached[0] != index:
+            self.cached = (index, loads(self.decompressor.decompress(self.frames[index + 1])))
+        return self.cached[1]
+
+    def entry(self, entry_id):
+        if self.positions is None:
+            ids = self.decompressor.decompress(self.frames[0]).decode('utf-8')
+            self.positions = {key: i for i, key in enumerate(ids.split('\n'))} if ids else {}
+        position = self.positions.get(str(entry_id))
+        if position is None: return None
+        return self._block(position // self.block_entries)[position % self.block_entries]
+
+    def load(self):
+        data = loads(self.template)
+        root_key, list_key = self.keys
+        entries = data[root_key][list_key]
+        for frame in self.frames[1:]:
+            entries += loads(self.decompressor.decompress(frame))
+        return data
+
+# ============ MESURES ============
+
+def _best_of(fn, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def report(sources, dictionary, level, block_entries, rounds):
+    """
+    Tailles et vitesses de décodage : JSON brut, zstd du fichier entier (brut puis compact, le format
+    par défaut), blocs sans puis avec dictionnaire. Renvoie False si le dictionnaire ne paie pas.
+    """
+    raw = plain = whole = blocks = archives = 0
+    t_json = t_whole = t_archive = t_entry = 0.0
+    lookups = 0
+    plain_compressor = zstandard.ZstdCompressor(level=level)
+    decompressor = zstandard.ZstdDecompressor()
+    for source in sources:
+        with open(source, 'rb') as f:
+            content = f.read()
+        data = loads(content)
+        packed = compress_whole(data, level)
+        archive_bytes = build_archive(data, dictionary, level, block_entries)
+        raw += len(content)
+        plain += len(plain_compressor.compress(content))
+        whole += len(packed)
+        blocks += len(build_archive(data, None, level, block_entries))
+        archives += len(archive_bytes)
+
+        archive = MeaningsArchive(archive_bytes, dictionary)
+        ids = [str(e.get('@id')) for e in archive.load()[archive.keys[0]][archive.keys[1]]]
+        sample = ids[::max(1, len(ids) // 100)]
+        t_json += _best_of(lambda: loads(content), rounds)
+        t_whole += _best_of(lambda: loads(decompressor.decompress(packed)), rounds)
+        t_archive += _best_of(lambda: MeaningsArchive(archive_bytes, dictionary).load(), rounds)
+
+        def lookup():
+            # Archive fraîche : chaque recherche part d'un bloc non décompressé
+            reader = MeaningsArchive(archive_bytes, dictionary)
+            for entry_id in sample:
+                reader.cached = (None, None)
+                reader.entry(entry_id)
+        t_entry += _best_of(lookup, rounds)
+        lookups += len(sample)
+
+    dict_size = len(dictionary.as_bytes())
+    with_dict = archives + dict_size
+    print(f"JSON brut:                    {raw:>10} octets, lecture {t_json * 1000:6.0f} ms")
+    print(f"zstd -{level} (fichier brut):     {plain:>10} octets ({plain * 100 / raw:.1f}%)")
+    print(f"zstd -{level} (JSON compact):     {whole:>10} octets ({whole * 100 / raw:.1f}%), "
+          f"décompression + lecture {t_whole * 1000:6.0f} ms  <- format par défaut")
+    print(f"zstd -{level} par blocs:          {blocks:>10} octets ({blocks * 100 / raw:.1f}%)")
+    print(f"zstd -{level} par blocs + dict:   {with_dict:>10} octets ({with_dict * 100 / raw:.1f}%, "
+          f"dont dictionnaire {dict_size}), lecture complète {t_archive * 1000:6.0f} ms")
+    print(f"Recherche d'une entrée:       {t_entry * 1e6 / max(lookups, 1):.0f} µs en moyenne "
+          f"({lookups} recherches, un bloc de {block_entries} entrées décompressé à chaque fois)")
+    if with_dict > whole:
+        print(f"⚠️  Blocs + dictionnaire {(with_dict - whole) * 100 / whole:.0f}% plus gros que le fichier entier : "
+              f"à réserver à l'accès direct aux entrées")
+    if with_dict >= blocks:
+        print(f"❌ Le dictionnaire ({dict_size} octets) coûte plus qu'il ne gagne sur des blocs de {block_entries} entrées")
+        return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Compresse les fichiers de sens (zstd, dictionnaire entraîné pour l\'accès par blocs)')
+    parser.add_argument('files', nargs='*', help='Fichiers JSON à compresser (par défaut: tous les meanings)')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='Dossier des fichiers compressés et du dictionnaire')
+    parser.add_argument('--dict-size', type=int, default=DICT_SIZE, help='Taille du dictionnaire (octets)')
+    parser.add_argument('--block-entries', type=int, default=BLOCK_ENTRIES,
+                        help='Entrées par trame : archives .mzst + dictionnaire (0 : un .json.zst par fichier)')
+    parser.add_argument('--level', type=int, default=LEVEL, help='Niveau de compression zstd')
+    parser.add_argument('--bench', action='store_true', help='Compare tailles et vitesses de décodage (JSON, zstd, dictionnaire)')
+    parser.add_argument('--rounds', type=int, default=3, help='Répétitions des mesures')
+    args = parser.parse_args()
+
+    if zstandard is None:
+        print("❌ Module zstandard manquant : pip install zstandard")
+        sys.exit(1)
+
+    sources = args.files or sorted(p for pattern in SOURCE_PATTERNS for p in glob.glob(pattern))
+    if not sources:
+        print("Aucun fichier de sens trouvé.")
+        return
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    dictionary = None
+    bench_entries = args.block_entries or BENCH_BLOCK_ENTRIES
+    if args.block_entries or args.bench:
+        t0 = time.perf_counter()
+        dictionary = train(sources, args.dict_size, bench_entries)
+        print(f"Dictionnaire {dictionary.dict_id()} ({len(dictionary.as_bytes())} octets) entraîné "
+              f"en {time.perf_counter() - t0:.1f}s")
+    if args.block_entries:
+        dict_path = os.path.join(args.output_dir, DICT_NAME)
+        with open(dict_path, 'wb') as f:
+            f.write(dictionary.as_bytes())
+        print(f"  -> {dict_path}")
+
+    packed = len(dictionary.as_bytes()) if args.block_entries else 0
+    for source in sources:
+        data = load_json(source, strict=True)
+        name = os.path.basename(source)[:-len('.json')]
+        if args.block_entries:
+            content = build_archive(data, dictionary, args.level, args.block_entries)
+            out_file = os.path.join(args.output_dir, name + '.mzst')
+            read_back = lambda: MeaningsArchive.open(out_file, dictionary).load()
+        else:
+            content = compress_whole(data, args.level)
+            out_file = os.path.join(args.output_dir, name + '.json.zst')
+            read_back = lambda: load_whole(out_file)
+        with open(out_file, 'wb') as f:
+            f.write(content)
+        if read_back() != data:
+            raise SystemExit(f"Erreur: relecture incorrecte de {out_file}")
+        packed += len(content)
+        print(f"  {os.path.basename(source)}: {os.path.getsize(source)} -> {len(content)} octets")
+
+    raw = sum(os.path.getsize(p) for p in sources)
+    print(f"Total: {raw} -> {packed} octets ({packed * 100 / raw:.1f}%"
+          + (", dictionnaire compris)" if args.block_entries else ")"))
+    if args.bench and not report(sources, dictionary, args.level, bench_entries, args.rounds):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/python3
+import os
+import re
+import sys
+import mmap
+import time
+import hashlib
+import argparse
+import tempfile
+import tracemalloc
+import xml.etree.ElementTree as ET
+from mochi_assets.jsonio import dumps, load_json, save_json, iter_array, SchemaError
+from mochi_assets.xmlstream import ElementStream, ElementWriter
+
+# Configuration
+XML_FILE = 'app/src/main/res/kanji_details.xml'   # enrichi par grap_kanji_components.py
+JSON_FILE = 'shared/src/commonMain/composeResources/files/kanji/kanji_details.json'  # lu par KanjiRepository
+CACHE_FILE = 'asset_cache/kanji_details.json'
+CACHE_VERSION = 1                      # à incrémenter si la conversion d'un kanji change
+TEXT_ELEMENTS = ('category', 'level')  # valeurs simples écrites en éléments (<category>jlpt</category>)
+JSON_INDENT = ' ' * 6                  # profondeur d'un kanji dans {"kanji_details": {"kanji": [...]}}
+JSON_HEAD = b'{\n  "kanji_details": {\n    "kanji": ['
+KANJI_PATTERN = re.compile(rb'<kanji\b[^>]*?/>|<kanji\b[^>]*>.*?</kanji>', re.S)
+
+# ============ CORRESPONDANCE XML <-> JSON ============
+# Même forme que xmltodict sans préfixe d'attribut : attributs et éléments simples deviennent des
+# chaînes, le texte d'un élément à attributs '#text', un élément répété une liste (seul : la valeur).
+# Dans l'autre sens, les chaînes redeviennent des attributs, sauf TEXT_ELEMENTS.
+
+def element_value(elem):
+    text = (elem.text or '').strip()
+    if not elem.attrib and not len(elem):
+        return text or None
+    value = dict(elem.attrib)
+    for child in elem:
+        key, item = child.tag, element_value(child)
+        if key not in value:
+            value[key] = item
+        elif isinstance(value[key], list):
+            value[key].append(item)
+        else:
+            value[key] = [value[key], item]
+    if text:
+        value['#text'] = text
+    return value
+
+def value_element(tag, value):
+    elem = ET.Element(tag)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == '#text':
+                elem.text = str(item)
+            elif isinstance(item, list):
+                for x in item:
+                    elem.append(value_element(key, x))
+            elif isinstance(item, dict) or item is None or key in TEXT_ELEMENTS:
+                elem.append(value_element(key, item))
+            else:
+                elem.set(key, str(item))
+    elif value is not None:
+        elem.text = str(value)
+    return elem
+
+def kanji_fragment(elem):
+    """Kanji sérialisé exactement comme dans le fichier complet écrit par save_json"""
+    text = dumps(element_value(elem) or {})
+    return JSON_INDENT.encode() + text.replace(b'\n', b'\n' + JSON_INDENT.encode())
+
+# ============ XML -> JSON ============
+
+def write_json(json_path, fragments):
+    """
+    Écrit les fragments (digest, octets) dans un .part renommé à la fin.
+    Renvoie le nombre de kanjis, {digest: [position, longueur]} et le sha1 du fichier écrit.
+    """
+    directory = os.path.dirname(json_path)
+    if directory: os.makedirs(directory, exist_ok=True)
+    part = json_path + '.part'
+    index = {}
+    sha1 = hashlib.sha1()
+    count = 0
+    with open(part, 'wb') as f:
+        def put(data):
+            f.write(data)
+            sha1.update(data)
+        put(JSON_HEAD)
+        for digest, fragment in fragments:
+            put(b',\n' if count else b'\n')
+            if digest:
+                index[digest] = [f.tell(), len(fragment)]
+            put(fragment)
+            count += 1
+        put(b'\n    ]\n  }\n}' if count else b']\n  }\n}')
+    os.replace(part, json_path)
+    return count, index, sha1.hexdigest()
+
+def stream_fragments(xml_path, stats):
+    """Conversion complète : iterparse, un kanji en mémoire à la fois"""
+    stream = ElementStream(xml_path)
+    for elem in stream:
+        if elem.tag == 'kanji':
+            stats['converted'] += 1
+            yield None, kanji_fragment(elem)
+        stream.release(elem)
+
+def file_sha1(path):
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+def open_previous(json_path, cache):
+    """Sortie précédente (mmap) si le cache la décrit encore, sinon None"""
+    if cache.get('version') != CACHE_VERSION or not os.path.exists(json_path):
+        return None
+    if os.path.getsize(json_path) == 0 or file_sha1(json_path) != cache.get('sha1'):
+        return None
+    with open(json_path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def incremental_fragments(xml_path, json_path, cache, stats):
+    """
+    Découpe le XML brut en éléments <kanji> (regex sur mmap, sans parser le reste) : un kanji
+    dont les octets n'ont pas changé est recopié tel quel depuis la sortie précédente, seuls
+    les autres sont parsés et convertis. Suppose qu'aucun commentaire ni CDATA ne contient <kanji.
+    """
+    index = cache.get('kanji', {})
+    # Fermée avant que write_json ne remplace le fichier qu'elle projette
+    previous = open_previous(json_path, cache)
+    try:
+        if os.path.getsize(xml_path) == 0:
+            return
+        with open(xml_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for match in KANJI_PATTERN.finditer(data):
+                raw = match.group()
+                digest = hashlib.sha1(raw).hexdigest()
+                position = index.get(digest) if previous is not None else None
+                if position:
+                    stats['reused'] += 1
+                    yield digest, previous[position[0]:position[0] + position[1]]
+                else:
+                    stats['converted'] += 1
+                    yield digest, kanji_fragment(ET.fromstring(raw))
+    finally:
+        if previous is not None: previous.close()
+
+def xml_to_json(xml_path, json_path, cache_path=None):
+    """XML -> JSON ; avec cache_path, seuls les kanjis modifiés depuis la dernière passe sont convertis"""
+    stats = {'converted': 0, 'reused': 0}
+    if not cache_path:
+        stats['count'] = write_json(json_path, stream_fragments(xml_path, stats))[0]
+        return stats
+    cache = load_json(cache_path) or {}
+    count, index, sha1 = write_json(json_path, incremental_fragments(xml_path, json_path, cache, stats))
+    save_json(cache_path, {'version': CACHE_VERSION, 'sha1': sha1, 'kanji': index}, atomic=True)
+    stats['count'] = count
+    return stats
+
+# ============ JSON -> XML ============
+
+def kanji_entries(json_path):
+    """Kanjis du JSON lus au fil de l'eau ; lecture complète si le document n'a pas la forme attendue"""
+    count = 0
+    try:
+        for entry in iter_array(json_path, 'kanji_details', 'kanji'):
+            count += 1
+            yield entry
+    except SchemaError:
+        if count: raise
+        print(f"⚠️  {json_path}: lecture en flux impossible, chargement complet")
+        data = load_json(json_path, strict=True) or {}
+        yield from data.get('kanji_details', {}).get('kanji', [])
+
+def json_to_xml(json_path, xml_path):
+    """JSON -> XML indenté comme le réécrit grap_kanji_components.py"""
+    writer = ElementWriter(xml_path)
+    root = ET.Element('kanji_details')
+    root.tail = '\n'
+    # La fin de ligne d'un kanji dépend de celui qui le suit : écriture décalée d'un élément
+    previous = None
+    for entry in kanji_entries(json_path):
+        elem = value_element('kanji', entry)
+        ET.indent(elem, space='  ', level=1)
+        if previous is None:
+            root.text = '\n  '
+            writer.open(root)
+        else:
+            previous.tail = '\n  '
+            writer.write(previous)
+        previous = elem
+    if previous is None:
+        writer.open(root)
+    else:
+        previous.tail = '\n'
+        writer.write(previous)
+    writer.close()
+    return {'count': writer.written}
+
+# ============ BENCHMARK ============
+
+def in_memory(xml_path, json_path):
+    """Référence : arbre complet puis save_json (même sortie, mémoire proportionnelle au fichier)"""
+    root = ET.parse(xml_path).getroot()
+    kanji = [element_value(k) or {} for k in root if k.tag == 'kanji']
+    save_json(json_path, {'kanji_details': {'kanji': kanji}})
+
+def bench(xml_path, rounds):
+    if not os.path.exists(xml_path):
+        print(f"❌ {xml_path} introuvable (convertir d'abord le JSON avec --to xml)")
+        return False
+    size = os.path.getsize(xml_path) / 1e6
+    with tempfile.TemporaryDirectory() as tmp:
+        out = {name: os.path.join(tmp, name) for name in ('stream.json', 'memory.json', 'incremental.json', 'round.xml')}
+        cache = os.path.join(tmp, 'cache.json')
+        count = xml_to_json(xml_path, out['stream.json'])['count']
+
+        def cold():
+            if os.path.exists(cache): os.remove(cache)
+            xml_to_json(xml_path, out['incremental.json'], cache)
+
+        def one_percent():
+            # 1 % des kanjis absents du cache : même travail que s'ils avaient été modifiés
+            data = load_json(cache)
+            data['kanji'] = {d: p for i, (d, p) in enumerate(data['kanji'].items()) if i % 100}
+            save_json(cache, data)
+            xml_to_json(xml_path, out['incremental.json'], cache)
+
+        stages = [
+            ('XML -> JSON en mémoire', lambda: in_memory(xml_path, out['memory.json'])),
+            ('XML -> JSON en flux', lambda: xml_to_json(xml_path, out['stream.json'])),
+            ('incrémental, sans cache', cold),
+            ('incrémental, 1 % modifié', one_percent),
+            ('incrémental, rien de modifié', lambda: xml_to_json(xml_path, out['incremental.json'], cache)),
+            ('JSON -> XML en flux', lambda: json_to_xml(out['stream.json'], out['round.xml'])),
+        ]
+        print(f"{xml_path}: {count} kanjis, {size:.1f} Mo (meilleur de {rounds})")
+        for label, fn in stages:
+            tracemalloc.start()
+            fn()
+            peak = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+            best = float('inf')
+            for _ in range(rounds):
+                t0 = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - t0)
+            print(f"  {label:<30} {best * 1000:7.0f} ms  {count / best:9.0f} kanjis/s  {size / best:6.1f} Mo/s  "
+                  f"pic {peak:6.1f} Mo")
+
+        outputs = set()
+        for name in ('memory.json', 'stream.json', 'incremental.json'):
+            with open(out[name], 'rb') as f:
+                outputs.add(f.read())
+        identical = len(outputs) == 1
+        print(f"Sorties en mémoire / flux / incrémentale identiques : {'✅' if identical else '❌'}")
+        return identical
+
+def main():
+    parser = argparse.ArgumentParser(description='Convertit kanji_details.xml (enrichi) en kanji_details.json pour l\'app, ou l\'inverse')
+    parser.add_argument('--to', choices=('json', 'xml'), default='json', help='Format produit (défaut: json)')
+    parser.add_argument('--xml', default=XML_FILE, help='Fichier kanji_details.xml')
+    parser.add_argument('--json', default=JSON_FILE, help='Fichier kanji_details.json')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Ne convertit que les kanjis modifiés depuis la dernière passe (vers JSON)')
+    parser.add_argument('--cache', default=CACHE_FILE, help='Cache de la conversion incrémentale')
+    parser.add_argument('--bench', action='store_true', help='Mesure le débit de chaque mode sur --xml')
+    parser.add_argument('--rounds', type=int, default=3, help='Répétitions du benchmark')
+    args = parser.parse_args()
+
+    if args.bench:
+        sys.exit(0 if bench(args.xml, args.rounds) else 1)
+
+    source = args.xml if args.to == 'json' else args.json
+    if not os.path.exists(source):
+        print(f"❌ Fichier {source} introuvable!")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    try:
+        if args.to == 'json':
+            stats = xml_to_json(args.xml, args.json, args.cache if args.incremental else None)
+            detail = f" ({stats['converted']} converti(s), {stats['reused']} repris)" if args.incremental else ""
+            print(f"✅ {stats['count']} kanjis -> {args.json}{detail}")
+        else:
+            stats = json_to_xml(args.json, args.xml)
+            print(f"✅ {stats['count']} kanjis -> {args.xml}")
+    except (ET.ParseError, SchemaError, ValueError) as e:
+        print(f"❌ Erreur de conversion : {e}")
+        sys.exit(1)
+    print(f"   {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/python3
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+import multiprocessing
+from mochi_assets.jsonio import load_json, load_wordlist, load_kanji_details, save_json
+from mochi_assets.leases import LeaseTable, Heartbeat, worker_name
+from mochi_assets.ratecontrol import AdaptiveRateController
+import auto_translate_words as words_job
+import auto_translate_meanings as kanji_job
+
+# Configuration
+SHARD_DIR = 'translation_cache/shards'
+DB_NAME = 'leases.sqlite'
+SHARD_SIZES = {'words': 500, 'kanji': 200}
+POLL_INTERVAL = 5.0
+DRY_RUN_FAILURE_RATE = 0.005
+
+class LeaseLost(Exception):
+    pass
+
+class DryRunTranslator:
+    """Traducteur factice (--dry-run) : latence et coupures réseau simulées, aucun appel réseau"""
+
+    def __init__(self, source, target):
+        self.target = target
+
+    def translate(self, text):
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts):
+        time.sleep(0.001 * len(texts))
+        if random.random() < DRY_RUN_FAILURE_RATE:
+            raise ConnectionError("connexion interrompue (simulé)")
+        return [f"[{self.target}] {t}" for t in texts]
+
+# ============ SOURCES ============
+
+class Sources:
+    """Données d'entrée chargées une fois par processus ; fichiers de langue chargés à la demande"""
+
+    def __init__(self):
+        self.words = None
+        self.kanji = None
+        self.targets = {}
+
+    def word_items(self):
+        """[(id, texte)] triés par ID"""
+        if self.words is None:
+            words = load_wordlist(words_job.MERGED_FILE) if os.path.exists(words_job.MERGED_FILE) else []
+            self.words = sorted(((int(w.id), w.text) for w in words), key=lambda item: item[0])
+        return self.words
+
+    def kanji_items(self):
+        """[(id, caractère, entrée anglaise)] triés par ID"""
+        if self.kanji is None:
+            self.kanji = []
+            source = load_json(kanji_job.SOURCE_MEANINGS_FILE)
+            if source and os.path.exists(kanji_job.KANJI_DETAILS_FILE):
+                characters = {k.id: k.character for k in load_kanji_details(kanji_job.KANJI_DETAILS_FILE)}
+                for entry in source['meanings']['kanji']:
+                    char = characters.get(str(entry['@id']))
+                    if char: self.kanji.append((int(entry['@id']), char, entry))
+                self.kanji.sort(key=lambda item: item[0])
+        return self.kanji
+
+    def target(self, kind, locale):
+        """(chemin, données, {id: entrée}) du fichier de langue"""
+        key = (kind, locale)
+        if key not in self.targets:
+            if kind == 'words':
+                path = os.path.join(words_job.OUTPUT_DIR, f'word_meanings_{locale}.json')
+                data = load_json(path, strict=True) or {"word_meanings": {"@locale": locale, "entries": []}}
+                entries = data['word_meanings'].setdefault('entries', [])
+            else:
+                path = kanji_job.TARGET_FILES_PATTERN.replace('*', locale)
+                data = load_json(path, strict=True) or {"meanings": {"@locale": locale, "kanji": []}}
+                entries = data['meanings'].setdefault('kanji', [])
+            self.targets[key] = (path, data, {str(e['@id']): e for e in entries})
+        return self.targets[key]
+
+    def todo(self, kind, locale, start_id=None, end_id=None):
+        """Éléments encore à traduire (mêmes règles que les scripts séquentiels)"""
+        _, _, existing = self.target(kind, locale)
+        in_range = lambda i: (start_id is None or start_id <= i <= end_id)
+        if kind == 'words':
+            return [item for item in self.word_items() if in_range(item[0]) and str(item[0]) not in existing]
+        return [item for item in self.kanji_items()
+                if in_range(item[0]) and kanji_job.needs_translation(item[2], existing.get(str(item[0])))]
+
+def locales_for(kind):
+    lang_map = words_job.LANG_MAP if kind == 'words' else kanji_job.LANG_MAP
+    return {l: g for l, g in lang_map.items() if not (kind == 'kanji' and l == 'en_rGB')}
+
+def shard_file(shard_dir, kind, locale, start_id, end_id):
+    return os.path.join(shard_dir, kind, locale, f'{start_id:06d}-{end_id:06d}.json')
+
+# ============ PLANIFICATION ============
+
+def plan(table, sources, kinds, locales):
+    """
+    Plages d'IDs fixes (id // taille) contenant encore du travail ; le rang entrelace les langues.
+    Les plages ne dépendent pas de ce qui reste à faire : replanifier après une fusion partielle
+    retombe sur les mêmes lots (ignorés s'ils existent) au lieu de plages qui les chevauchent.
+    """
+    shards = []
+    for kind in kinds:
+        size = SHARD_SIZES[kind]
+        for locale in locales_for(kind):
+            if locales and locale not in locales: continue
+            buckets = sorted({item[0] // size for item in sources.todo(kind, locale)})
+            for rank, bucket in enumerate(buckets):
+                shards.append((kind, locale, bucket * size, bucket * size + size - 1, rank))
+    created = table.create(shards)
+    print(f"Planification: {len(shards)} lots nécessaires, {created} nouveaux dans {table.db_path}")
+
+# ============ TRAVAILLEUR ============
+
+def translate_shard(shard, sources, shard_dir, heartbeat, dry_run):
+    """Traduit un lot ; les résultats partiels sont sauvegardés pour être repris avec le bail"""
+    out_file = shard_file(shard_dir, shard.kind, shard.locale, shard.start_id, shard.end_id)
+    partial = load_json(out_file) or {}
+    meanings = partial.get('meanings', {})
+    todo = [item for item in sources.todo(shard.kind, shard.locale, shard.start_id, shard.end_id)
+            if str(item[0]) not in meanings]
+
+    google_lang = locales_for(shard.kind)[shard.locale]
+    if dry_run:
+        translator_class = DryRunTranslator
+    else:
+        from deep_translator import GoogleTranslator as translator_class
+
+    if shard.kind == 'words':
+        translator = translator_class(source='ja', target=google_lang)
+        work = lambda batch: translator.translate_batch([text for _, text in batch])
+        rate = AdaptiveRateController(batch_size=words_job.BATCH_SIZE, max_batch=2 * words_job.BATCH_SIZE,
+                                      max_concurrency=2, interval=0.0)
+    else:
+        translator_ja = translator_class(source='ja', target=google_lang)
+        translator_en = translator_class(source='en', target=google_lang)
+        work = lambda batch: [kanji_job.translate_meaning(char, kanji_job.meaning_list(entry.get('meaning')),
+                                                          translator_ja, translator_en)
+                              for _, char, entry in batch]
+        rate = AdaptiveRateController(batch_size=10, max_batch=20, max_concurrency=2, interval=0.0)
+
+    def save(complete):
+        save_json(out_file, {"kind": shard.kind, "locale": shard.locale, "start": shard.start_id,
+                             "end": shard.end_id, "complete": complete, "meanings": meanings},
+                  sort_keys=True, atomic=True)
+
+    def on_done(start, batch, results):
+        if heartbeat.lost.is_set():
+            raise LeaseLost(f"bail perdu sur le lot {shard.id}")
+        for item, translated in zip(batch, results):
+            if not translated: continue
+            meanings[str(item[0])] = words_job.format_meaning(translated) if shard.kind == 'words' else translated
+        save(False)
+
+    errors = []
+    rate.run(todo, work, on_done, lambda start, batch, e: errors.append(e))
+    save(not errors)
+    return len(meanings), len(errors), rate
+
+def work(db_path, shard_dir, ttl, dry_run):
+    table = LeaseTable(db_path, ttl=ttl)
+    sources = Sources()
+    owner = worker_name()
+    processed = 0
+    while True:
+        shard = table.claim(owner)
+        if shard is None:
+            if not table.remaining():
+                break
+            # Des lots sont en cours ailleurs : on attend qu'ils finissent ou que leur bail expire
+            time.sleep(min(POLL_INTERVAL, ttl / 2))
+            continue
+
+        heartbeat = Heartbeat(table, shard.id, owner)
+        heartbeat.start()
+        try:
+            done, errors, rate = translate_shard(shard, sources, shard_dir, heartbeat, dry_run)
+            if errors:
+                table.release(shard.id, owner, f"{errors} lots en erreur")
+                print(f"[{owner}] lot {shard.id} {shard.kind}/{shard.locale} {shard.start_id}-{shard.end_id}: "
+                      f"{errors} lots en erreur, rendu (essai {shard.attempts})")
+            else:
+                table.complete(shard.id, owner, done)
+                print(f"[{owner}] lot {shard.id} {shard.kind}/{shard.locale} {shard.start_id}-{shard.end_id}: "
+                      f"{done} traductions | {rate.status()}")
+            processed += 1
+        except LeaseLost as e:
+            print(f"[{owner}] {e}, abandon")
+        except Exception as e:
+            table.release(shard.id, owner, str(e))
+            print(f"[{owner}] lot {shard.id} rendu après erreur: {e}")
+        finally:
+            heartbeat.stop()
+    print(f"[{owner}] plus aucun lot disponible ({processed} traités)")
+
+# ============ FUSION ============
+
+def merge(sources, shard_dir, dry_run):
+    """Reverse les sorties de lots (complètes ou partielles) dans les fichiers de langue"""
+    shard_files = sorted(glob.glob(os.path.join(shard_dir, '*', '*', '*.json')))
+    updated = {}
+    for path in shard_files:
+        shard = load_json(path)
+        if not shard or not shard.get('meanings'): continue
+        kind, locale = shard['kind'], shard['locale']
+        _, data, existing = sources.target(kind, locale)
+        for item_id, meaning in shard['meanings'].items():
+            entry = existing.get(item_id)
+            if entry is None:
+                entry = existing[item_id] = {"@id": item_id}
+                (data['word_meanings']['entries'] if kind == 'words' else data['meanings']['kanji']).append(entry)
+            elif entry.get('meaning') == meaning:
+                continue
+            entry['meaning'] = meaning
+            updated[(kind, locale)] = updated.get((kind, locale), 0) + 1
+
+    for (kind, locale), count in sorted(updated.items()):
+        path, data, _ = sources.target(kind, locale)
+        print(f"  {kind}/{locale}: {count} traductions fusionnées -> {path}")
+        if dry_run: continue
+        if kind == 'words':
+            words_job.save_json_atomic(path, data)
+        else:
+            kanji_job.save_json(path, data)
+    print(f"Fusion: {len(shard_files)} fichiers de lots, {sum(updated.values())} traductions"
+          + (" (simulation, rien n'est écrit)" if dry_run else ""))
+
+# ============ COMMANDES ============
+
+def status(table):
+    counts = table.summary()
+    print(' | '.join(f"{k}: {v}" for k, v in sorted(counts.items())) or "Aucun lot planifié")
+
+def main():
+    parser = argparse.ArgumentParser(description='Traduction répartie par lots (baux SQLite) entre processus et machines')
+    parser.add_argument('command', choices=['plan', 'work', 'merge', 'status', 'local'],
+                        help="plan: découpe | work: travailleur | merge: fusion | local: tout en N processus")
+    parser.add_argument('--shard-dir', default=SHARD_DIR, help='Dossier partagé des lots et de la base des baux')
+    parser.add_argument('--kinds', default='words,kanji', help='Travaux à planifier (words, kanji)')
+    parser.add_argument('--locales', default=None, help='Langues à planifier (par défaut: toutes)')
+    parser.add_argument('--workers', type=int, default=4, help='Processus lancés par "local"')
+    parser.add_argument('--ttl', type=float, default=120.0, help='Durée des baux (secondes)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Traducteur simulé, lots dans <shard-dir>_dry_run, fusion sans écriture')
+    args = parser.parse_args()
+
+    shard_dir = args.shard_dir + ('_dry_run' if args.dry_run else '')
+    db_path = os.path.join(shard_dir, DB_NAME)
+    table = LeaseTable(db_path, ttl=args.ttl)
+    sources = Sources()
+    kinds = [k for k in args.kinds.split(',') if k in SHARD_SIZES]
+    locales = set(args.locales.split(',')) if args.locales else None
+
+    if args.command in ('plan', 'local'):
+        plan(table, sources, kinds, locales)
+    if args.command == 'work':
+        work(db_path, shard_dir, args.ttl, args.dry_run)
+    if args.command == 'local':
+        t0 = time.time()
+        processes = [multiprocessing.Process(target=work, args=(db_path, shard_dir, args.ttl, args.dry_run))
+                     for _ in range(args.workers)]
+        for p in processes: p.start()
+        for p in processes: p.join()
+        print(f"{args.workers} processus terminés en {time.time() - t0:.1f}s")
+    if args.command in ('merge', 'local'):
+        merge(Sources(), shard_dir, args.dry_run)
+    status(table)
+    if table.summary().get('failed'):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
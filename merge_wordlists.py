@@ -1,37 +1,31 @@
 #!/usr/bin/python3
 import os
-import json
 import glob
+import argparse
+from mochi_assets.jsonio import load_json, save_json
 
 # Configuration
 WORDS_DIR = 'shared/src/commonMain/composeResources/files/words'
 OUTPUT_FILE = os.path.join(WORDS_DIR, 'merged_wordlist.json')
 
-def load_json(file_path):
-    if not os.path.exists(file_path):
-        return None
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Erreur lors du chargement de {file_path}: {e}")
-        return None
+def jlpt_level(file_path):
+    return os.path.basename(file_path).split('_')[-1].replace('.json', '').upper()
 
-def main():
+def read_words(file_path):
+    data = load_json(file_path)
+    return data.get('words', {}).get('word', []) if data else []
+
+def merge(jlpt_sources, bccwj_sources):
+    """
+    jlpt_sources: [(niveau, mots)] de N5 à N1 ; bccwj_sources: [mots].
+    Renvoie la liste finale triée par rang, avec les IDs générés.
+    """
     # Dictionnaire pour fusionner les mots. Clé unique : texte du mot
     merged_words = {}
 
-    # 1. Traitement des fichiers JLPT
-    jlpt_files = glob.glob(os.path.join(WORDS_DIR, 'jlpt_wordlist_n*.json'))
-    jlpt_files.sort(reverse=True) # N5 -> N1
-
-    for file_path in jlpt_files:
-        level = os.path.basename(file_path).split('_')[-1].replace('.json', '').upper()
-        print(f"Traitement de {file_path} (Niveau {level})...")
-        data = load_json(file_path)
-        if not data: continue
-        
-        for w in data.get('words', {}).get('word', []):
+    # 1. Fichiers JLPT
+    for level, words in jlpt_sources:
+        for w in words:
             text = w.get('#text')
             phonetic = w.get('@phonetics', '').strip()
             if not text: continue
@@ -52,14 +46,9 @@ def main():
                 if not merged_words[text]["is_bccwj"] and phonetic:
                     merged_words[text]["phonetics"] = phonetic
 
-    # 2. Traitement des fichiers BCCWJ
-    bccwj_files = glob.glob(os.path.join(WORDS_DIR, 'bccwj_wordlist_*.json'))
-    for file_path in bccwj_files:
-        print(f"Traitement de {file_path}...")
-        data = load_json(file_path)
-        if not data: continue
-        
-        for w in data.get('words', {}).get('word', []):
+    # 2. Fichiers BCCWJ
+    for words in bccwj_sources:
+        for w in words:
             text = w.get('#text')
             phonetic = w.get('@phonetics', '').strip()
             rank = w.get('@rank')
@@ -109,15 +98,34 @@ def main():
         if data["type"]: entry["type"] = data["type"]
         
         final_list.append(entry)
+    return final_list
+
+def source_files(words_dir):
+    """(fichiers JLPT de N5 à N1, fichiers BCCWJ)"""
+    jlpt_files = sorted(glob.glob(os.path.join(words_dir, 'jlpt_wordlist_n*.json')), reverse=True)
+    bccwj_files = glob.glob(os.path.join(words_dir, 'bccwj_wordlist_*.json'))
+    return jlpt_files, bccwj_files
+
+def main():
+    parser = argparse.ArgumentParser(description='Fusionne les listes JLPT et BCCWJ en merged_wordlist.json')
+    parser.add_argument('--words-dir', default=WORDS_DIR, help='Dossier des listes jlpt_wordlist_n*.json et bccwj_wordlist_*.json')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Fichier fusionné produit')
+    args = parser.parse_args()
 
-    output_data = {
-        "words": final_list
-    }
+    jlpt_files, bccwj_files = source_files(args.words_dir)
+    jlpt_sources = []
+    for file_path in jlpt_files:
+        print(f"Traitement de {file_path} (Niveau {jlpt_level(file_path)})...")
+        jlpt_sources.append((jlpt_level(file_path), read_words(file_path)))
+    bccwj_sources = []
+    for file_path in bccwj_files:
+        print(f"Traitement de {file_path}...")
+        bccwj_sources.append(read_words(file_path))
 
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    final_list = merge(jlpt_sources, bccwj_sources)
+    save_json(args.output, {"words": final_list})
     
-    print(f"\nFusion terminée : {len(final_list)} mots uniques sauvegardés dans {OUTPUT_FILE}")
+    print(f"\nFusion terminée : {len(final_list)} mots uniques sauvegardés dans {args.output}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1 @@
+"""Outils partagés des scripts de génération d'assets de Nihongo Mochi."""
@@ -0,0 +1,3 @@
+from mochi_assets.cli import main
+
+main()
@@ -0,0 +1,86 @@
+"""
+Point d'entrée unique des scripts d'assets : python3 -m mochi_assets <commande> [options].
+
+Chaque commande correspond à un script existant, importé seulement quand elle est choisie :
+deep_translator, bs4, PIL ou numpy ne sont jamais chargés pour les autres commandes, et le
+démarrage se limite à quelques dizaines de millisecondes. Les options qui suivent la
+commande sont transmises telles quelles au script (`<commande> --help` pour les voir).
+Aucune commande n'attend de réponse au clavier sans terminal, ce qui permet de les
+enchaîner ou de les lancer en parallèle depuis un script.
+"""
+import os
+import sys
+import time
+import argparse
+import importlib.util
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# commande -> (script, description, chemins relatifs à la racine du dépôt ?)
+# Les outils XML de app/src/main/res et simulate-decay travaillent sur des fichiers du dossier courant.
+COMMANDS = {
+    'merge': ('merge_wordlists.py', 'Fusionne les listes JLPT et BCCWJ', True),
+    'sync-strings': ('sync_strings.py', 'Ajoute les clés manquantes aux strings.xml traduits', True),
+    'translate-words': ('auto_translate_words.py', 'Traduit les mots par priorité', True),
+    'translate-meanings': ('auto_translate_meanings.py', 'Traduit les sens des kanjis', True),
+    'translate-strings': ('auto_translate_strings.py', 'Traduit les chaînes de l\'interface', True),
+    'translate-lessons': ('translate_lessons.py', 'Traduit les leçons de grammaire', True),
+    'translate-xml': ('app/src/main/res/translator.py', 'Traduit meanings.xml (une ou plusieurs langues)', False),
+    'distribute': ('distributed_translate.py', 'Traduction répartie par lots entre processus', True),
+    'components': ('app/src/main/res/grap_kanji_components.py', 'Ajoute les composants des kanjis', False),
+    'kanji-details': ('convert_kanji_details.py', 'Convertit kanji_details.xml <-> kanji_details.json', True),
+    'audit': ('audit_translations.py', 'Audit de couverture des traductions', True),
+    'simulate-decay': ('simulate_decay.py', 'Simule révisions et décroissance des bases exportées', False),
+    'watch': ('watch_assets.py', 'Régénère les assets dérivés dès qu\'une source change', True),
+    'dictionary-index': ('build_dictionary_index.py', 'Construit l\'index du dictionnaire', True),
+    'kana-dawg': ('build_kana_dawg.py', 'Construit le DAWG des lectures kana', True),
+    'kana-transducer': ('build_kana_transducer.py', 'Compile le transducteur kana/romaji', True),
+    'furigana': ('align_furigana.py', 'Aligne les furigana des mots', True),
+    'samples-index': ('build_samples_index.py', 'Construit l\'index des exemples', True),
+    'exercises': ('compile_exercise_bank.py', 'Compile la banque d\'exercices', True),
+    'distractors': ('build_distractors.py', 'Précalcule les distracteurs des kanjis et des mots', True),
+    'crosswords': ('build_crossword_bank.py', 'Génère la banque de grilles de mots croisés', True),
+    'level-manifests': ('build_level_manifests.py', 'Résout levels.json en listes d\'IDs par niveau', True),
+    'pack-lessons': ('pack_lessons.py', 'Empaquette les leçons', True),
+    'compress-meanings': ('compress_meanings.py', 'Compresse les sens (zstd, dictionnaire pour l\'accès par blocs)', True),
+    'flag-atlas': ('build_flag_atlas.py', 'Construit l\'atlas des drapeaux', True),
+    'optimize-images': ('optimize_images.py', 'Optimise les images', True),
+}
+
+def load_script(path):
+    """Importe un script par son chemin, sous son nom de module (partagé avec les imports entre scripts)"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def main():
+    commands = '\n'.join(f"  {name:<20}{description}" for name, (_, description, _) in COMMANDS.items())
+    parser = argparse.ArgumentParser(prog='mochi-assets', description='Outils de génération des assets de Nihongo Mochi',
+                                     epilog=f"commandes:\n{commands}", formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--root', default=REPO_ROOT,
+                        help='Racine du dépôt ; les chemins des commandes y sont relatifs (sauf translate-xml, components, simulate-decay)')
+    parser.add_argument('--time', action='store_true', help='Affiche la durée de la commande')
+    parser.add_argument('command', choices=COMMANDS, metavar='commande')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='Options transmises au script')
+    args = parser.parse_args()
+
+    script, _, from_root = COMMANDS[args.command]
+    root = os.path.abspath(args.root)
+    if from_root:
+        os.chdir(root)
+    # Les scripts importent mochi_assets et leurs voisins depuis la racine
+    sys.path.insert(0, root)
+
+    t0 = time.perf_counter()
+    module = load_script(os.path.join(root, script))
+    sys.argv = [f"mochi-assets {args.command}"] + args.args
+    try:
+        module.main()
+    finally:
+        if args.time:
+            print(f"[mochi-assets] {args.command}: {time.perf_counter() - t0:.2f}s", file=sys.stderr)
@@ -0,0 +1,391 @@
+#!/usr/bin/python3
+"""
+Lecture/écriture JSON commune à tous les scripts.
+
+Utilise orjson ou msgspec quand ils sont installés, sinon le module json standard.
+La sortie est identique octet pour octet à json.dump(ensure_ascii=False, indent=2) pour
+les données des assets (chaînes, entiers, listes, dicts à clés str), pour ne pas polluer
+les diffs Git. Ce que orjson refuse (clés non str, entiers au-delà de 64 bits) passe par
+le module standard. Restent différents : les flottants en notation exponentielle
+(1e-7 au lieu de 1e-07) et NaN/Infinity, écrits null.
+"""
+import os
+import sys
+import re
+import json
+import time
+import glob
+import shutil
+import importlib.util
+from typing import NamedTuple, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# msgspec (~25 ms d'import) n'est chargé qu'au premier décodage typé ou s'il sert de backend
+msgspec = None
+HAS_MSGSPEC = importlib.util.find_spec('msgspec') is not None
+
+# MOCHI_JSON_BACKEND=json force la bibliothèque standard (comparaisons, débogage)
+_FORCED = os.environ.get('MOCHI_JSON_BACKEND')
+if _FORCED == 'json':
+    orjson = None
+    HAS_MSGSPEC = False
+elif _FORCED == 'msgspec':
+    orjson = None
+
+BACKEND = 'orjson' if orjson else ('msgspec' if HAS_MSGSPEC else 'json')
+
+def _msgspec():
+    global msgspec
+    if msgspec is None:
+        import msgspec as module
+        msgspec = module
+    return msgspec
+
+class SchemaError(ValueError):
+    pass
+
+# ============ CODEC BRUT ============
+
+def loads(data):
+    if orjson:
+        return orjson.loads(data)
+    if HAS_MSGSPEC:
+        return _msgspec().json.decode(data)
+    return json.loads(data)
+
+def dumps(data, indent=2, sort_keys=False):
+    """Sérialise en UTF-8 ; indent=None donne la forme compacte (',' et ':' sans espaces)"""
+    if indent in (2, None):
+        try:
+            if orjson:
+                option = orjson.OPT_INDENT_2 if indent == 2 else 0
+                if sort_keys: option |= orjson.OPT_SORT_KEYS
+                return orjson.dumps(data, option=option)
+            if HAS_MSGSPEC:
+                codec = _msgspec().json
+                encoded = codec.encode(data, order='sorted' if sort_keys else None)
+                return codec.format(encoded, indent=indent) if indent else encoded
+        except TypeError:
+            # Clés non str, entiers hors 64 bits... : json les accepte, on le laisse trancher
+            pass
+    separators = (',', ':') if indent is None else None
+    return json.dumps(data, ensure_ascii=False, indent=indent, sort_keys=sort_keys,
+                      separators=separators).encode('utf-8')
+
+def load_json(file_path, strict=False):
+    """None si le fichier est absent ou vide ; en cas d'erreur, lève (strict) ou affiche et renvoie None"""
+    if not os.path.exists(file_path): return None
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read().strip()
+        if not content: return None
+        return loads(content)
+    except Exception as e:
+        if strict:
+            raise Exception(f"ERREUR LECTURE (Fichier corrompu ?) {file_path}: {e}")
+        print(f"Erreur chargement {file_path}: {e}")
+        return None
+
+def save_json(file_path, data, indent=2, sort_keys=False, atomic=False):
+    """Écrit le JSON ; atomic passe par un .tmp renommé pour ne jamais laisser de fichier tronqué"""
+    directory = os.path.dirname(file_path)
+    if directory: os.makedirs(directory, exist_ok=True)
+    payload = dumps(data, indent=indent, sort_keys=sort_keys)
+    target = file_path + ".tmp" if atomic else file_path
+    try:
+        with open(target, 'wb') as f:
+            f.write(payload)
+        if atomic: shutil.move(target, file_path)
+    except Exception:
+        if atomic and os.path.exists(target): os.remove(target)
+        raise
+
+def iter_array(file_path, *keys, chunk_size=1 << 16):
+    """
+    Objets du tableau data[keys[0]][keys[1]]... lus au fil de l'eau (mémoire : un bloc + un objet).
+    Les clés doivent ouvrir le document, comme dans {"kanji_details": {"kanji": [...]}} ;
+    sinon SchemaError, et l'appelant peut se rabattre sur load_json.
+    """
+    decoder = json.JSONDecoder()
+    head = r'\s*\{\s*' + r'\s*:\s*\{\s*'.join(re.escape(json.dumps(k, ensure_ascii=False)) for k in keys) + r'\s*:\s*\['
+    with open(file_path, encoding='utf-8') as f:
+        buffer = f.read(max(chunk_size, 1024))
+        match = re.match(head, buffer)
+        if not match:
+            raise SchemaError(f"{file_path}: le document ne commence pas par {'.'.join(keys)}[")
+        pos = match.end()
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buffer):
+                buffer, pos = f.read(chunk_size), 0
+                if not buffer:
+                    raise SchemaError(f"{file_path}: tableau {'.'.join(keys)} non terminé")
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Objet coupé par la fin du bloc : on complète le tampon
+                more = f.read(chunk_size)
+                if not more: raise
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield item
+            pos = end
+
+# ============ STRUCTURES TYPÉES ============
+# Avec msgspec, les chargeurs renvoient directement les Structs décodées, qui ont les mêmes champs
+# que ces NamedTuples (attributs seulement : ni indexation ni déballage) ; sans msgspec, ces NamedTuples.
+
+class Word(NamedTuple):
+    id: str
+    text: str
+    phonetics: str
+    jlpt: Optional[str] = None
+    rank: Optional[str] = None
+    type: Optional[str] = None
+
+class KanjiMeaning(NamedTuple):
+    id: str
+    meaning: Tuple[str, ...]
+
+class WordMeaning(NamedTuple):
+    id: str
+    meaning: str
+
+class Reading(NamedTuple):
+    type: str
+    text: str
+
+class Kanji(NamedTuple):
+    id: str
+    character: str
+    strokes: Optional[str]
+    category: Tuple[str, ...]
+    level: Tuple[str, ...]
+    readings: Tuple[Reading, ...]
+
+def _as_tuple(value):
+    if value is None: return ()
+    return tuple(value) if isinstance(value, (list, tuple)) else (value,)
+
+def _meaning_tuple(value):
+    """Les éléments XML vides deviennent {} à la conversion : seules les chaînes sont gardées"""
+    return tuple(m for m in _as_tuple(value) if isinstance(m, str))
+
+def _require(condition, file_path, message):
+    if not condition:
+        raise SchemaError(f"{file_path}: {message}")
+
+_msgspec_types = None
+
+def _types():
+    """
+    Schémas msgspec construits à la demande (noms de champs XML '@id', '#text').
+    gc=False : ces Structs ne contiennent que des chaînes, des tuples et d'autres Structs,
+    sans cycle possible ; le ramasse-miettes n'a pas à les parcourir.
+    """
+    global _msgspec_types
+    if _msgspec_types: return _msgspec_types
+    from typing import Any, List, Union
+    msgspec = _msgspec()
+
+    class Word(msgspec.Struct, gc=False):
+        id: str
+        text: str
+        phonetics: str = ''
+        jlpt: Optional[str] = None
+        rank: Optional[str] = None
+        type: Optional[str] = None
+
+    class WordList(msgspec.Struct):
+        words: List[Word] = []
+
+    def kanji_meaning_root(item):
+        class KanjiMeaning(msgspec.Struct, rename={'id': '@id'}, gc=False):
+            id: str
+            meaning: Union[Tuple[item, ...], str, None] = None
+
+        class KanjiMeanings(msgspec.Struct, rename={'locale': '@locale'}):
+            locale: str = ''
+            kanji: List[KanjiMeaning] = []
+
+        class KanjiMeaningRoot(msgspec.Struct):
+            meanings: KanjiMeanings
+
+        return KanjiMeaningRoot
+
+    class WordMeaning(msgspec.Struct, rename={'id': '@id'}, gc=False):
+        id: str
+        meaning: str = ''
+
+    class WordMeanings(msgspec.Struct, rename={'locale': '@locale'}):
+        locale: str = ''
+        entries: List[WordMeaning] = []
+
+    class WordMeaningRoot(msgspec.Struct):
+        word_meanings: WordMeanings
+
+    class Reading(msgspec.Struct, rename={'text': '#text'}, gc=False):
+        type: str = ''
+        text: str = ''
+
+    class Readings(msgspec.Struct, gc=False):
+        reading: Union[Reading, Tuple[Reading, ...], None] = None
+
+    class Kanji(msgspec.Struct, gc=False):
+        id: str
+        character: str = ''
+        strokes: Optional[str] = None
+        category: Union[Tuple[str, ...], str, None] = None
+        level: Union[Tuple[str, ...], str, None] = None
+        readings: Optional[Readings] = None
+
+    class KanjiList(msgspec.Struct):
+        kanji: List[Kanji] = []
+
+    class KanjiDetails(msgspec.Struct):
+        kanji_details: KanjiList
+
+    _msgspec_types = {
+        'wordlist': msgspec.json.Decoder(WordList),
+        'kanji_meanings': msgspec.json.Decoder(kanji_meaning_root(str)),
+        # Éléments XML vides ({}) dans les listes de sens : décodage tolérant, filtré ensuite
+        'kanji_meanings_lenient': msgspec.json.Decoder(kanji_meaning_root(Any)),
+        'word_meanings': msgspec.json.Decoder(WordMeaningRoot),
+        'kanji_details': msgspec.json.Decoder(KanjiDetails),
+    }
+    return _msgspec_types
+
+def _read_typed(file_path, kind, lenient_kind=None):
+    """
+    (schéma utilisé, Structs) avec msgspec, en réessayant lenient_kind si le schéma strict échoue ;
+    sans msgspec, (None, JSON brut) pour validation manuelle.
+    """
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    if HAS_MSGSPEC:
+        kinds = [kind, lenient_kind] if lenient_kind else [kind]
+        for k in kinds:
+            try:
+                return k, _types()[k].decode(content)
+            except _msgspec().ValidationError as e:
+                if k == kinds[-1]:
+                    raise SchemaError(f"{file_path}: {e}")
+    return None, loads(content)
+
+def load_wordlist(file_path):
+    """merged_wordlist.json -> [Word]"""
+    typed, data = _read_typed(file_path, 'wordlist')
+    if typed:
+        return data.words
+    _require(isinstance(data.get('words', []), list), file_path, "'words' doit être une liste")
+    words = []
+    for w in data.get('words', []):
+        _require(isinstance(w.get('id'), str) and isinstance(w.get('text'), str), file_path,
+                 f"mot invalide {w}")
+        words.append(Word(w['id'], w['text'], w.get('phonetics', ''), w.get('jlpt'), w.get('rank'), w.get('type')))
+    return words
+
+def load_kanji_meanings(file_path):
+    """meanings_*.json -> (locale, [KanjiMeaning])"""
+    typed, data = _read_typed(file_path, 'kanji_meanings', 'kanji_meanings_lenient')
+    if typed:
+        # Structs renvoyées telles quelles : seuls les sens qui ne sont pas un tuple de chaînes
+        # (sens unique, absent, ou décodage tolérant) sont convertis
+        kanji = data.meanings.kanji
+        lenient = typed == 'kanji_meanings_lenient'
+        for k in kanji:
+            if type(k.meaning) is str:
+                k.meaning = (k.meaning,)
+            elif lenient or k.meaning is None:
+                k.meaning = _meaning_tuple(k.meaning)
+        return data.meanings.locale, kanji
+    _require(isinstance(data.get('meanings'), dict), file_path, "clé 'meanings' absente")
+    entries = []
+    for k in data['meanings'].get('kanji', []):
+        _require(isinstance(k.get('@id'), str), file_path, f"entrée sans '@id' {k}")
+        entries.append(KanjiMeaning(k['@id'], _meaning_tuple(k.get('meaning'))))
+    return data['meanings'].get('@locale', ''), entries
+
+def load_word_meanings(file_path):
+    """word_meanings_*.json -> (locale, [WordMeaning])"""
+    typed, data = _read_typed(file_path, 'word_meanings')
+    if typed:
+        return data.word_meanings.locale, data.word_meanings.entries
+    _require(isinstance(data.get('word_meanings'), dict), file_path, "clé 'word_meanings' absente")
+    entries = []
+    for e in data['word_meanings'].get('entries', []):
+        _require(isinstance(e.get('@id'), str), file_path, f"entrée sans '@id' {e}")
+        entries.append(WordMeaning(e['@id'], e.get('meaning', '')))
+    return data['word_meanings'].get('@locale', ''), entries
+
+def load_kanji_details(file_path):
+    """kanji_details.json -> [Kanji]"""
+    typed, data = _read_typed(file_path, 'kanji_details')
+    if typed:
+        # {"readings": {"reading": ...}} aplati en tuple de Reading, comme le NamedTuple Kanji
+        kanji = data.kanji_details.kanji
+        for k in kanji:
+            if type(k.category) is not tuple: k.category = _as_tuple(k.category)
+            if type(k.level) is not tuple: k.level = _as_tuple(k.level)
+            k.readings = _as_tuple(k.readings.reading) if k.readings else ()
+        return kanji
+    _require(isinstance(data.get('kanji_details'), dict), file_path, "clé 'kanji_details' absente")
+    kanji = []
+    for k in data['kanji_details'].get('kanji', []):
+        _require(isinstance(k.get('id'), str), file_path, f"kanji sans 'id' {k}")
+        readings = _as_tuple((k.get('readings') or {}).get('reading'))
+        kanji.append(Kanji(k['id'], k.get('character', ''), k.get('strokes'), _as_tuple(k.get('category')),
+                           _as_tuple(k.get('level')),
+                           tuple(Reading(r.get('type', ''), r.get('#text', '')) for r in readings)))
+    return kanji
+
+# ============ BENCHMARK ============
+
+FILES_DIR = 'shared/src/commonMain/composeResources/files'
+BENCH_PATTERNS = [
+    (os.path.join(FILES_DIR, 'meanings/meanings_*.json'), load_kanji_meanings),
+    (os.path.join(FILES_DIR, 'words/meanings/word_meanings_*.json'), load_word_meanings),
+]
+
+def _best_of(fn, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def bench(rounds=3):
+    print(f"Backend: {BACKEND} (orjson: {'oui' if orjson else 'non'}, msgspec: {'oui' if HAS_MSGSPEC else 'non'})")
+    totals = [0.0] * 5
+    for pattern, typed_loader in BENCH_PATTERNS:
+        for file_path in sorted(glob.glob(pattern)):
+            with open(file_path, 'rb') as f:
+                content = f.read()
+            data = json.loads(content)
+            times = [
+                _best_of(lambda: json.loads(content), rounds),
+                _best_of(lambda: loads(content), rounds),
+                _best_of(lambda: typed_loader(file_path), rounds),
+                _best_of(lambda: json.dumps(data, ensure_ascii=False, indent=2), rounds),
+                _best_of(lambda: dumps(data), rounds),
+            ]
+            totals = [t + x for t, x in zip(totals, times)]
+            print(f"  {os.path.basename(file_path):<28} {len(content) // 1024:>5} Ko | load {times[0] * 1000:6.1f} -> "
+                  f"{times[1] * 1000:6.1f} ms (typé {times[2] * 1000:6.1f}) | dump {times[3] * 1000:6.1f} -> "
+                  f"{times[4] * 1000:6.1f} ms")
+    print(f"Total load: {totals[0] * 1000:.0f} -> {totals[1] * 1000:.0f} ms (x{totals[0] / totals[1]:.1f}), "
+          f"typé {totals[2] * 1000:.0f} ms")
+    print(f"Total dump: {totals[3] * 1000:.0f} -> {totals[4] * 1000:.0f} ms (x{totals[3] / totals[4]:.1f})")
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    bench(rounds)
@@ -0,0 +1,144 @@
+"""
+Table de baux (leases) SQLite pour répartir des lots de travail entre processus ou machines.
+
+Un travailleur réserve un lot pour LEASE_TTL secondes et doit renouveler son bail
+(heartbeat) tant qu'il travaille ; un bail expiré est repris par le premier travailleur
+disponible. Le fichier doit se trouver sur un système de fichiers aux verrous fiables
+(disque local, NFSv4, SMB) quand plusieurs machines le partagent.
+"""
+import os
+import time
+import socket
+import sqlite3
+import threading
+from contextlib import closing
+from typing import NamedTuple
+
+LEASE_TTL = 120.0
+MAX_ATTEMPTS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    locale TEXT NOT NULL,
+    start_id INTEGER NOT NULL,
+    end_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    done_count INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    UNIQUE (kind, locale, start_id)
+);
+CREATE INDEX IF NOT EXISTS shards_claim ON shards (status, rank);
+"""
+
+class Shard(NamedTuple):
+    id: int
+    kind: str
+    locale: str
+    start_id: int
+    end_id: int
+    attempts: int
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class LeaseTable:
+    def __init__(self, db_path, ttl=LEASE_TTL, max_attempts=MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(db_path)
+        if directory: os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # Connexion courte par opération : utilisable depuis plusieurs threads et processus
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA busy_timeout = 30000')
+        return conn
+
+    def _write(self, sql, params=()):
+        with closing(self._connect()) as conn:
+            return conn.execute(sql, params).rowcount
+
+    def create(self, shards):
+        """shards: [(kind, locale, start_id, end_id, rank)] ; les lots déjà planifiés sont conservés"""
+        with closing(self._connect()) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            before = conn.total_changes
+            conn.executemany('INSERT OR IGNORE INTO shards (kind, locale, start_id, end_id, rank) '
+                             'VALUES (?, ?, ?, ?, ?)', shards)
+            conn.execute('COMMIT')
+            return conn.total_changes - before
+
+    def claim(self, owner):
+        """Réserve le prochain lot libre (ou dont le bail a expiré) ; None s'il n'y en a pas"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            # BEGIN IMMEDIATE : un seul travailleur à la fois entre la lecture et la réservation
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT id, kind, locale, start_id, end_id, attempts FROM shards "
+                "WHERE (status = 'pending' OR (status = 'leased' AND lease_until < ?)) AND attempts < ? "
+                "ORDER BY rank, id LIMIT 1", (now, self.max_attempts)).fetchone()
+            if row:
+                conn.execute("UPDATE shards SET status = 'leased', owner = ?, lease_until = ?, "
+                             "attempts = attempts + 1 WHERE id = ?", (owner, now + self.ttl, row[0]))
+            conn.execute('COMMIT')
+        return Shard(*row[:5], row[5] + 1) if row else None
+
+    def heartbeat(self, shard_id, owner):
+        """Prolonge le bail ; False si le lot a été repris par un autre travailleur"""
+        return self._write("UPDATE shards SET lease_until = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+                           (time.time() + self.ttl, shard_id, owner)) == 1
+
+    def complete(self, shard_id, owner, done_count):
+        return self._write("UPDATE shards SET status = 'done', done_count = ?, lease_until = NULL, error = NULL "
+                           "WHERE id = ? AND owner = ?", (done_count, shard_id, owner)) == 1
+
+    def release(self, shard_id, owner, error=None):
+        """Rend le lot ; il passe en 'failed' après max_attempts essais"""
+        return self._write("UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                           "owner = NULL, lease_until = NULL, error = ? WHERE id = ? AND owner = ?",
+                           (self.max_attempts, error, shard_id, owner)) == 1
+
+    def summary(self):
+        """{statut: nombre de lots} ; un bail expiré compte comme 'pending' (ou 'failed' sans essai restant)"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT CASE WHEN status = 'leased' AND lease_until < ? "
+                "THEN CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END ELSE status END, COUNT(*) "
+                "FROM shards GROUP BY 1", (time.time(), self.max_attempts)).fetchall()
+        return dict(rows)
+
+    def remaining(self):
+        counts = self.summary()
+        return counts.get('pending', 0) + counts.get('leased', 0)
+
+class Heartbeat(threading.Thread):
+    """Renouvelle un bail en arrière-plan ; lost est levé si le bail a été perdu"""
+
+    def __init__(self, table, shard_id, owner):
+        super().__init__(daemon=True)
+        self.table, self.shard_id, self.owner = table, shard_id, owner
+        self.lost = threading.Event()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.table.ttl / 3):
+            try:
+                if not self.table.heartbeat(self.shard_id, self.owner):
+                    self.lost.set()
+                    return
+            except sqlite3.Error:
+                # Base momentanément verrouillée : on réessaie au prochain battement
+                continue
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,65 @@
+"""
+Ordre de priorité des mots pour les traductions.
+
+Un mot passe d'abord s'il est utilisé par un niveau activé de levels.json (le premier
+niveau qui l'utilise compte), puis selon son rang BCCWJ, son niveau JLPT et son ID.
+"""
+import math
+
+LEVELS_FILE = 'shared/src/commonMain/composeResources/files/levels.json'
+WORDLIST_DATA_FILE = 'merged_wordlist'
+CHECKPOINTS = (0.2, 0.5, 0.8, 1.0)
+JLPT_ORDER = {'N5': 0, 'N4': 1, 'N3': 2, 'N2': 3, 'N1': 4}
+UNRANKED = 10 ** 9
+
+def _int(value, default=UNRANKED):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+def word_filters(levels_data):
+    """[(id du niveau, filtre)] des activités activées qui lisent merged_wordlist, dans l'ordre du fichier"""
+    filters = []
+    for section in (levels_data or {}).get('sections', {}).values():
+        for level in section.get('levels', []):
+            for activity in level.get('activities', {}).values():
+                if activity.get('dataFile') == WORDLIST_DATA_FILE and activity.get('enabled', False):
+                    filters.append((level['id'], activity))
+    return filters
+
+def _matches(word, activity):
+    if 'jlpt' in activity and word.jlpt != activity['jlpt']:
+        return False
+    rank = _int(word.rank, None)
+    if 'minRank' in activity and (rank is None or rank < activity['minRank']):
+        return False
+    if 'maxRank' in activity and (rank is None or rank > activity['maxRank']):
+        return False
+    return True
+
+def priority_key(word, filters):
+    level_pos = next((i for i, (_, activity) in enumerate(filters) if _matches(word, activity)), len(filters))
+    return (level_pos, _int(word.rank), JLPT_ORDER.get(word.jlpt, len(JLPT_ORDER)), _int(word.id))
+
+def prioritize(words, levels_data=None):
+    """Mots triés du plus utile au moins utile"""
+    filters = word_filters(levels_data)
+    return sorted(words, key=lambda w: priority_key(w, filters))
+
+def checkpoint_sizes(total, fractions=CHECKPOINTS):
+    """Nombre de mots de tête couverts par chaque palier"""
+    return [min(total, math.ceil(total * f)) for f in fractions]
+
+def coverage(ordered_ids, done_ids, fractions=CHECKPOINTS):
+    """{palier: part des mots de tête déjà traduits}"""
+    result = {}
+    covered = 0
+    sizes = checkpoint_sizes(len(ordered_ids), fractions)
+    position = 0
+    for fraction, size in zip(fractions, sizes):
+        while position < size:
+            if ordered_ids[position] in done_ids: covered += 1
+            position += 1
+        result[f"{fraction:g}"] = round(covered / size, 4) if size else 1.0
+    return result
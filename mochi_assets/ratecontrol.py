@@ -0,0 +1,170 @@
+"""
+Contrôle de débit adaptatif (AIMD) pour les appels de traduction.
+
+La taille des lots, le nombre de lots en vol et la pause entre deux envois augmentent
+doucement tant que le service répond vite, et sont divisés dès qu'il ralentit, échoue
+ou limite le débit (429, quota...).
+"""
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+THROTTLE_MARKERS = ('429', 'too many requests', 'toomanyrequests', 'quota', 'rate limit', 'ratelimit')
+STATS_WINDOW = 60.0  # secondes prises en compte pour le débit instantané
+
+def is_throttle_error(error):
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in THROTTLE_MARKERS)
+
+class AdaptiveRateController:
+    """
+    Utilisable de deux façons :
+    - run() distribue une liste d'éléments en lots sur un pool de threads ;
+    - batch_size / wait_turn() / success() / failure() pour une boucle existante.
+    """
+
+    def __init__(self, batch_size=30, min_batch=1, max_batch=100, batch_step=5,
+                 concurrency=1, max_concurrency=4, interval=2.0, min_interval=0.0, max_interval=60.0,
+                 target_latency=5.0, increase_every=5):
+        self.batch_size = batch_size
+        self.min_batch, self.max_batch, self.batch_step = min_batch, max_batch, batch_step
+        self.concurrency = concurrency
+        self.max_concurrency = max(concurrency, max_concurrency)
+        self.interval = interval
+        self.min_interval, self.max_interval = min_interval, max_interval
+        self.target_latency = target_latency
+        self.increase_every = increase_every
+
+        self.lock = threading.Lock()
+        self.ready_at = 0.0
+        self.streak = 0
+        self.failures_in_row = 0
+        self.latency = None
+        self.started = time.monotonic()
+        self.window = deque()
+        self.items_done = 0
+        self.batches_done = 0
+        self.errors = 0
+        self.throttled = 0
+
+    # ============ AIMD ============
+
+    def success(self, items, latency):
+        with self.lock:
+            now = time.monotonic()
+            self.items_done += items
+            self.batches_done += 1
+            self.failures_in_row = 0
+            self.window.append((now, items))
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+
+            if latency > self.target_latency:
+                # Le service sature : lots plus petits, sans attendre une erreur
+                self.batch_size = max(self.min_batch, int(self.batch_size * 0.75))
+                self.streak = 0
+                return
+            self.streak += 1
+            self.batch_size = min(self.max_batch, self.batch_size + self.batch_step)
+            self.interval = max(self.min_interval, self.interval - 0.1 * max(self.interval, 1.0))
+            if self.streak % self.increase_every == 0 and self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+
+    def failure(self, error):
+        """Divise lots, parallélisme et débit ; renvoie la pause imposée (secondes)"""
+        with self.lock:
+            throttled = is_throttle_error(error)
+            self.errors += 1
+            self.throttled += throttled
+            self.streak = 0
+            self.failures_in_row += 1
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+            self.concurrency = max(1, self.concurrency // 2)
+            if throttled:
+                # Limite du service : le débit d'envoi lui-même est divisé
+                self.interval = min(self.max_interval, max(self.interval * 2, 5.0))
+                pause = self.interval * 2
+            else:
+                # Erreur passagère : seule une pause croissante avec les échecs consécutifs
+                pause = min(self.max_interval, 2 ** min(self.failures_in_row - 1, 6))
+            pause *= random.uniform(0.8, 1.2)
+            self.ready_at = max(self.ready_at, time.monotonic() + pause)
+            return pause
+
+    def wait_turn(self):
+        """Bloque jusqu'au prochain envoi autorisé"""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.ready_at)
+            self.ready_at = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    # ============ STATISTIQUES ============
+
+    def throughput(self):
+        """Éléments par seconde sur la fenêtre glissante"""
+        with self.lock:
+            now = time.monotonic()
+            while self.window and self.window[0][0] < now - STATS_WINDOW:
+                self.window.popleft()
+            span = min(STATS_WINDOW, now - self.started)
+            return sum(n for _, n in self.window) / span if span > 0 else 0.0
+
+    def status(self):
+        latency = f"{self.latency:.1f}s" if self.latency is not None else "-"
+        return (f"{self.throughput():.1f} élém/s | lot {self.batch_size} x{self.concurrency} | "
+                f"pause {self.interval:.1f}s | latence {latency} | erreurs {self.errors} (limitées: {self.throttled})")
+
+    # ============ EXÉCUTION ============
+
+    def _timed(self, work, batch):
+        t0 = time.monotonic()
+        result = work(batch)
+        return result, time.monotonic() - t0
+
+    def run(self, items, work, on_done, on_error=None, max_retries=3):
+        """
+        work(lot) -> résultats, appelé dans les threads du pool.
+        on_done(début, lot, résultats) et on_error(début, lot, exception) sont appelés dans le
+        thread courant (pas de verrou nécessaire côté appelant). Un lot en échec est redécoupé
+        à la nouvelle taille et retenté jusqu'à max_retries fois ; sans on_error, l'erreur remonte.
+        """
+        retry = deque()
+        position = 0
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            while position < len(items) or retry or in_flight:
+                while len(in_flight) < self.concurrency and (retry or position < len(items)):
+                    if self.ready_at > time.monotonic() and in_flight:
+                        break
+                    if retry:
+                        start, batch, attempts = retry.popleft()
+                    else:
+                        start, batch, attempts = position, items[position:position + self.batch_size], 0
+                        position += len(batch)
+                    self.wait_turn()
+                    in_flight[pool.submit(self._timed, work, batch)] = (start, batch, attempts)
+
+                # Attente bornée seulement si un envoi pourra partir dès la fin de la pause
+                can_submit = (retry or position < len(items)) and len(in_flight) < self.concurrency
+                timeout = max(0.0, self.ready_at - time.monotonic()) if can_submit else None
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, batch, attempts = in_flight.pop(future)
+                    try:
+                        results, latency = future.result()
+                    except Exception as e:
+                        self.failure(e)
+                        if attempts + 1 < max_retries:
+                            step = max(1, self.batch_size)
+                            for i in range(0, len(batch), step):
+                                retry.append((start + i, batch[i:i + step], attempts + 1))
+                        elif on_error:
+                            on_error(start, batch, e)
+                        else:
+                            raise
+                        continue
+                    self.success(len(batch), latency)
+                    on_done(start, batch, results)
@@ -0,0 +1,106 @@
+"""
+Lecture et réécriture XML en flux (iterparse).
+
+Les enfants directs de la racine sont rendus un par un, complets, puis libérés dès qu'ils
+ont été écrits : la mémoire reste bornée quelle que soit la taille du document. La sortie
+est écrite dans un fichier .part, accompagné d'un petit fichier de position qui permet de
+reprendre après une interruption ; il remplace la cible seulement une fois terminé.
+"""
+import os
+import json
+import xml.etree.ElementTree as ET
+
+XML_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>\n"
+
+class ElementStream:
+    """Itère sur les enfants directs de la racine ; root est disponible dès le premier élément"""
+
+    def __init__(self, path):
+        self.path = path
+        self.root = None
+
+    def __iter__(self):
+        # Un enfant n'est rendu qu'au début du suivant (ou à la fin de la racine) :
+        # à son événement 'end', le texte qui le suit (tail) n'est pas forcément encore lu
+        depth = 0
+        pending = None
+        for event, elem in ET.iterparse(self.path, events=('start', 'end')):
+            if event == 'start':
+                if self.root is None:
+                    self.root = elem
+                depth += 1
+                if depth == 2 and pending is not None:
+                    yield pending
+                    pending = None
+                continue
+            depth -= 1
+            if depth == 1:
+                pending = elem
+            elif depth == 0 and pending is not None:
+                yield pending
+                pending = None
+
+    def release(self, elem):
+        """Libère un enfant déjà traité (ses descendants et sa place dans la racine)"""
+        elem.clear()
+        self.root.remove(elem)
+
+def start_tag(tag, attrib):
+    """Balise ouvrante sérialisée par ElementTree (mêmes échappements que tostring)"""
+    empty = ET.tostring(ET.Element(tag, attrib), encoding='unicode')
+    return empty[:-3] + '>'
+
+class ElementWriter:
+    """
+    Écrit <racine attrib> puis les éléments dans l'ordre, dans path + '.part'.
+    Avec resume=True, un .part interrompu est tronqué à la dernière position enregistrée
+    par checkpoint() et skip indique combien d'enfants sont déjà écrits.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.part = path + '.part'
+        self.position_file = self.part + '.json'
+        self.file = None
+        self.root = None
+        self.written = 0
+        self.skip = 0
+        position = None
+        if resume and os.path.exists(self.part) and os.path.exists(self.position_file):
+            with open(self.position_file, encoding='utf-8') as f:
+                position = json.load(f)
+        if position:
+            self.file = open(self.part, 'r+b')
+            self.file.truncate(position['offset'])
+            self.file.seek(position['offset'])
+            self.skip = self.written = position['children']
+
+    def open(self, root, attrib=None):
+        """À appeler avant la première écriture ; root.text est alors connu"""
+        self.root = root
+        if self.file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self.file = open(self.part, 'wb')
+            header = XML_DECLARATION + start_tag(root.tag, root.attrib if attrib is None else attrib) + (root.text or '')
+            self.file.write(header.encode('utf-8'))
+
+    def write(self, elem):
+        self.file.write(ET.tostring(elem, encoding='unicode').encode('utf-8'))
+        self.written += 1
+
+    def checkpoint(self):
+        """Rend durable tout ce qui est écrit ; une reprise repartira d'ici"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        with open(self.position_file, 'w', encoding='utf-8') as f:
+            json.dump({'offset': self.file.tell(), 'children': self.written}, f)
+
+    def close(self):
+        """Ferme la racine et remplace la cible"""
+        self.file.write(f"</{self.root.tag}>".encode('utf-8'))
+        if self.root.tail:
+            self.file.write(self.root.tail.encode('utf-8'))
+        self.file.close()
+        os.replace(self.part, self.path)
+        if os.path.exists(self.position_file):
+            os.remove(self.position_file)
@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+import os
+import io
+import glob
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageMath
+from mochi_assets.jsonio import load_json, save_json
+
+# Configuration
+IMAGE_PATTERNS = [
+    'shared/src/commonMain/composeResources/drawable/*.webp',
+    'shared/src/commonMain/composeResources/drawable/*.png',
+    'app/src/main/res/mipmap/*.png',
+    'Nihongo_Mochi_*.webp',
+    'img.png',
+]
+CACHE_FILE = 'asset_cache/images.json'
+MIN_SSIM = 0.99
+SSIM_BLOCK = 8
+WEBP_QUALITIES = [95, 90, 85, 80, 75]
+WEBP_METHODS = [4, 6]
+
+def file_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+# ============ DIFFÉRENCE PERCEPTUELLE ============
+
+def _has_alpha(img):
+    return img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+
+def _planes(img, transparent, gray):
+    """
+    Canaux comparés, en flottants : L ou R, G, B ; une image transparente est composée sur fond blanc
+    puis sur fond noir, ce qui fait ressortir les erreurs d'alpha sans tenir compte des couleurs
+    cachées sous les pixels entièrement transparents.
+    """
+    if transparent:
+        img = img.convert('RGBA')
+        flats = [Image.alpha_composite(Image.new('RGBA', img.size, background), img).convert('RGB')
+                 for background in ((255, 255, 255, 255), (0, 0, 0, 255))]
+    else:
+        flats = [img.convert('L' if gray else 'RGB')]
+    return [plane.convert('F') for flat in flats for plane in flat.split()]
+
+def _plane_ssim(x, y, block):
+    """SSIM moyen d'un canal sur des blocs block x block, calculé avec les opérations C de Pillow"""
+    size = (max(1, x.width // block), max(1, x.height // block))
+
+    def mean(img):
+        return img.resize(size, Image.BOX)
+
+    mx, my = mean(x), mean(y)
+    mxx = mean(ImageMath.lambda_eval(lambda e: e['a'] * e['a'], a=x))
+    myy = mean(ImageMath.lambda_eval(lambda e: e['a'] * e['a'], a=y))
+    mxy = mean(ImageMath.lambda_eval(lambda e: e['a'] * e['b'], a=x, b=y))
+
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    ssim_map = ImageMath.lambda_eval(
+        lambda e: ((e['mx'] * e['my'] * 2 + c1) * ((e['mxy'] - e['mx'] * e['my']) * 2 + c2)) /
+                  ((e['mx'] * e['mx'] + e['my'] * e['my'] + c1) *
+                   (e['mxx'] - e['mx'] * e['mx'] + e['myy'] - e['my'] * e['my'] + c2)),
+        mx=mx, my=my, mxx=mxx, myy=myy, mxy=mxy)
+    # ImageStat travaille sur un histogramme 8 bits : moyenne en flottant par réduction 1x1
+    return ssim_map.resize((1, 1), Image.BOX).getpixel((0, 0))
+
+def ssim(a, b, block=SSIM_BLOCK):
+    """
+    Plus petit SSIM par canal : une dérive de teinte ou d'alpha invisible en luminance suffit à refuser
+    le candidat. Les deux images sont comparées dans le même mode (WebP avec perte décode en RGB).
+    """
+    transparent = _has_alpha(a) or _has_alpha(b)
+    gray = a.mode == 'L' and b.mode == 'L'
+    return min(_plane_ssim(x, y, block) for x, y in zip(_planes(a, transparent, gray), _planes(b, transparent, gray)))
+
+# ============ CANDIDATS ============
+
+def candidates(img, fmt):
+    """(réglage, paramètres de save) ; le format d'origine est conservé (noms de ressources inchangés)"""
+    if fmt == 'WEBP':
+        for method in WEBP_METHODS:
+            yield f'webp lossless m{method}', {'format': 'WEBP', 'lossless': True, 'method': method}
+        for quality in WEBP_QUALITIES:
+            for method in WEBP_METHODS:
+                yield f'webp q{quality} m{method}', {'format': 'WEBP', 'quality': quality, 'method': method}
+    elif fmt == 'PNG':
+        yield 'png optimize', {'format': 'PNG', 'optimize': True}
+        if img.mode in ('RGB', 'RGBA'):
+            # Palette 256 couleurs : retenue seulement si elle passe le seuil perceptuel
+            yield 'png palette', {'format': 'PNG', 'optimize': True, 'quantize': 256}
+
+def encode(img, params):
+    params = dict(params)
+    quantize = params.pop('quantize', None)
+    if quantize:
+        method = Image.Quantize.FASTOCTREE if img.mode == 'RGBA' else Image.Quantize.MEDIANCUT
+        img = img.quantize(quantize, method=method)
+    buf = io.BytesIO()
+    img.save(buf, **params)
+    return buf.getvalue()
+
+def optimize_file(job):
+    """Renvoie (chemin, taille avant, meilleures données ou None, réglage, ssim)"""
+    path, min_ssim = job
+    with open(path, 'rb') as f:
+        original = f.read()
+    with Image.open(io.BytesIO(original)) as img:
+        fmt = img.format
+        img.load()
+
+    best, best_setting, best_score = None, None, 1.0
+    for setting, params in candidates(img, fmt):
+        try:
+            data = encode(img, params)
+        except Exception as e:
+            print(f"  {path}: {setting} impossible ({e})")
+            continue
+        if len(data) >= len(original) or (best and len(data) >= len(best)):
+            continue
+        with Image.open(io.BytesIO(data)) as decoded:
+            score = ssim(img, decoded)
+        if score >= min_ssim:
+            best, best_setting, best_score = data, setting, score
+    return path, len(original), best, best_setting, best_score
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompresse les images du dépôt (drawables, captures)')
+    parser.add_argument('files', nargs='*', help='Images à traiter (par défaut: tous les motifs configurés)')
+    parser.add_argument('--min-ssim', type=float, default=MIN_SSIM, help='SSIM minimal accepté')
+    parser.add_argument('--cache', default=CACHE_FILE, help='Cache des images déjà optimisées (par hash)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Nombre de processus')
+    parser.add_argument('--dry-run', action='store_true', help="N'écrit aucune image")
+    args = parser.parse_args()
+
+    paths = args.files or sorted({p for pattern in IMAGE_PATTERNS for p in glob.glob(pattern)})
+    cache = load_json(args.cache) or {}
+
+    jobs = []
+    skipped = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest = file_hash(f.read())
+        # Déjà traitée avec un seuil au moins aussi permissif : rien de plus à gagner
+        if digest in cache and cache[digest]['min_ssim'] <= args.min_ssim:
+            skipped += 1
+        else:
+            jobs.append((path, args.min_ssim))
+    print(f"{len(paths)} images, {skipped} inchangées depuis la dernière passe, {len(jobs)} à traiter")
+
+    total_before = total_after = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for path, before, data, setting, score in pool.map(optimize_file, jobs):
+            after = len(data) if data else before
+            total_before += before
+            total_after += after
+            if data:
+                print(f"  {path}: {before} -> {after} octets (-{(before - after) * 100 / before:.1f}%) "
+                      f"[{setting}, SSIM {score:.4f}]")
+                if not args.dry_run:
+                    with open(path, 'wb') as f:
+                        f.write(data)
+                    cache[file_hash(data)] = {'setting': setting, 'min_ssim': args.min_ssim}
+            else:
+                print(f"  {path}: {before} octets, déjà optimal")
+                if not args.dry_run:
+                    with open(path, 'rb') as f:
+                        cache[file_hash(f.read())] = {'setting': 'original', 'min_ssim': args.min_ssim}
+
+    if not args.dry_run:
+        save_json(args.cache, cache, sort_keys=True, atomic=True)
+    if total_before:
+        print(f"Total: {total_before} -> {total_after} octets (-{(total_before - total_after) * 100 / total_before:.1f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+import os
+import re
+import glob
+import zlib
+import struct
+import hashlib
+import argparse
+
+# Configuration
+GRAMMAR_DIR = 'shared/src/commonMain/composeResources/files/grammar'
+LESSONS_DIR = os.path.join(GRAMMAR_DIR, 'lessons')
+OUTPUT_PATTERN = os.path.join(GRAMMAR_DIR, 'lessons_{lang}.bin')
+DEFAULT_LANG = 'en'
+
+MAGIC = b'MLSN'
+FORMAT_VERSION = 1
+CODEC_RAW = 0
+CODEC_DEFLATE = 1
+
+BLOCK_TAGS = r'(?:html|head|body|p|div|h[1-6]|ul|ol|li|table|thead|tbody|tr|td|th|br|hr|section|style|meta|title|link)'
+COMMENT_PATTERN = re.compile(r'<!--.*?-->', re.S)
+PRE_PATTERN = re.compile(r'(<pre\b.*?</pre>)', re.S | re.I)
+BLOCK_SPACE_PATTERN = re.compile(r'\s*(</?' + BLOCK_TAGS + r'\b[^>]*>)\s*', re.I)
+BOILERPLATE_PATTERNS = [
+    re.compile(r'<!DOCTYPE[^>]*>', re.I),
+    re.compile(r'</?html\b[^>]*>', re.I),
+    re.compile(r'<head\b[^>]*>\s*</head>', re.I),
+    re.compile(r'</?body\b[^>]*>', re.I),
+]
+
+# ============ MINIFICATION ============
+
+def minify_html(html):
+    """Supprime commentaires, enveloppe commune et espaces superflus (le contenu des <pre> est conservé)"""
+    html = COMMENT_PATTERN.sub('', html)
+    for pattern in BOILERPLATE_PATTERNS:
+        html = pattern.sub('', html)
+    pieces = PRE_PATTERN.split(html)
+    for i in range(0, len(pieces), 2):
+        text = re.sub(r'\s+', ' ', pieces[i])
+        pieces[i] = BLOCK_SPACE_PATTERN.sub(r'\1', text)
+    return ''.join(pieces).strip()
+
+# ============ RÉSOLUTION (même ordre que GrammarRepository.loadLessonHtml) ============
+
+def list_lessons(directory):
+    return {os.path.basename(p)[:-5]: p for p in glob.glob(os.path.join(directory, '*.html'))}
+
+def resolve_lessons(lessons_dir, lang):
+    """langue -> en -> racine"""
+    resolved = dict(list_lessons(lessons_dir))
+    if lang != DEFAULT_LANG:
+        resolved.update(list_lessons(os.path.join(lessons_dir, DEFAULT_LANG)))
+    resolved.update(list_lessons(os.path.join(lessons_dir, lang)))
+    return resolved
+
+# ============ FORMAT DU BUNDLE ============
+# En-tête : MAGIC, version (u16), nb entrées (u32)
+# Index trié par id : longueur id (u16), id utf-8, offset (u32), longueur (u32), longueur brute (u32), codec (u8)
+# Données : payloads dédupliqués, offsets relatifs au début de la zone de données
+
+def build_bundle(lessons, compress):
+    blobs = {}
+    data = bytearray()
+    entries = []
+    for lesson_id in sorted(lessons):
+        with open(lessons[lesson_id], 'r', encoding='utf-8') as f:
+            raw = minify_html(f.read()).encode('utf-8')
+        codec, payload = CODEC_RAW, raw
+        if compress:
+            packed = zlib.compress(raw, 9)
+            if len(packed) < len(raw):
+                codec, payload = CODEC_DEFLATE, packed
+        digest = hashlib.sha1(payload).digest()
+        if digest not in blobs:
+            blobs[digest] = len(data)
+            data += payload
+        entries.append((lesson_id, blobs[digest], len(payload), len(raw), codec))
+
+    header = bytearray(MAGIC + struct.pack('<HI', FORMAT_VERSION, len(entries)))
+    for lesson_id, offset, length, raw_length, codec in entries:
+        encoded = lesson_id.encode('utf-8')
+        header += struct.pack('<H', len(encoded)) + encoded
+        header += struct.pack('<IIIB', offset, length, raw_length, codec)
+    return bytes(header + data), len(blobs)
+
+class LessonBundle:
+    """Lecteur de référence : un seul seek + read par leçon"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.index = {}
+        with open(file_path, 'rb') as f:
+            if f.read(4) != MAGIC:
+                raise ValueError("Bundle de leçons invalide")
+            version, count = struct.unpack('<HI', f.read(6))
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Version de bundle non supportée: {version}")
+            for _ in range(count):
+                (id_len,) = struct.unpack('<H', f.read(2))
+                lesson_id = f.read(id_len).decode('utf-8')
+                self.index[lesson_id] = struct.unpack('<IIIB', f.read(13))
+            self.data_start = f.tell()
+
+    def get(self, lesson_id):
+        entry = self.index.get(lesson_id)
+        if entry is None: return None
+        offset, length, _, codec = entry
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.data_start + offset)
+            payload = f.read(length)
+        if codec == CODEC_DEFLATE:
+            payload = zlib.decompress(payload)
+        return payload.decode('utf-8')
+
+def main():
+    parser = argparse.ArgumentParser(description='Minifie et regroupe les leçons de grammaire en un bundle par langue')
+    parser.add_argument('--lessons', default=LESSONS_DIR, help='Dossier racine des leçons')
+    parser.add_argument('--output', default=OUTPUT_PATTERN, help='Motif de sortie ({lang} remplacé)')
+    parser.add_argument('--langs', default=None, help='Langues à générer (par défaut: en + sous-dossiers)')
+    parser.add_argument('--compress', action='store_true', help='Compresse chaque entrée (deflate) si cela réduit sa taille')
+    args = parser.parse_args()
+
+    langs = args.langs.split(',') if args.langs else sorted(
+        {DEFAULT_LANG} | {os.path.basename(d.rstrip('/')) for d in glob.glob(os.path.join(args.lessons, '*/'))})
+
+    loose_files = glob.glob(os.path.join(args.lessons, '**', '*.html'), recursive=True)
+    loose_size = sum(os.path.getsize(p) for p in loose_files)
+    bundle_size = 0
+
+    for lang in langs:
+        lessons = resolve_lessons(args.lessons, lang)
+        if not lessons: continue
+        bundle, unique = build_bundle(lessons, args.compress)
+        out_file = args.output.format(lang=lang)
+        with open(out_file, 'wb') as f:
+            f.write(bundle)
+        bundle_size += len(bundle)
+
+        reader = LessonBundle(out_file)
+        for lesson_id in lessons:
+            with open(lessons[lesson_id], 'r', encoding='utf-8') as f:
+                if reader.get(lesson_id) != minify_html(f.read()):
+                    raise SystemExit(f"Erreur: relecture incorrecte de {lesson_id} dans {out_file}")
+        print(f"  [{lang}] {len(lessons)} leçons ({unique} contenus distincts) -> {out_file} ({len(bundle)} octets)")
+
+    print(f"Fichiers séparés: {len(loose_files)} fichiers, {loose_size} octets")
+    print(f"Bundles:          {len(langs)} fichiers, {bundle_size} octets "
+          f"({bundle_size * 100 / max(loose_size, 1):.1f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/python3
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from mochi_assets.jsonio import save_json
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Configuration
+DAY_MS = 24 * 60 * 60 * 1000
+DAYS = 180
+REPORT_EVERY = 7
+USERS = 1               # copies simulées par base (graines différentes)
+ACTIVITY_WINDOW = 60    # jours d'historique pour estimer l'assiduité et la charge
+SCORE_TYPES = ('RECOGNITION', 'READING', 'WRITING', 'GRAMMAR')
+
+# Décroissance de ScoreManager.decayScores (lancée chaque jour par DecayWorker)
+DECAY_RATE = 0.10       # retirés des succès par période écoulée
+DECAY_CAP = 0.50
+DECAY_INTERVAL = 7      # jours par période (ONE_WEEK_MS)
+MASTERY_BALANCE = 10    # succès - échecs : maîtrisé (StatisticsEngine, retrait des listes d'erreurs)
+
+# Modèle de mémoire : hypothèses du simulateur, l'application ne mesure que succès et échecs.
+# Probabilité de rappel exp(-t / S) ; une réussite allonge S d'autant plus que le rappel était
+# difficile, un échec le raccourcit.
+INITIAL_STABILITY = 2.0     # jours, pour un équilibre nul
+STABILITY_PER_POINT = 3.0   # jours par point d'équilibre au départ
+GROWTH = 3.0                # réussite : S *= 1 + GROWTH * (1 - p)
+LAPSE = 0.3                 # échec : S *= LAPSE
+MIN_STABILITY = 0.5
+
+# ============ CHARGEMENT ============
+
+def load_database(path, score_type=None):
+    """Scores d'une base MochiDatabase exportée (tableaux NumPy) et profil d'activité de l'utilisateur"""
+    types = ' '.join(f"WHEN '{t}' THEN {i}" for i, t in enumerate(SCORE_TYPES))
+    query = f"SELECT successes, failures, lastReviewDate, CASE type {types} ELSE -1 END FROM LearningScoreEntity"
+    params = ()
+    if score_type:
+        query += " WHERE type = ?"
+        params = (score_type,)
+    con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        # Lecture en bloc : les lignes ne deviennent jamais des objets Python
+        flat = np.fromiter(itertools.chain.from_iterable(con.execute(query, params)), dtype=np.int64)
+        games = np.fromiter(itertools.chain.from_iterable(con.execute("SELECT timestamp FROM GameHistory")),
+                            dtype=np.int64)
+    finally:
+        con.close()
+    rows = flat.reshape(-1, 4)
+    successes, failures, last_review = rows[:, 0].copy(), rows[:, 1].copy(), rows[:, 2]
+
+    stamps = np.concatenate([last_review[last_review > 0], games])
+    now = int(stamps.max()) if len(stamps) else 0
+    days_since = np.where(last_review > 0, (now - last_review) / DAY_MS, ACTIVITY_WINDOW)
+
+    # Assiduité : jours distincts avec une révision ou une partie ; charge : éléments révisés par jour actif
+    # (borne basse, un élément revu plusieurs fois ne compte qu'une fois)
+    recent = stamps[stamps > now - ACTIVITY_WINDOW * DAY_MS]
+    active_days = len(np.unique((now - recent) // DAY_MS))
+    reviewed = int(np.count_nonzero(days_since < ACTIVITY_WINDOW))
+    profile = {
+        'active': max(active_days, 1) / ACTIVITY_WINDOW,
+        'daily': max(1, round(reviewed / max(active_days, 1))),
+    }
+    return successes, failures, days_since, profile
+
+# ============ SIMULATION ============
+
+def simulate(successes, failures, days_since, profile, params, days, users, seed, report_every):
+    """
+    Rejoue `days` jours pour `users` copies de la base, tous les éléments à la fois.
+    Chaque jour : décroissance (comme decayScores), puis, si l'utilisateur joue, révision des `daily`
+    éléments au plus faible équilibre (départage aléatoire). Renvoie des sommes par point de mesure,
+    pour pouvoir agréger plusieurs bases.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(successes)
+    rate, cap, interval = params
+    daily = min(profile['daily'], n)
+
+    successes = np.tile(successes, users)
+    failures = np.tile(failures, users)
+    since_review = np.tile(days_since, users)     # dernière vraie révision : pilote le rappel
+    since_touch = since_review.copy()             # lastReviewDate, que decayScores remet aussi à zéro
+    stability = INITIAL_STABILITY + STABILITY_PER_POINT * np.clip(successes - failures, 0, None)
+    jitter = np.empty(n * users)
+
+    curves = {key: [] for key in ('day', 'retention', 'progress', 'mastered', 'reviews', 'lapses', 'decayed')}
+    reviews = lapses = decayed = 0
+    for day in range(1, days + 1):
+        periods = np.floor(since_touch / interval)
+        mask = (periods >= 1) & (successes > 0)
+        if mask.any():
+            kept = 1.0 - np.minimum(periods[mask] * rate, cap)
+            successes[mask] = (successes[mask] * kept).astype(np.int64)
+            since_touch[mask] = 0
+            decayed += int(np.count_nonzero(mask))
+
+        active = np.flatnonzero(rng.random(users) < profile['active'])
+        if len(active) and daily:
+            rng.random(out=jitter)
+            priority = (successes - failures + jitter).reshape(users, n)[active]
+            if daily < n:
+                picked = np.argpartition(priority, daily - 1, axis=1)[:, :daily]
+            else:
+                picked = np.broadcast_to(np.arange(n), (len(active), n))
+            selected = (picked + (active * n)[:, None]).ravel()
+
+            recall = np.exp(-since_review[selected] / stability[selected])
+            success = rng.random(len(selected)) < recall
+            successes[selected] += success
+            failures[selected] += ~success
+            stability[selected] = np.where(success, stability[selected] * (1 + GROWTH * (1 - recall)),
+                                           np.maximum(stability[selected] * LAPSE, MIN_STABILITY))
+            since_review[selected] = 0
+            since_touch[selected] = 0
+            reviews += len(selected)
+            lapses += int(np.count_nonzero(~success))
+
+        since_review += 1
+        since_touch += 1
+        if day % report_every == 0 or day == days:
+            balance = successes - failures
+            curves['day'].append(day)
+            curves['retention'].append(float(np.exp(-since_review / stability).sum()))
+            curves['progress'].append(float(np.clip(balance, 0, MASTERY_BALANCE).sum() / MASTERY_BALANCE))
+            curves['mastered'].append(int(np.count_nonzero(balance >= MASTERY_BALANCE)))
+            curves['reviews'].append(reviews)
+            curves['lapses'].append(lapses)
+            curves['decayed'].append(decayed)
+            reviews = lapses = decayed = 0
+    curves['items'] = n * users
+    return curves
+
+def run_job(job):
+    path, score_type, params, days, users, seed, report_every, overrides = job
+    successes, failures, days_since, profile = load_database(path, score_type)
+    profile.update(overrides)
+    if len(successes) == 0:
+        return params, path, None
+    return params, path, simulate(successes, failures, days_since, profile, params, days, users, seed, report_every)
+
+# ============ RAPPORT ============
+
+def merge(results):
+    """Somme les courbes de plusieurs bases (mêmes points de mesure)"""
+    total = None
+    for curves in results:
+        if total is None:
+            total = {key: list(value) if isinstance(value, list) else value for key, value in curves.items()}
+            total['users'] = 1
+            continue
+        for key in ('retention', 'progress', 'mastered', 'reviews', 'lapses', 'decayed'):
+            total[key] = [a + b for a, b in zip(total[key], curves[key])]
+        total['items'] += curves['items']
+        total['users'] += 1
+    return total
+
+def describe(params):
+    rate, cap, interval = params
+    return f"-{rate:.0%} par {interval} j (plafond {cap:.0%})"
+
+def summarize(total, users):
+    """Courbes en pourcentages (par élément) et en révisions par jour et par utilisateur"""
+    items, sims = total['items'], total['users'] * users
+    previous = [0] + total['day'][:-1]
+    spans = [day - prev for day, prev in zip(total['day'], previous)]
+    return {
+        'day': total['day'],
+        'retention': [round(100 * v / items, 2) for v in total['retention']],
+        'progress': [round(100 * v / items, 2) for v in total['progress']],
+        'mastered': [round(100 * v / items, 2) for v in total['mastered']],
+        'reviews_per_day': [round(v / span / sims, 2) for v, span in zip(total['reviews'], spans)],
+        'lapses_per_day': [round(v / span / sims, 2) for v, span in zip(total['lapses'], spans)],
+        'decayed_per_day': [round(v / span / sims, 2) for v, span in zip(total['decayed'], spans)],
+    }
+
+def print_report(label, curves):
+    print(f"\n{label}")
+    print(f"  {'jour':>5} {'rétention':>10} {'progression':>12} {'maîtrisés':>10} {'révisions/j':>12} "
+          f"{'échecs/j':>9} {'décrus/j':>9}")
+    for i, day in enumerate(curves['day']):
+        print(f"  {day:>5} {curves['retention'][i]:>9.1f}% {curves['progress'][i]:>11.1f}% "
+              f"{curves['mastered'][i]:>9.1f}% {curves['reviews_per_day'][i]:>12.1f} "
+              f"{curves['lapses_per_day'][i]:>9.1f} {curves['decayed_per_day'][i]:>9.1f}")
+
+# ============ FONCTION PRINCIPALE ============
+
+def main():
+    parser = argparse.ArgumentParser(description='Simule révisions et décroissance des scores sur des bases MochiDatabase exportées')
+    parser.add_argument('databases', nargs='+', help='Fichiers SQLite exportés (MochiDatabase)')
+    parser.add_argument('--rate', type=float, nargs='+', default=[DECAY_RATE], help='Part des succès retirée par période')
+    parser.add_argument('--cap', type=float, nargs='+', default=[DECAY_CAP], help='Décroissance maximale')
+    parser.add_argument('--interval', type=int, nargs='+', default=[DECAY_INTERVAL], help='Jours par période')
+    parser.add_argument('--days', type=int, default=DAYS, help='Jours simulés')
+    parser.add_argument('--users', type=int, default=USERS, help='Copies simulées par base')
+    parser.add_argument('--type', choices=SCORE_TYPES, help='Limite la simulation à un type de score')
+    parser.add_argument('--daily', type=int, help='Révisions par jour actif (par défaut: estimées depuis la base)')
+    parser.add_argument('--active', type=float, help='Probabilité de jouer un jour donné (par défaut: estimée)')
+    parser.add_argument('--report-every', type=int, default=REPORT_EVERY, help='Jours entre deux points des courbes')
+    parser.add_argument('--seed', type=int, default=0, help='Graine (la même pour chaque jeu de paramètres)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Nombre de processus')
+    parser.add_argument('--output', help='Écrit les courbes en JSON')
+    args = parser.parse_args()
+
+    if np is None:
+        print("❌ Module numpy manquant : pip install numpy")
+        sys.exit(1)
+    databases = [p for p in args.databases if os.path.exists(p)]
+    for missing in sorted(set(args.databases) - set(databases)):
+        print(f"⚠️  {missing} introuvable")
+    if not databases:
+        sys.exit(1)
+
+    overrides = {}
+    if args.daily is not None: overrides['daily'] = args.daily
+    if args.active is not None: overrides['active'] = args.active
+    grid = list(itertools.product(args.rate, args.cap, args.interval))
+    # Graine par base, commune aux jeux de paramètres : les écarts ne viennent que des paramètres
+    jobs = [(path, args.type, params, args.days, args.users, args.seed * 100003 + i, args.report_every, overrides)
+            for params in grid for i, path in enumerate(databases)]
+
+    t0 = time.perf_counter()
+    results = {params: [] for params in grid}
+    empty = set()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for params, path, curves in pool.map(run_job, jobs):
+            if curves is None:
+                empty.add(path)
+            else:
+                results[params].append(curves)
+    for path in sorted(empty):
+        print(f"⚠️  {path}: aucun score")
+    if not any(results.values()):
+        sys.exit(1)
+
+    report = {}
+    for params in grid:
+        total = merge(results[params])
+        curves = summarize(total, args.users)
+        print_report(f"{describe(params)} : {total['users']} base(s), {total['items']} éléments simulés", curves)
+        report[describe(params)] = {'rate': params[0], 'cap': params[1], 'interval': params[2], **curves}
+
+    if len(grid) > 1:
+        print(f"\n{'paramètres':<30} {'rétention finale':>17} {'progression':>12} {'révisions/j':>12}")
+        for label, curves in report.items():
+            mean_reviews = sum(curves['reviews_per_day']) / len(curves['reviews_per_day'])
+            print(f"{label:<30} {curves['retention'][-1]:>16.1f}% {curves['progress'][-1]:>11.1f}% {mean_reviews:>12.1f}")
+    print(f"\n{len(jobs)} simulations en {time.perf_counter() - t0:.1f}s")
+
+    if args.output:
+        save_json(args.output, {'days': args.days, 'users': args.users, 'databases': len(databases), 'runs': report})
+        print(f"✅ {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 import os
 import xml.etree.ElementTree as ET
 import glob
+import argparse
 
 # Configuration
 BASE_STRINGS_PATH = 'shared/src/commonMain/composeResources/values/strings.xml'
@@ -41,6 +42,7 @@ def update_file(target_path, base_keys):
 
         # Identifier les clés existantes
         existing_keys = set()
+        updated_count = 0
         for string in root.findall('string'):
             existing_keys.add(string.get('name'))
             
@@ -49,6 +51,8 @@ def update_file(target_path, base_keys):
             if name in base_keys:
                 base_attr = base_keys[name].get('translatable')
                 if base_attr == 'false':
+                    if string.text != base_keys[name]['value'] or string.get('translatable') != 'false':
+                        updated_count += 1
                     string.set('translatable', 'false')
                     # Force la valeur native pour les noms de langues
                     string.text = base_keys[name]['value']
@@ -71,11 +75,11 @@ def update_file(target_path, base_keys):
                 
                 added_count += 1
 
-        if added_count > 0:
+        if added_count > 0 or updated_count > 0:
             # Indenter pour une jolie sortie XML
             ET.indent(tree, space="    ", level=0)
             tree.write(target_path, encoding='utf-8', xml_declaration=True)
-            print(f"  -> {added_count} clés ajoutées.")
+            print(f"  -> {added_count} clés ajoutées, {updated_count} valeurs non traduisibles mises à jour.")
         else:
             print("  -> À jour.")
 
@@ -83,13 +87,18 @@ def update_file(target_path, base_keys):
         print(f"Erreur mise à jour {target_path}: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description='Ajoute aux strings.xml traduits les clés manquantes du fichier de base')
+    parser.add_argument('--base', default=BASE_STRINGS_PATH, help='strings.xml de référence')
+    parser.add_argument('--targets', default=TARGET_DIRS_PATTERN, help='Motif des dossiers values-* cibles')
+    args = parser.parse_args()
+
     # 1. Charger les clés de base (le fichier que j'ai mis à jour avec les clés FR/EN complètes)
-    print(f"Chargement de {BASE_STRINGS_PATH}...")
-    base_keys = load_keys(BASE_STRINGS_PATH)
+    print(f"Chargement de {args.base}...")
+    base_keys = load_keys(args.base)
     print(f"{len(base_keys)} clés trouvées.")
 
     # 2. Parcourir tous les dossiers values-*
-    target_dirs = glob.glob(TARGET_DIRS_PATTERN)
+    target_dirs = glob.glob(args.targets)
     
     for target_dir in target_dirs:
         target_file = os.path.join(target_dir, 'strings.xml')
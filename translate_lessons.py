@@ -0,0 +1,265 @@
+#!/usr/bin/python3
+import os
+import re
+import glob
+import hashlib
+import argparse
+from collections import Counter
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+from mochi_assets.jsonio import load_json, save_json
+from mochi_assets.ratecontrol import AdaptiveRateController
+
+# Configuration
+LESSONS_DIR = 'shared/src/commonMain/composeResources/files/grammar/lessons'
+CACHE_DIR = 'translation_cache/lessons'
+SOURCE_LANG = 'fr'      # lessons/fr/<règle>.html, prioritaire sur la leçon racine
+DEFAULT_ROOT_LANG = 'en'  # langue supposée d'une leçon racine sans indice (les gabarits « Content will arrive... »)
+BATCH_SIZE = 100  # Taille maximale ; le contrôleur de débit la réduit si le service sature
+
+# Dossier de leçon (GrammarRepository.loadLessonHtml: 2 premières lettres de la locale) -> code Google
+LANG_MAP = {
+    'ar': 'ar', 'bn': 'bn', 'de': 'de', 'en': 'en', 'es': 'es',
+    'in': 'id', 'it': 'it', 'ko': 'ko', 'mn': 'mn', 'pt': 'pt',
+    'ru': 'ru', 'th': 'th', 'ua': 'uk', 'vi': 'vi', 'zh': 'zh-CN'
+}
+
+# Mots outils propres à chaque langue possible d'une leçon racine (aucun n'est commun aux deux listes)
+STOPWORDS = {
+    'fr': {'le', 'la', 'les', 'une', 'des', 'est', 'et', 'du', 'pour', 'dans', 'avec', 'cette', 'vous', 'sont',
+           'ou', 'pas', 'qui', 'que'},
+    'en': {'the', 'is', 'are', 'and', 'of', 'to', 'for', 'with', 'this', 'you', 'your', 'will', 'be', 'not',
+           'which', 'that', 'or'},
+}
+
+JAPANESE_PATTERN = re.compile(r'[　-〿぀-ヿㇰ-ㇿ㐀-䶿一-鿿＀-￯]+')
+LETTER_PATTERN = re.compile(r'[^\W\d_]')
+WORD_PATTERN = re.compile(r'[^\W\d_]+')
+# Repères des balises en ligne dans un segment ; le traducteur ajoute parfois des espaces dans les accolades
+PLACEHOLDER_PATTERN = re.compile(r'\{\s*(\d+)\s*\}')
+RAW_TEXT_TAGS = {'script', 'style'}
+# Balises qui ne coupent pas une phrase : leur texte est traduit avec celui qui les entoure
+INLINE_TAGS = {'a', 'abbr', 'b', 'code', 'em', 'font', 'i', 'kbd', 'mark', 'rp', 'rt', 'ruby', 's', 'small',
+               'span', 'strong', 'sub', 'sup', 'u'}
+
+def segment_hash(lang, text):
+    return hashlib.sha1(f"{lang}\0{text}".encode('utf-8')).hexdigest()[:16]
+
+# ============ DÉCOUPAGE HTML ============
+
+class LessonSegmenter(HTMLParser):
+    """
+    Découpe une leçon en morceaux : ('raw', texte conservé tel quel) ou ('text', gabarit à traduire,
+    morceaux conservés). Une phrase coupée par des balises en ligne (<b>, <span>...), des entités ou
+    des passages japonais forme un seul gabarit où ces morceaux deviennent des repères {0}, {1}...
+    Les balises de bloc, les espaces de bord et le reste sont conservés à l'identique.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+        self.run = []  # [(texte ?, morceau)] depuis la dernière coupure
+        self.raw_depth = 0
+
+    def _raw(self, text):
+        self._flush()
+        self.parts.append(('raw', text))
+
+    def _inline(self, text):
+        if self.raw_depth:
+            self._raw(text)
+        else:
+            self.run.append((False, text))
+
+    def handle_starttag(self, tag, attrs):
+        if tag in RAW_TEXT_TAGS: self.raw_depth += 1
+        (self._inline if tag in INLINE_TAGS else self._raw)(self.get_starttag_text())
+
+    def handle_startendtag(self, tag, attrs):
+        (self._inline if tag in INLINE_TAGS else self._raw)(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if tag in RAW_TEXT_TAGS and self.raw_depth: self.raw_depth -= 1
+        (self._inline if tag in INLINE_TAGS else self._raw)(f"</{tag}>")
+
+    def handle_entityref(self, name): self._inline(f"&{name};")
+    def handle_charref(self, name): self._inline(f"&#{name};")
+    def handle_comment(self, data): self._raw(f"<!--{data}-->")
+    def handle_decl(self, decl): self._raw(f"<!{decl}>")
+    def handle_pi(self, data): self._raw(f"<?{data}>")
+
+    def handle_data(self, data):
+        if self.raw_depth:
+            self._raw(data)
+            return
+        position = 0
+        for match in JAPANESE_PATTERN.finditer(data):
+            if match.start() > position: self.run.append((True, data[position:match.start()]))
+            self.run.append((False, match.group()))
+            position = match.end()
+        if position < len(data): self.run.append((True, data[position:]))
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _flush(self):
+        run, self.run = self.run, []
+        if not any(is_text and LETTER_PATTERN.search(piece) for is_text, piece in run):
+            if run: self.parts.append(('raw', ''.join(piece for _, piece in run)))
+            return
+        # Du premier au dernier morceau non blanc : une balise ouverte dans le segment y est aussi fermée
+        solid = [i for i, (is_text, piece) in enumerate(run) if not is_text or piece.strip()]
+        first, last = solid[0], solid[-1]
+        template, kept = [], []
+        for is_text, piece in run[first:last + 1]:
+            if is_text:
+                template.append(piece)
+            else:
+                template.append(f"{{{len(kept)}}}")
+                kept.append(piece)
+        # Espaces de bord (du premier ou du dernier texte) hors traduction
+        template = ''.join(template)
+        core = template.strip()
+        start = template.index(core)
+        self.parts.append(('raw', ''.join(piece for _, piece in run[:first]) + template[:start]))
+        self.parts.append(('text', core, tuple(kept)))
+        self.parts.append(('raw', template[start + len(core):] + ''.join(piece for _, piece in run[last + 1:])))
+
+def segment_lesson(html):
+    parser = LessonSegmenter()
+    parser.feed(html)
+    parser.close()
+    return [part for part in parser.parts if part[0] == 'text' or part[1]]
+
+def placeholders(text):
+    return sorted(int(n) for n in PLACEHOLDER_PATTERN.findall(text))
+
+def fill_placeholders(template, kept):
+    return PLACEHOLDER_PATTERN.sub(lambda m: kept[int(m.group(1))], template)
+
+def guess_language(parts):
+    """Langue source d'une leçon racine d'après ses mots outils (DEFAULT_ROOT_LANG sans indice)"""
+    words = WORD_PATTERN.findall(' '.join(part[1] for part in parts if part[0] == 'text').lower())
+    hits = {lang: sum(w in stopwords for w in words) for lang, stopwords in STOPWORDS.items()}
+    best = max(hits, key=hits.get)
+    return best if hits[best] else DEFAULT_ROOT_LANG
+
+def rebuild_lesson(lang, parts, cache):
+    """Reconstruit la leçon ; les segments absents du cache restent dans la langue source"""
+    out = []
+    missing = 0
+    for part in parts:
+        if part[0] == 'text':
+            _, template, kept = part
+            translated = cache.get(segment_hash(lang, template))
+            if translated is None: missing += 1
+            out.append(fill_placeholders(translated if translated is not None else template, kept))
+        else:
+            out.append(part[1])
+    return ''.join(out), missing
+
+# ============ TRADUCTION ============
+
+def translate_language(lesson_dir, google_lang, segments, cache_dir, dry_run):
+    """Traduit les segments nouveaux d'une langue par gros lots, en sauvegardant le cache à chaque lot"""
+    cache_file = os.path.join(cache_dir, f'{lesson_dir}.json')
+    cache = load_json(cache_file) or {}
+    todo = [(h, lang, t) for h, (lang, t) in segments.items() if h not in cache and lang != google_lang]
+    if dry_run or not todo:
+        return lesson_dir, cache, len(todo), 0
+
+    from deep_translator import GoogleTranslator
+    done = rejected = 0
+
+    def translate_from(source_lang, items):
+        translator = GoogleTranslator(source=source_lang, target=google_lang)
+        rate = AdaptiveRateController(batch_size=BATCH_SIZE, max_batch=BATCH_SIZE, max_concurrency=1)
+
+        def on_done(start, batch, results):
+            nonlocal done, rejected
+            for (h, text), translated in zip(batch, results):
+                if not translated: continue
+                # Un repère perdu ou dupliqué déplacerait les balises : le segment reste à traduire
+                if placeholders(translated) != placeholders(text):
+                    rejected += 1
+                    continue
+                cache[h] = translated.strip()
+                done += 1
+            save_json(cache_file, cache, sort_keys=True, atomic=True)
+            print(f"  [{lesson_dir}] {done}/{len(todo)} segments | {rate.status()}")
+
+        def on_error(start, batch, e):
+            print(f"  [{lesson_dir}] ERREUR segments {source_lang} {start}-{start + len(batch)}: {e}")
+
+        rate.run(items, lambda batch: translator.translate_batch([t for _, t in batch]), on_done, on_error)
+
+    for source_lang in sorted({lang for _, lang, _ in todo}):
+        translate_from(source_lang, [(h, t) for h, lang, t in todo if lang == source_lang])
+    if rejected:
+        print(f"  [{lesson_dir}] {rejected} segments rejetés (repères {{n}} perdus par le traducteur)")
+    return lesson_dir, cache, len(todo), done
+
+def main():
+    parser = argparse.ArgumentParser(description='Traduit les leçons de grammaire segment par segment avec cache')
+    parser.add_argument('--lessons', default=LESSONS_DIR, help='Dossier racine des leçons')
+    parser.add_argument('--cache', default=CACHE_DIR, help='Dossier du cache de segments')
+    parser.add_argument('--langs', default=','.join(LANG_MAP), help='Langues cibles (dossiers), séparées par des virgules')
+    parser.add_argument('--root-lang', choices=sorted(STOPWORDS),
+                        help='Langue des leçons racine sans version fr/ (par défaut: devinée pour chaque leçon)')
+    parser.add_argument('--workers', type=int, default=4, help='Langues traduites en parallèle')
+    parser.add_argument('--dry-run', action='store_true', help="Compte les segments nouveaux sans rien traduire")
+    args = parser.parse_args()
+
+    # Source de chaque règle : lessons/fr/<règle>.html, sinon la leçon racine, que l'application affiche
+    # en dernier recours (GrammarRepository.loadLessonHtml)
+    sources = {os.path.basename(p): (SOURCE_LANG, p) for p in glob.glob(os.path.join(args.lessons, SOURCE_LANG, '*.html'))}
+    for path in glob.glob(os.path.join(args.lessons, '*.html')):
+        sources.setdefault(os.path.basename(path), (None, path))
+    if not sources:
+        print(f"Aucune leçon dans {args.lessons}")
+        return
+
+    lessons = {}
+    segments = {}
+    for name, (lang, path) in sorted(sources.items()):
+        with open(path, 'r', encoding='utf-8') as f:
+            parts = segment_lesson(f.read())
+        lang = lang or args.root_lang or guess_language(parts)
+        lessons[name] = (lang, parts)
+        for part in parts:
+            if part[0] == 'text': segments[segment_hash(lang, part[1])] = (lang, part[1])
+    by_lang = Counter(lang for lang, _ in lessons.values())
+    print(f"{len(lessons)} leçons ({', '.join(f'{l}: {n}' for l, n in sorted(by_lang.items()))}), "
+          f"{len(segments)} segments uniques à traduire")
+
+    targets = [l for l in args.langs.split(',') if l in LANG_MAP and l != SOURCE_LANG]
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = [pool.submit(translate_language, l, LANG_MAP[l], segments, args.cache, args.dry_run)
+                   for l in targets]
+        results = [f.result() for f in futures]
+
+    for lesson_dir, cache, new_count, done in results:
+        if args.dry_run:
+            print(f"  [{lesson_dir}] {new_count} segments nouveaux")
+            continue
+        written = 0
+        missing_total = 0
+        for name, (lang, parts) in lessons.items():
+            # Déjà dans la langue cible : l'application se rabat sur la source, rien à écrire
+            if lang == LANG_MAP[lesson_dir]: continue
+            html, missing = rebuild_lesson(lang, parts, cache)
+            missing_total += missing
+            out_file = os.path.join(args.lessons, lesson_dir, name)
+            if os.path.exists(out_file):
+                with open(out_file, 'r', encoding='utf-8') as f:
+                    if f.read() == html: continue
+            os.makedirs(os.path.dirname(out_file), exist_ok=True)
+            with open(out_file, 'w', encoding='utf-8') as f:
+                f.write(html)
+            written += 1
+        print(f"  [{lesson_dir}] {done}/{new_count} traduits, {written} leçons écrites, "
+              f"{missing_total} segments encore en langue source")
+
+if __name__ == "__main__":
+    main()
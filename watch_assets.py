@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+import os
+import glob
+import time
+import argparse
+from mochi_assets.jsonio import load_json, save_json
+import sync_strings
+import merge_wordlists
+import compile_exercise_bank
+
+# Configuration
+POLL_INTERVAL = 0.2   # secondes entre deux scrutations des fichiers sources
+SETTLE_DELAY = 0.05   # laisse l'éditeur finir d'écrire avant de relire
+
+# ============ RÈGLES ============
+# Chaque règle connaît ses fichiers sources, reconstruit à froid au démarrage (en n'écrivant
+# que ce qui diffère) puis ne relit que les fichiers modifiés.
+
+class StringsRule:
+    """values/strings.xml -> clés manquantes de chaque values-*/strings.xml"""
+    name = 'strings'
+
+    def __init__(self):
+        self.base_keys = {}
+
+    def sources(self):
+        return [sync_strings.BASE_STRINGS_PATH] + self.targets()
+
+    def targets(self):
+        return sorted(os.path.join(d, 'strings.xml') for d in glob.glob(sync_strings.TARGET_DIRS_PATTERN))
+
+    def prime(self):
+        self.base_keys = sync_strings.load_keys(sync_strings.BASE_STRINGS_PATH)
+        for target in self.targets():
+            sync_strings.update_file(target, self.base_keys)
+
+    def update(self, changed):
+        if sync_strings.BASE_STRINGS_PATH in changed:
+            keys = sync_strings.load_keys(sync_strings.BASE_STRINGS_PATH)
+            # Seules les nouvelles clés et les valeurs non traduisibles modifiées sont propagées
+            delta = {k: v for k, v in keys.items()
+                     if k not in self.base_keys or (v['translatable'] == 'false' and v != self.base_keys[k])}
+            removed = set(self.base_keys) - set(keys)
+            self.base_keys = keys
+            print(f"  {len(delta)} clé(s) à propager" + (f", {len(removed)} supprimée(s) de la base (conservées)" if removed else ""))
+            if delta:
+                for target in self.targets():
+                    sync_strings.update_file(target, delta)
+        # Un fichier de langue modifié à la main (ou nouveau) est complété avec toute la base
+        for target in sorted(changed & set(self.targets())):
+            if os.path.exists(target):
+                sync_strings.update_file(target, self.base_keys)
+
+class WordlistRule:
+    """
+    jlpt_wordlist_n*.json + bccwj_wordlist_*.json -> merged_wordlist.json
+
+    Seuls les fichiers modifiés sont relus, mais la fusion est refaite en entier : les IDs suivent
+    le rang, un seul mot peut donc décaler tous les suivants. Le fichier n'est réécrit que s'il
+    diffère, et les clés que la fusion ne produit pas (ajoutées par d'autres outils) sont conservées.
+    """
+    name = 'words'
+    OWN_KEYS = {'id', 'text', 'phonetics', 'jlpt', 'rank', 'type'}
+
+    def __init__(self):
+        self.words = {}    # fichier source -> mots (seuls les fichiers modifiés sont relus)
+        self.current = {}  # texte -> entrée de merged_wordlist.json
+
+    def sources(self):
+        jlpt_files, bccwj_files = merge_wordlists.source_files(merge_wordlists.WORDS_DIR)
+        return jlpt_files + bccwj_files
+
+    def prime(self):
+        existing = load_json(merge_wordlists.OUTPUT_FILE) or {}
+        self.current = {w['text']: w for w in existing.get('words', [])}
+        self.update(set(self.sources()))
+
+    def update(self, changed):
+        for path in changed:
+            if os.path.exists(path):
+                self.words[path] = merge_wordlists.read_words(path)
+            else:
+                self.words.pop(path, None)
+        if not self.words:
+            return
+        jlpt_files, bccwj_files = merge_wordlists.source_files(merge_wordlists.WORDS_DIR)
+        final_list = merge_wordlists.merge(
+            [(merge_wordlists.jlpt_level(f), self.words.get(f, [])) for f in jlpt_files],
+            [self.words.get(f, []) for f in bccwj_files])
+
+        merged = {w['text']: w for w in final_list}
+        for text, w in merged.items():
+            previous = self.current.get(text)
+            if previous:
+                w.update((k, v) for k, v in previous.items() if k not in self.OWN_KEYS)
+        added = merged.keys() - self.current.keys()
+        removed = self.current.keys() - merged.keys()
+        modified = [t for t in merged.keys() & self.current.keys() if merged[t] != self.current[t]]
+        if not (added or removed or modified):
+            print("  merged_wordlist.json à jour")
+            return
+        # Les IDs suivent le rang : un mot ajouté ou reclassé décale ceux qui le suivent
+        shifted = sum(1 for t in modified if merged[t]['id'] != self.current[t]['id'])
+        save_json(merge_wordlists.OUTPUT_FILE, {"words": final_list})
+        self.current = merged
+        sample = ', '.join(sorted(added)[:5] + sorted(modified)[:5])
+        print(f"  merged_wordlist.json: +{len(added)} -{len(removed)} ~{len(modified)} mots "
+              f"(dont {shifted} IDs décalés) {sample}")
+
+class ExerciseBankRule:
+    """grammar.json + exercices.json -> exercise_bank.json"""
+    name = 'grammar'
+
+    def __init__(self):
+        self.bank = None
+
+    def sources(self):
+        return [compile_exercise_bank.GRAMMAR_FILE, compile_exercise_bank.EXERCISES_FILE]
+
+    def prime(self):
+        self.bank = load_json(compile_exercise_bank.OUTPUT_FILE)
+        self.update(set(self.sources()))
+
+    def update(self, changed):
+        grammar = load_json(compile_exercise_bank.GRAMMAR_FILE)
+        exercises_data = load_json(compile_exercise_bank.EXERCISES_FILE)
+        if not grammar or not exercises_data:
+            return
+        errors, warnings = [], []
+        bank = compile_exercise_bank.build_bank(grammar, exercises_data, errors, warnings)
+        for e in errors: print(f"  ❌ {e}")
+        if errors:
+            # On garde la dernière banque valide tant que la source est en cours d'édition
+            print(f"  exercise_bank.json non régénéré ({len(errors)} erreur(s))")
+            return
+        if bank == self.bank:
+            print("  exercise_bank.json à jour")
+            return
+        save_json(compile_exercise_bank.OUTPUT_FILE, bank, indent=None)
+        self.bank = bank
+        print(f"  exercise_bank.json: {len(bank['exerciseIds'])} exercices, {len(warnings)} avertissement(s)")
+
+RULES = [StringsRule, WordlistRule, ExerciseBankRule]
+
+# ============ SURVEILLANCE ============
+
+def snapshot(paths):
+    """{chemin: (mtime, taille)} des fichiers existants"""
+    state = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+def watched(rules):
+    return {path: rule for rule in rules for path in rule.sources()}
+
+def main():
+    parser = argparse.ArgumentParser(description='Régénère les assets dérivés dès qu\'une source change')
+    parser.add_argument('--only', default=','.join(r.name for r in RULES), help='Règles actives (strings, words, grammar)')
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help='Intervalle de scrutation (secondes)')
+    parser.add_argument('--once', action='store_true', help='Remet les sorties à jour puis s\'arrête')
+    args = parser.parse_args()
+
+    only = args.only.split(',')
+    rules = [rule() for rule in RULES if rule.name in only]
+    for rule in rules:
+        t0 = time.perf_counter()
+        print(f"[{rule.name}] mise à jour initiale")
+        rule.prime()
+        print(f"[{rule.name}] {(time.perf_counter() - t0) * 1000:.0f} ms")
+    if args.once:
+        return
+
+    sources = watched(rules)
+    state = snapshot(sources)
+    print(f"\nSurveillance de {len(state)} fichiers (Ctrl+C pour arrêter)...")
+    try:
+        while True:
+            time.sleep(args.interval)
+            # Nouveaux fichiers (values-xx, listes de mots) pris en compte à chaque tour ;
+            # un fichier supprimé reste attribué à la règle qui le surveillait
+            owners = sources
+            sources = watched(rules)
+            owners = {**owners, **sources}
+            current = snapshot(sources)
+            changed = {p for p in current.keys() | state.keys() if current.get(p) != state.get(p)}
+            if not changed:
+                continue
+            time.sleep(SETTLE_DELAY)
+            t0 = time.perf_counter()
+            for rule in rules:
+                hits = {p for p in changed if owners.get(p) is rule}
+                if not hits: continue
+                print(f"[{rule.name}] {', '.join(os.path.basename(p) for p in sorted(hits))} modifié(s)")
+                try:
+                    rule.update(hits)
+                except Exception as e:
+                    print(f"  ❌ {e}")
+            # Les sorties écrites par les règles ne doivent pas redéclencher une mise à jour
+            sources = watched(rules)
+            state = snapshot(sources)
+            print(f"  -> {(time.perf_counter() - t0) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        print("\nArrêt de la surveillance.")
+
+if __name__ == "__main__":
+    main()